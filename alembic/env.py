@@ -22,6 +22,7 @@ if str(ROOT) not in sys.path:
 
 from misc.config import settings  # noqa: E402
 from db import models  # noqa: F401,E402  # ensure SQLModel metadata is populated
+from db import file_state  # noqa: F401,E402
 
 
 config = context.config
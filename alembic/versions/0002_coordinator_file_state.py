@@ -0,0 +1,60 @@
+"""coordinator file state
+
+Revision ID: 0002_coordinator_file_state
+Revises: 0001_init_schema
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_coordinator_file_state"
+down_revision = "0001_init_schema"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "coordinator_file_state",
+        sa.Column("file_name", sa.String(length=512), nullable=False),
+        sa.Column("content_md5", sa.String(length=32), nullable=False),
+        sa.Column("base_name", sa.String(length=128), nullable=False),
+        sa.Column("status", sa.String(length=50), nullable=False),
+        sa.Column("last_record_id", sa.String(length=32), nullable=False),
+        sa.Column("archived", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("file_name", "content_md5"),
+    )
+    op.create_index(
+        "idx_file_state_status_created",
+        "coordinator_file_state",
+        ["status", "created_at"],
+    )
+
+    # Backfill from history: one pass over coordinator_control. Status values are literals here (as in 0001) so
+    # the migration does not change when misc.constants does; 'archive_succeeded' is Status.ARCHIVE_SUCCEEDED.
+    op.get_bind().execute(
+        sa.text(
+            """
+            INSERT INTO coordinator_file_state
+                (file_name, content_md5, base_name, status, last_record_id, archived, created_at)
+            SELECT DISTINCT ON (c.file_name, c.content_md5)
+                   c.file_name,
+                   c.content_md5,
+                   c.base_name,
+                   c.status,
+                   c.id,
+                   bool_or(c.status = 'archive_succeeded') OVER (PARTITION BY c.file_name, c.content_md5),
+                   c.created_at
+            FROM coordinator_control c
+            ORDER BY c.file_name, c.content_md5, c.created_at DESC
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_file_state_status_created", table_name="coordinator_file_state")
+    op.drop_table("coordinator_file_state")
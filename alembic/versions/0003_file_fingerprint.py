@@ -0,0 +1,32 @@
+"""coordinator file fingerprint
+
+Revision ID: 0003_file_fingerprint
+Revises: 0002_coordinator_file_state
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_file_fingerprint"
+down_revision = "0002_coordinator_file_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "coordinator_file_fingerprint",
+        sa.Column("path", sa.String(length=1024), primary_key=True, nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("mtime", sa.Float(), nullable=False),
+        sa.Column("chgtime", sa.Float(), nullable=False),
+        sa.Column("content_md5", sa.String(length=32), nullable=False),
+        sa.Column("base_name", sa.String(length=128), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("coordinator_file_fingerprint")
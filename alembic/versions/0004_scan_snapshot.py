@@ -0,0 +1,34 @@
+"""coordinator scan snapshot
+
+Revision ID: 0004_scan_snapshot
+Revises: 0003_file_fingerprint
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0004_scan_snapshot"
+down_revision = "0003_file_fingerprint"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "coordinator_scan_snapshot",
+        sa.Column("dir_path", sa.String(length=1024), primary_key=True, nullable=False),
+        sa.Column("root", sa.String(length=1024), nullable=False),
+        sa.Column("mtime", sa.Float(), nullable=False),
+        sa.Column("entries", postgresql.JSONB(), nullable=False),
+        sa.Column("full_scan_ts", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("idx_scan_snapshot_root", "coordinator_scan_snapshot", ["root"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_scan_snapshot_root", table_name="coordinator_scan_snapshot")
+    op.drop_table("coordinator_scan_snapshot")
@@ -0,0 +1,75 @@
+"""add full-text search columns and indexes
+
+Revision ID: mc0007_search_tsv
+Revises: mc0006_constraints_view
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "mc0007_search_tsv"
+down_revision = "mc0006_constraints_view"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # 'simple' keeps identifiers such as CUST_ID searchable as-is (no stemming / stop words).
+    op.execute(
+        """
+        ALTER TABLE IF EXISTS public.attribute_entity
+            ADD COLUMN IF NOT EXISTS search_tsv tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple'::regconfig, COALESCE(metadata ->> 'Field Name', '')), 'A') ||
+                setweight(to_tsvector('simple'::regconfig, COALESCE(
+                    metadata ->> 'Field Description (Long)', metadata ->> 'Field Description', ''
+                )), 'B')
+            ) STORED
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE IF EXISTS public.table_entity
+            ADD COLUMN IF NOT EXISTS search_tsv tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple'::regconfig, COALESCE(
+                    table_metadata ->> 'Table Name', table_metadata ->> 'tableName', ''
+                )), 'A') ||
+                setweight(to_tsvector('simple'::regconfig, COALESCE(
+                    table_metadata ->> 'Table Description', table_metadata ->> 'Template Description', ''
+                )), 'B')
+            ) STORED
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE IF EXISTS public.tenant_entity
+            ADD COLUMN IF NOT EXISTS search_tsv tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple'::regconfig,
+                    COALESCE(metadata ->> 'tenant_name', '') || ' ' || COALESCE(metadata ->> 'Tenant ID', '')
+                ), 'A') ||
+                setweight(to_tsvector('simple'::regconfig, COALESCE(metadata ->> 'Tenant Description', '')), 'B')
+            ) STORED
+        """
+    )
+
+    op.execute("CREATE INDEX IF NOT EXISTS attribute_entity_search_tsv_idx ON public.attribute_entity USING gin (search_tsv)")
+    op.execute("CREATE INDEX IF NOT EXISTS table_entity_search_tsv_idx ON public.table_entity USING gin (search_tsv)")
+    op.execute("CREATE INDEX IF NOT EXISTS tenant_entity_search_tsv_idx ON public.tenant_entity USING gin (search_tsv)")
+
+    # Fuzzy matching (word_similarity / <%) goes through the existing name_description gin_trgm_ops indexes;
+    # recreate them here in case an environment predates 01_init_tables.sql.
+    op.execute("CREATE INDEX IF NOT EXISTS attribute_entity_name_description_gin_trgm_idx ON public.attribute_entity USING gin (name_description gin_trgm_ops)")
+    op.execute("CREATE INDEX IF NOT EXISTS table_entity_name_description_gin_trgm_idx ON public.table_entity USING gin (name_description gin_trgm_ops)")
+    op.execute("CREATE INDEX IF NOT EXISTS tenant_entity_name_description_gin_trgm_idx ON public.tenant_entity USING gin (name_description gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS public.tenant_entity_search_tsv_idx")
+    op.execute("DROP INDEX IF EXISTS public.table_entity_search_tsv_idx")
+    op.execute("DROP INDEX IF EXISTS public.attribute_entity_search_tsv_idx")
+    op.execute("ALTER TABLE IF EXISTS public.tenant_entity DROP COLUMN IF EXISTS search_tsv")
+    op.execute("ALTER TABLE IF EXISTS public.table_entity DROP COLUMN IF EXISTS search_tsv")
+    op.execute("ALTER TABLE IF EXISTS public.attribute_entity DROP COLUMN IF EXISTS search_tsv")
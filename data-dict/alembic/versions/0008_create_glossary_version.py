@@ -0,0 +1,33 @@
+"""create glossary load version table
+
+Revision ID: mc0008_glossary_version
+Revises: mc0007_search_tsv
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "mc0008_glossary_version"
+down_revision = "mc0007_search_tsv"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Single-row table; the version is bumped in the same transaction that reloads the glossary.
+    op.create_table(
+        "glossary_version",
+        sa.Column("id", sa.SmallInteger(), nullable=False, server_default=sa.text("1")),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("loaded_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.PrimaryKeyConstraint("id", name="glossary_version_pk"),
+        sa.CheckConstraint("id = 1", name="glossary_version_single_row_chk"),
+    )
+    op.execute("INSERT INTO public.glossary_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING")
+
+
+def downgrade() -> None:
+    op.drop_table("glossary_version")
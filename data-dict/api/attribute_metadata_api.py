@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Query
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
 
 from services.attribute_metadata_impl import AttributeMetadataService
 from models.models import AttributeResponseVO
@@ -18,19 +20,27 @@ router = APIRouter()
 async def get_attributes(
         page: int = Query(default=1, description="The page number to retrieve"),
         size: int = Query(default=10, description="The number of items per page"),
-        table_id: str = Query(default=..., description="The id of the table to search for")
+        table_id: str = Query(default=..., description="The id of the table to search for"),
+        cursor: Optional[str] = Query(default=None, description="nextCursor of the previous page; replaces 'page' when set")
 ):
-    return await service.get_attributes(page, size, table_id)
+    return await service.get_attributes(page, size, table_id, cursor)
 
 
 @router.get(
     path="/attributes/download",
     tags=["Attribute Metadata"],
-    summary="Download Attribute Metadata as Excel",
-    description="Download attribute entities as an Excel file."
+    summary="Download Attribute Metadata",
+    description="Download all attributes of a table, a tenant or a domain as an Excel, CSV or Parquet file."
 )
 async def download_tables_as_excel(
-        table_id: str = Query(default=None, description="The id of the table to search for")
+        table_id: Optional[str] = Query(default=None, description="The id of the table to export"),
+        domain_name: Optional[str] = Query(default=None, description="Export every attribute of this domain"),
+        tenant_name: Optional[str] = Query(default=None, description="Export every attribute of this tenant"),
+        format: str = Query(default="xlsx", description="Export format: xlsx, csv or parquet")
 ):
-    # Call the service method to generate and return the Excel file
-    return await service.generate_excel_for_attributes(table_id)
+    if not table_id and not domain_name and not tenant_name:
+        raise HTTPException(
+            status_code=400,
+            detail="At least one of the parameters 'table_id', 'domain_name' or 'tenant_name' must be provided.",
+        )
+    return await service.export_attributes(table_id, domain_name, tenant_name, format)
@@ -11,7 +11,7 @@ router = APIRouter()
     path="/search",
     tags=["Search Metadata"],
     summary="Search data dictionary",
-    description="Wildcard search for data dictionary."
+    description="Ranked full-text and fuzzy search over attributes, tables and tenants of the data dictionary."
 )
 async def search_data_dictionary(
         text: str = Query(default=..., description="Search text"),
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Query
 
 from services.glossary_impl import GlossaryService
 from models.glossary import GlossaryResponseVO
-from typing import List
+from typing import List, Optional
 
 
 service = GlossaryService()
@@ -28,3 +28,19 @@ async def glossary_by_key(
     ),
 ):
     return await service.glossary_by_key(page, size, glossary_key, rollup)
+
+
+@router.get(
+    "/glossary/download",
+    tags=["Glossary"],
+    summary="Download Glossary",
+    description="Download glossary rows as an Excel, CSV or Parquet file, optionally only keys containing a search text.",
+)
+async def download_glossary(
+    glossary_key: Optional[List[str]] = Query(
+        default=None,
+        description="Search text, Concatenate with semicolon, e.g. 'key1;key2;key3...'; all rows when omitted",
+    ),
+    format: str = Query(default="xlsx", description="Export format: xlsx, csv or parquet"),
+):
+    return await service.export_glossary(glossary_key, format)
@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+
+from utils.cache import TTLCache
+
+
+router = APIRouter()
+
+
+@router.get(path="/health", tags=["Health"], summary="Health check", description="Liveness probe.")
+async def health():
+    return {"status": "ok"}
+
+
+@router.get(
+    path="/cache/stats",
+    tags=["Health"],
+    summary="Lookup cache statistics",
+    description="Size, hit/miss and invalidation counters of the in-process lookup caches of this worker."
+)
+async def cache_stats():
+    return TTLCache.all_stats()
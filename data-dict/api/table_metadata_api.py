@@ -32,21 +32,22 @@ async def get_tables(
     page: int = Query(default=1, description="The page number to retrieve"),
     size: int = Query(default=10, description="The number of items per page"),
     table_name: str = Query(default=None, description="The name of the table to search for"),
+    cursor: Optional[str] = Query(default=None, description="nextCursor of the previous page; replaces 'page' when set"),
     deps: Tuple[Optional[str], Optional[str]] = Depends(require_one_of),
 ):
     domain_name, tenant_name = deps
-    return await service.get_tables(page, size, domain_name, tenant_name, table_name)
+    return await service.get_tables(page, size, domain_name, tenant_name, table_name, cursor)
 
 
 @router.get(
     "/tables/download",
     tags=["Table Metadata"],
-    summary="Download Tables Metadata as Excel",
-    description="Download table entities as an Excel file.",
+    summary="Download Tables Metadata",
+    description="Download table entities as an Excel, CSV or Parquet file.",
 )
 async def download_tables_as_excel(
-    page: int = Query(default=1, description="The page number to retrieve"),
-    size: int = Query(default=10, description="The number of items per page"),
+    page: Optional[int] = Query(default=None, description="The page number to export; all tables when omitted"),
+    size: Optional[int] = Query(default=None, description="The number of items per page; all tables when omitted"),
     domain_name: str = Query(
         default=None,
         description="The name of the domain to search for tables (required if tenant_name is not provided)",
@@ -56,6 +57,7 @@ async def download_tables_as_excel(
         description="The name of the tenant to search for tables (required if domain_name is not provided)",
     ),
     table_name: str = Query(default=None, description="The name of the table to search for"),
+    format: str = Query(default="xlsx", description="Export format: xlsx, csv or parquet"),
 ):
     if not tenant_name and not domain_name:
         raise HTTPException(
@@ -63,4 +65,4 @@ async def download_tables_as_excel(
             detail="At least one of the parameters 'domain_name' or 'tenant_name' must be provided.",
         )
 
-    return await service.generate_excel_for_tables(page, size, domain_name, tenant_name, table_name)
+    return await service.export_tables(page, size, domain_name, tenant_name, table_name, format)
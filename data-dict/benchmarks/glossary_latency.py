@@ -0,0 +1,87 @@
+"""
+Glossary page latency: serial count + rollup queries versus the combined glossary_page query.
+
+Runs against the database configured for the service (same environment variables), bypassing the rollup
+cache so every request reaches the database. Run from the data-dict directory:
+
+    python -m benchmarks.glossary_latency --key customer --rollup 1 --requests 200 --concurrency 8
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from core.config import settings
+from db.queries import glossary_queries
+from db.session import db
+
+
+_SERIAL_ROLLUPS = {
+    0: glossary_queries.glossary_rollup_0,
+    1: glossary_queries.glossary_rollup_1,
+    2: glossary_queries.glossary_rollup_2,
+}
+
+
+async def serial_page(page, size, glossary_key, rollup):
+    total_row = await glossary_queries.glossary_count_fields(glossary_key)
+    rollup_page = _SERIAL_ROLLUPS.get(rollup, glossary_queries.glossary_rollup_n)
+    records = await rollup_page(page, size, glossary_key, rollup)
+    return total_row[0]["count_fields"], records
+
+
+async def combined_page(page, size, glossary_key, rollup):
+    return await glossary_queries.glossary_page(page, size, glossary_key, rollup)
+
+
+async def measure(fetch_page, args, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await fetch_page(*args)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f"{name:<9} n={len(latencies):<5} p50={statistics.median(latencies):8.2f} ms"
+        f"  p95={p95:8.2f} ms  max={latencies[-1]:8.2f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--key", action="append", required=True, help="glossary key search text, repeatable")
+    parser.add_argument("--rollup", type=int, default=0)
+    parser.add_argument("--page", type=int, default=1)
+    parser.add_argument("--size", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10)
+    options = parser.parse_args()
+
+    args = (options.page, options.size, options.key, options.rollup)
+    await db.connect(settings.connect_type)
+    try:
+        serial_total, _ = await serial_page(*args)
+        combined_total, _ = await combined_page(*args)
+        if serial_total != combined_total:
+            raise SystemExit(f"total mismatch: serial {serial_total}, combined {combined_total}")
+
+        for name, fetch_page in (("serial", serial_page), ("combined", combined_page)):
+            await measure(fetch_page, args, options.warmup, options.concurrency)
+            report(name, await measure(fetch_page, args, options.requests, options.concurrency))
+    finally:
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -49,6 +49,48 @@ if "AUTH_USER_ID_CLAIM" in os.environ:
     env_settings["auth_user_id_claim"] = os.environ.get("AUTH_USER_ID_CLAIM")
 if "AUTH_USER_NAME_CLAIM" in os.environ:
     env_settings["auth_user_name_claim"] = os.environ.get("AUTH_USER_NAME_CLAIM")
+if "BULK_INSERT_CHUNK_SIZE" in os.environ:
+    env_settings["bulk_insert_chunk_size"] = os.environ.get("BULK_INSERT_CHUNK_SIZE")
+if "IMPORT_SOURCE" in os.environ:
+    env_settings["import_source"] = os.environ.get("IMPORT_SOURCE")
+if "IMPORT_LOCAL_ROOT" in os.environ:
+    env_settings["import_local_root"] = os.environ.get("IMPORT_LOCAL_ROOT")
+if "IMPORT_CACHE_DIR" in os.environ:
+    env_settings["import_cache_dir"] = os.environ.get("IMPORT_CACHE_DIR")
+if "IMPORT_TMP_DIR" in os.environ:
+    env_settings["import_tmp_dir"] = os.environ.get("IMPORT_TMP_DIR")
+if "IMPORT_DOWNLOAD_CHUNK_BYTES" in os.environ:
+    env_settings["import_download_chunk_bytes"] = os.environ.get("IMPORT_DOWNLOAD_CHUNK_BYTES")
+if "DB_POOL_MODE" in os.environ:
+    env_settings["db_pool_mode"] = os.environ.get("DB_POOL_MODE")
+if "DB_POOL_MIN_SIZE" in os.environ:
+    env_settings["db_pool_min_size"] = os.environ.get("DB_POOL_MIN_SIZE")
+if "DB_POOL_MAX_SIZE" in os.environ:
+    env_settings["db_pool_max_size"] = os.environ.get("DB_POOL_MAX_SIZE")
+if "DB_STATEMENT_CACHE_SIZE" in os.environ:
+    env_settings["db_statement_cache_size"] = os.environ.get("DB_STATEMENT_CACHE_SIZE")
+if "DB_ENGINE_POOL_SIZE" in os.environ:
+    env_settings["db_engine_pool_size"] = os.environ.get("DB_ENGINE_POOL_SIZE")
+if "DB_ENGINE_MAX_OVERFLOW" in os.environ:
+    env_settings["db_engine_max_overflow"] = os.environ.get("DB_ENGINE_MAX_OVERFLOW")
+if "DB_POOL_PRE_PING" in os.environ:
+    env_settings["db_pool_pre_ping"] = os.environ.get("DB_POOL_PRE_PING")
+if "DB_NATIVE_JSONB" in os.environ:
+    env_settings["db_native_jsonb"] = os.environ.get("DB_NATIVE_JSONB")
+if "DB_CURSOR_PREFETCH" in os.environ:
+    env_settings["db_cursor_prefetch"] = os.environ.get("DB_CURSOR_PREFETCH")
+if "EXPORT_CHUNK_BYTES" in os.environ:
+    env_settings["export_chunk_bytes"] = os.environ.get("EXPORT_CHUNK_BYTES")
+if "GLOSSARY_CACHE_TTL_SECONDS" in os.environ:
+    env_settings["glossary_cache_ttl_seconds"] = os.environ.get("GLOSSARY_CACHE_TTL_SECONDS")
+if "GLOSSARY_CACHE_MAX_ENTRIES" in os.environ:
+    env_settings["glossary_cache_max_entries"] = os.environ.get("GLOSSARY_CACHE_MAX_ENTRIES")
+if "GLOSSARY_VERSION_CHECK_SECONDS" in os.environ:
+    env_settings["glossary_version_check_seconds"] = os.environ.get("GLOSSARY_VERSION_CHECK_SECONDS")
+if "LOOKUP_CACHE_TTL_SECONDS" in os.environ:
+    env_settings["lookup_cache_ttl_seconds"] = os.environ.get("LOOKUP_CACHE_TTL_SECONDS")
+if "LOOKUP_CACHE_MAX_ENTRIES" in os.environ:
+    env_settings["lookup_cache_max_entries"] = os.environ.get("LOOKUP_CACHE_MAX_ENTRIES")
 
 
 class Settings(BaseSettings):
@@ -73,6 +115,27 @@ class Settings(BaseSettings):
     auth_groups_claim: str = env_settings.get("auth_groups_claim", "groups")
     auth_user_id_claim: str = env_settings.get("auth_user_id_claim", "sub")
     auth_user_name_claim: str = env_settings.get("auth_user_name_claim", "preferred_username")
+    bulk_insert_chunk_size: int = int(env_settings.get("bulk_insert_chunk_size", 2000))
+    import_source: str = env_settings.get("import_source", "gcs")
+    import_local_root: str = env_settings.get("import_local_root", "")
+    import_cache_dir: str = env_settings.get("import_cache_dir", "")
+    import_tmp_dir: str = env_settings.get("import_tmp_dir", "")
+    import_download_chunk_bytes: int = int(env_settings.get("import_download_chunk_bytes", 8 * 1024 * 1024))
+    db_pool_mode: str = env_settings.get("db_pool_mode", "sqlalchemy")
+    db_pool_min_size: int = int(env_settings.get("db_pool_min_size", 1))
+    db_pool_max_size: int = int(env_settings.get("db_pool_max_size", 10))
+    db_statement_cache_size: int = int(env_settings.get("db_statement_cache_size", 512))
+    db_engine_pool_size: int = int(env_settings.get("db_engine_pool_size", 5))
+    db_engine_max_overflow: int = int(env_settings.get("db_engine_max_overflow", 10))
+    db_pool_pre_ping: bool = env_settings.get("db_pool_pre_ping", True)
+    db_native_jsonb: bool = env_settings.get("db_native_jsonb", True)
+    db_cursor_prefetch: int = int(env_settings.get("db_cursor_prefetch", 500))
+    export_chunk_bytes: int = int(env_settings.get("export_chunk_bytes", 256 * 1024))
+    lookup_cache_ttl_seconds: float = float(env_settings.get("lookup_cache_ttl_seconds", 300))
+    lookup_cache_max_entries: int = int(env_settings.get("lookup_cache_max_entries", 1024))
+    glossary_cache_ttl_seconds: float = float(env_settings.get("glossary_cache_ttl_seconds", 24 * 3600))
+    glossary_cache_max_entries: int = int(env_settings.get("glossary_cache_max_entries", 256))
+    glossary_version_check_seconds: float = float(env_settings.get("glossary_version_check_seconds", 5))
 
 
 settings = Settings()
@@ -0,0 +1,71 @@
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib json module is the fallback
+    orjson = None
+
+
+if orjson is not None:
+
+    def loads(data) -> Any:
+        return orjson.loads(data)
+
+    def dumps_bytes(value: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        return orjson.dumps(value, default=default)
+
+else:
+
+    def loads(data) -> Any:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    def dumps_bytes(value: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=default).encode("utf-8")
+
+
+def decode_jsonb(value: Any) -> Any:
+    """
+    Decoded value of a json/jsonb column: parsed here when the driver returned text (SQLAlchemy pool mode),
+    returned as-is when the native codec already decoded it (asyncpg pool mode). Only meant for object/array
+    documents; a top-level JSON string would be parsed twice.
+    """
+    if value is None or isinstance(value, (dict, list)):
+        return value
+    return loads(value)
+
+
+# jsonb binary wire format: a version byte (1) followed by the JSON text.
+_JSONB_VERSION = b"\x01"
+
+
+def _encode_jsonb(value: Any) -> bytes:
+    # queries pass documents already serialized with json.dumps; keep them byte-for-byte
+    if isinstance(value, str):
+        return _JSONB_VERSION + value.encode("utf-8")
+    return _JSONB_VERSION + dumps_bytes(value)
+
+
+def _decode_jsonb(data: bytes) -> Any:
+    return loads(memoryview(data)[1:])
+
+
+def _encode_json(value: Any) -> bytes:
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return dumps_bytes(value)
+
+
+async def register_jsonb_codecs(connection) -> None:
+    """
+    asyncpg pool init hook: decode json/jsonb straight from the binary protocol into Python objects, so rows
+    carry dicts instead of text that every caller json.loads again. Binary format keeps COPY working.
+    """
+    await connection.set_type_codec(
+        "jsonb", schema="pg_catalog", encoder=_encode_jsonb, decoder=_decode_jsonb, format="binary"
+    )
+    await connection.set_type_codec(
+        "json", schema="pg_catalog", encoder=_encode_json, decoder=loads, format="binary"
+    )
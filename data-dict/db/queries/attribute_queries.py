@@ -1,6 +1,6 @@
 from core.config import get_logger
 from db.session import db
-from db.queries.data_access import build_conditions
+from db.queries.data_access import build_conditions, fetch_page
 
 
 logger = get_logger(__name__)
@@ -81,49 +81,41 @@ async def delete_attributes_metadata_by_tenant(tenant_id):
     return await db.execute(query, tenant_id)
 
 
-async def search_attribute_data_dictionary(page, size, text, tenant_name, domainId):
-    # Define base queries
-    base_count_query = "SELECT COUNT(*) FROM attribute_entity ae"
-    base_attribute_query = "SELECT ae.metadata, de.name FROM attribute_entity ae JOIN domain_entity de ON ae.domain_id = de.id"
+# Primary keys first; COALESCE keeps the key non-NULL so it can be compared in a keyset cursor.
+# 'Is Primary Key' DESC with NULLs first, as before keyset paging; split in two keys because keyset
+# expressions must not be NULL
+ATTRIBUTE_SORT_KEYS = [
+    ("(ae.metadata ->> 'Is Primary Key') IS NULL", "desc"),
+    ("COALESCE(ae.metadata ->> 'Is Primary Key', '')", "desc"),
+    ("ae.field_name", "asc"),
+    ("ae.id", "asc"),
+]
 
-    # Define query conditions
-    conditions = []
-    if domainId:
-        conditions.append(("ae.domain_id = $%d" % (len(conditions) + 1), domainId))
-    if tenant_name:
-        conditions.append(("LOWER(ae.tenant_name) = LOWER($%d)" % (len(conditions) + 1), tenant_name))
-    if text:
-        conditions.append(("ae.name_description ~* $%d" % (len(conditions) + 1), text))
-
-    # Build count query
-    count_query, count_values = build_conditions(base_count_query, conditions)
-    total_count = await db.fetch_jsonb(count_query, *count_values)
 
-    # Build paginated query
-    offset = (page - 1) * size
-    attribute_query, attribute_values = build_conditions(base_attribute_query, conditions)
-    attribute_query += f" LIMIT ${len(attribute_values) + 1} OFFSET ${len(attribute_values) + 2}"
-    attribute_values.extend([size, offset])
+async def get_attributes_by_table_id(page, size, table_id, cursor=None):
+    conditions = [("ae.table_id = $1", table_id)]
+    return await fetch_page("ae.metadata", "FROM attribute_entity ae", conditions, ATTRIBUTE_SORT_KEYS, page, size, cursor)
 
-    records = await db.fetch_jsonb(attribute_query, *attribute_values)
-    return total_count, records
 
-
-async def get_attributes_by_table_id(page, size, table_id):
-    count_query = """
-        SELECT COUNT(*)
-        FROM attribute_entity ae
-        where ae.table_id = $1 \
+def iterate_attributes(table_id, domain_name, tenant_name):
     """
-    total_count = await db.fetch_jsonb(count_query, table_id)
-
-    data_query = """
+    Stream attribute metadata rows of a table, or of a whole domain/tenant, from a server-side cursor, in the
+    listing order of each table.
+    """
+    query = """
         SELECT ae.metadata
         FROM attribute_entity ae
-        where ae.table_id = $1 \
+            JOIN domain_entity de ON ae.domain_id = de.id
+            JOIN tenant_entity te2 ON ae.tenant_unique_id = te2.id \
     """
-    offset = (page - 1) * size
-    data_query += f" order by ae.metadata ->>'Is Primary Key' desc, ae.field_name asc LIMIT $2 OFFSET $3"
-
-    records = await db.fetch_jsonb(data_query, table_id, size, offset)
-    return total_count, records
+    conditions = []
+    if table_id:
+        conditions.append(("ae.table_id = $%d" % (len(conditions) + 1), table_id))
+    if domain_name:
+        conditions.append(("LOWER(de.name) = LOWER($%d)" % (len(conditions) + 1), domain_name))
+    if tenant_name:
+        conditions.append(("LOWER(te2.name) = LOWER($%d)" % (len(conditions) + 1), tenant_name))
+    query, values = build_conditions(query, conditions)
+    sort_keys = [("ae.table_name", "asc"), ("ae.table_id", "asc"), *ATTRIBUTE_SORT_KEYS]
+    query += " ORDER BY " + ", ".join(f"{expression} {direction}" for expression, direction in sort_keys)
+    return db.iterate(query, *values)
@@ -1,4 +1,8 @@
+import asyncio
+import base64
+import json
 from traceback import print_tb
+from typing import Any, List, Optional, Sequence, Tuple
 
 from core.config import get_logger
 from db.session import db
@@ -23,6 +27,114 @@ def build_conditions(base_query, conditions):
     return query, values
 
 
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def decode_cursor(cursor: str, key_count: int) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor; raises InvalidCursorError when it is malformed or was built for
+    other keys.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != key_count:
+        raise InvalidCursorError("Invalid cursor")
+    return values
+
+
+def _keyset_clause(sort_keys, first_param: int) -> str:
+    """
+    WHERE clause selecting the rows after the cursor position, one parameter per sort key starting at first_param.
+    Sort key expressions must not be NULL.
+    """
+    params = [f"${first_param + i}" for i in range(len(sort_keys))]
+    directions = {direction for _, direction in sort_keys}
+    if len(directions) == 1:
+        # row comparison so an index on the sort keys can be used
+        op = "<" if directions == {"desc"} else ">"
+        expressions = ", ".join(expression for expression, _ in sort_keys)
+        return f"({expressions}) {op} ({', '.join(params)})"
+    branches = []
+    for i, (expression, direction) in enumerate(sort_keys):
+        equal = [f"{sort_keys[j][0]} = {params[j]}" for j in range(i)]
+        equal.append(f"{expression} {'<' if direction == 'desc' else '>'} {params[i]}")
+        branches.append("(" + " AND ".join(equal) + ")")
+    return "(" + " OR ".join(branches) + ")"
+
+
+async def fetch_page(
+    columns: str,
+    source: str,
+    conditions,
+    sort_keys: Sequence[Tuple[str, str]],
+    page: int,
+    size: int,
+    cursor: Optional[str] = None,
+) -> Tuple[int, list, Optional[str]]:
+    """
+    Fetch one page of "SELECT {columns} {source}" filtered by conditions (build_conditions format) and ordered by
+    sort_keys ((expression, "asc"|"desc"), the last one unique). Returns (total, records, next_cursor).
+
+    Without a cursor the page is read with LIMIT/OFFSET and the total comes from COUNT(*) OVER() in the same
+    query; only a page past the end needs a second COUNT(*). With a cursor (the next_cursor of the previous page)
+    the page is read with a keyset predicate instead of OFFSET and the total is counted concurrently.
+    next_cursor is None on the last page.
+    """
+    where_query, values = build_conditions(source, conditions)
+    count_query = f"SELECT COUNT(*) AS count {where_query}"
+    order_by = ", ".join(f"{expression} {direction}" for expression, direction in sort_keys)
+    sort_columns = ", ".join(f"{expression} AS sort_{i}" for i, (expression, _) in enumerate(sort_keys))
+
+    if cursor:
+        after = decode_cursor(cursor, len(sort_keys))
+        keyset = _keyset_clause(sort_keys, len(values) + 1)
+        keyset_query = f"{where_query} {'AND' if len(values) else 'WHERE'} {keyset}"
+        page_values = [*values, *after, size + 1]
+        page_query = (
+            f"SELECT {columns}, {sort_columns} {keyset_query}"
+            f" ORDER BY {order_by} LIMIT ${len(page_values)}"
+        )
+        count_records, records = await asyncio.gather(
+            db.fetch_jsonb(count_query, *values),
+            db.fetch_jsonb(page_query, *page_values),
+        )
+        total = count_records[0]["count"] if count_records else 0
+    else:
+        offset = (max(page, 1) - 1) * size
+        page_values = [*values, size + 1, offset]
+        page_query = (
+            f"SELECT {columns}, {sort_columns}, COUNT(*) OVER() AS total_count {where_query}"
+            f" ORDER BY {order_by} LIMIT ${len(values) + 1} OFFSET ${len(values) + 2}"
+        )
+        # a page past the end needs a second, sequential query; let it reuse the page query's connection
+        async with db.request_connection():
+            records = await db.fetch_jsonb(page_query, *page_values)
+            if records:
+                total = records[0]["total_count"]
+            elif offset:
+                count_records = await db.fetch_jsonb(count_query, *values)
+                total = count_records[0]["count"] if count_records else 0
+            else:
+                total = 0
+
+    records = list(records)
+    next_cursor = None
+    if len(records) > size:
+        records = records[:size]
+        last = records[-1]
+        next_cursor = encode_cursor([last[f"sort_{i}"] for i in range(len(sort_keys))])
+    return total, records, next_cursor
+
+
 async def install_extension():
     logger.info("Installing the extension pg_trgm")
     result = await db.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
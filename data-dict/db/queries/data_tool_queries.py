@@ -0,0 +1,98 @@
+from core.config import get_logger, settings
+
+
+logger = get_logger(__name__)
+
+
+def _chunks(items: list, size: int):
+    size = max(1, size)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def delete_tenant_attributes(connection, domain_unique_id: str, tenant_unique_id: str):
+    query = """
+        DELETE FROM attribute_entity
+        WHERE domain_id = $1 AND tenant_unique_id = $2
+    """
+    return await connection.execute(query, domain_unique_id, tenant_unique_id)
+
+
+async def delete_tenant_tables(connection, domain_unique_id: str, tenant_unique_id: str):
+    query = """
+        DELETE FROM table_entity
+        WHERE domain_id = $1 AND tenant_unique_id = $2
+    """
+    return await connection.execute(query, domain_unique_id, tenant_unique_id)
+
+
+async def bulk_insert_tables(connection, table_metadata_list: list[str]) -> int:
+    """
+    Insert serialized table_metadata documents with one multi-row INSERT per chunk.
+    """
+    query = """
+        INSERT INTO table_entity (table_metadata)
+        SELECT doc::jsonb FROM unnest($1::text[]) AS t(doc)
+    """
+    for chunk in _chunks(table_metadata_list, settings.bulk_insert_chunk_size):
+        await connection.execute(query, chunk)
+    return len(table_metadata_list)
+
+
+async def bulk_insert_attributes(connection, attribute_metadata_list: list[str]) -> int:
+    """
+    Insert serialized attribute metadata documents with one multi-row INSERT per chunk.
+    """
+    query = """
+        INSERT INTO attribute_entity (metadata)
+        SELECT doc::jsonb FROM unnest($1::text[]) AS t(doc)
+    """
+    for chunk in _chunks(attribute_metadata_list, settings.bulk_insert_chunk_size):
+        await connection.execute(query, chunk)
+    return len(attribute_metadata_list)
+
+
+async def get_tenant_tables_kba(connection, domain_unique_id: str, tenant_unique_id: str):
+    query = """
+        SELECT te.id, te.table_name, te.table_metadata ->> 'Product Domain' AS product_domain, te.createdat
+        FROM table_entity te
+        WHERE te.domain_id = $1 AND te.tenant_unique_id = $2
+    """
+    return await connection.fetch(query, domain_unique_id, tenant_unique_id)
+
+
+async def get_tenant_attributes_kba(connection, tenant_unique_id: str):
+    query = """
+        SELECT ae.id, ae.table_id, ae.field_name, ae.metadata ->> 'Product Domain' AS product_domain, ae.createdat
+        FROM attribute_entity ae
+        WHERE ae.tenant_unique_id = $1
+    """
+    return await connection.fetch(query, tenant_unique_id)
+
+
+async def bulk_upsert_tables(connection, table_metadata_list: list[str]) -> int:
+    """
+    Insert or replace table_metadata documents by their id, one statement per chunk.
+    """
+    query = """
+        INSERT INTO table_entity (table_metadata)
+        SELECT doc::jsonb FROM unnest($1::text[]) AS t(doc)
+        ON CONFLICT (id) DO UPDATE SET table_metadata = EXCLUDED.table_metadata
+    """
+    for chunk in _chunks(table_metadata_list, settings.bulk_insert_chunk_size):
+        await connection.execute(query, chunk)
+    return len(table_metadata_list)
+
+
+async def bulk_upsert_attributes(connection, attribute_metadata_list: list[str]) -> int:
+    """
+    Insert or replace attribute metadata documents by their id, one statement per chunk.
+    """
+    query = """
+        INSERT INTO attribute_entity (metadata)
+        SELECT doc::jsonb FROM unnest($1::text[]) AS t(doc)
+        ON CONFLICT (id) DO UPDATE SET metadata = EXCLUDED.metadata
+    """
+    for chunk in _chunks(attribute_metadata_list, settings.bulk_insert_chunk_size):
+        await connection.execute(query, chunk)
+    return len(attribute_metadata_list)
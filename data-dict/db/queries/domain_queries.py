@@ -1,9 +1,17 @@
-from core.config import get_logger
+import json
+
+from core.config import get_logger, settings
+from db.jsonb import decode_jsonb
 from db.session import db
+from db.queries.tenant_queries import tenant_cache
+from utils.cache import TTLCache
 
 
 logger = get_logger(__name__)
 
+# Decoded domain metadata keyed by ("name", lower(name)) and ("id", id); cleared on every domain write.
+domain_cache = TTLCache("domain", settings.lookup_cache_ttl_seconds, settings.lookup_cache_max_entries)
+
 
 async def get_domain(name: str):
     query = "SELECT metadata as domain_metadata FROM domain_entity WHERE LOWER(name) = LOWER($1)"
@@ -11,6 +19,37 @@ async def get_domain(name: str):
     return record
 
 
+async def get_domain_metadata(name: str):
+    """
+    Cached, decoded metadata of the domain called name (case-insensitive), or None when it does not exist.
+    The returned dict is shared; do not modify it. Misses are not cached. For read endpoints only: the cache is
+    per process, so write paths must decide on get_domain.
+    """
+    async def load():
+        record = await get_domain(name)
+        if not record:
+            return None
+        metadata = decode_jsonb(record['domain_metadata'])
+        domain_cache.set(("id", metadata.get('id')), metadata)
+        return metadata
+
+    return await domain_cache.get_or_load(("name", name.lower()), load, cache_empty=False)
+
+
+def invalidate_domain_cache(id: str = None, name: str = None):
+    """
+    Drop a domain from the lookup cache; everything when its name is unknown. Tenant lookups embed the domain
+    metadata, so they are dropped as well.
+    """
+    cached = domain_cache.get(("id", id)) if id else None
+    names = {name, cached.get('name') if cached else None} - {None}
+    if names:
+        domain_cache.invalidate(("id", id), *(("name", domain_name.lower()) for domain_name in names))
+    else:
+        domain_cache.clear()
+    tenant_cache.clear()
+
+
 async def insert_domain(id: str, metadata: str):
     query = """
         INSERT INTO domain_entity (fqnhash, metadata)
@@ -18,6 +57,7 @@ async def insert_domain(id: str, metadata: str):
             RETURNING id \
     """
     record = await db.execute(query, id, metadata)
+    invalidate_domain_cache(id, json.loads(metadata).get('name'))
     return record
 
 
@@ -28,6 +68,7 @@ async def update_domain(id: str, metadata: str):
          WHERE id = $1 \
     """
     record = await db.execute(query, id, metadata)
+    invalidate_domain_cache(id, json.loads(metadata).get('name'))
     return record
 
 
@@ -42,7 +83,9 @@ async def delete_domain_metadata_by_domainId(domain_unique_id):
         DELETE FROM domain_entity
          WHERE id = $1 \
     """
-    return await db.execute(query, domain_unique_id)
+    result = await db.execute(query, domain_unique_id)
+    invalidate_domain_cache(domain_unique_id)
+    return result
 
 
 async def search_domain_data_dictionary(text):
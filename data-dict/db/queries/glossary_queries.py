@@ -1,13 +1,57 @@
-import json
 import time
 
 from core.config import get_logger
+from core.constants import RollupLevel
+from db.jsonb import decode_jsonb
 from db.session import db
 
 
 logger = get_logger(__name__)
 
 
+def _flat_field(r):
+    return {
+        # "glossary_key": r["glossary_key"],
+        "tool": r["tool"],
+        "product": r["product"],
+        "product_domain": r["product_domain"],
+        "template_name": r["template_name"],
+        "template_type": r["template_type"],
+        "template_description": r["template_description"],
+        "field_name": r["field_name"],
+        "description": r["description"],
+        "data_type": r["data_type"],
+        "rule_type": r["rule_type"],
+        "rules": r["rules"],
+        "format": r["format"],
+        "ai_enhanced_field_description": r["ai_enhanced_field_description"],
+        "sample_data": r["sample_data"],
+        "additional_field_description": r["additional_field_description"],
+    }
+
+
+def _level1_group(r):
+    return {
+        "level1": r["level1"],
+        "fields": decode_jsonb(r["fields"]),
+    }
+
+
+def _level2_group(r):
+    return {
+        "level2": r["level2"],
+        "level2_children": decode_jsonb(r["level1_children"]),
+    }
+
+
+# rollup level -> (paged SQL function, row shaping); deeper levels return flat rows nested by the service
+_ROLLUP_PAGES = {
+    RollupLevel.FIELD: ("rollup_flat_fields", _flat_field),
+    RollupLevel.TEMPLATE: ("rollup_group_level1_paginated", _level1_group),
+    RollupLevel.PRODUCT_DOMAIN: ("rollup_group_level2_paginated", _level2_group),
+}
+
+
 async def glossary_count_fields(glossary_key):
     query = """
         select * from count_fields($1)
@@ -52,27 +96,7 @@ async def glossary_rollup_0(page: int, size: int, glossary_key: list, rollup: in
             },
         )
         records = await db.fetch_jsonb(query, glossary_key, page, size)
-        result = [
-            {
-                # "glossary_key": r["glossary_key"],
-                "tool": r["tool"],
-                "product": r["product"],
-                "product_domain": r["product_domain"],
-                "template_name": r["template_name"],
-                "template_type": r["template_type"],
-                "template_description": r["template_description"],
-                "field_name": r["field_name"],
-                "description": r["description"],
-                "data_type": r["data_type"],
-                "rule_type": r["rule_type"],
-                "rules": r["rules"],
-                "format": r["format"],
-                "ai_enhanced_field_description": r["ai_enhanced_field_description"],
-                "sample_data": r["sample_data"],
-                "additional_field_description": r["additional_field_description"],
-            }
-            for r in records
-        ]
+        result = [_flat_field(r) for r in records]
 
         logger.info(
             "done glossary_rollup_0",
@@ -110,13 +134,7 @@ async def glossary_rollup_1(page: int, size: int, glossary_key: list, rollup: in
             },
         )
         records = await db.fetch_jsonb(query, glossary_key, page, size)
-        result = [
-            {
-                "level1": r["level1"],
-                "fields": json.loads(r["fields"]),
-            }
-            for r in records
-        ]
+        result = [_level1_group(r) for r in records]
 
         logger.info(
             "done glossary_rollup_1",
@@ -155,13 +173,7 @@ async def glossary_rollup_2(page: int, size: int, glossary_key: list, rollup: in
         )
 
         records = await db.fetch_jsonb(query, glossary_key, page, size)
-        result = [
-            {
-                "level2": r["level2"],
-                "level2_children": json.loads(r["level1_children"]),
-            }
-            for r in records
-        ]
+        result = [_level2_group(r) for r in records]
 
         logger.info(
             "done glossary_rollup_2",
@@ -222,6 +234,73 @@ async def glossary_rollup_n(page: int, size: int, glossary_key: list, rollup: in
         raise e
 
 
+def _glossary_page_query(function: str) -> str:
+    return f"""
+        SELECT c.total, r.*
+        FROM count_fields($1) AS c(total)
+        LEFT JOIN LATERAL (
+            SELECT true AS page_row, p.* FROM {function}($1, $2, $3) p
+        ) r ON true
+    """
+
+
+async def glossary_page(page: int, size: int, glossary_key: list, rollup: int):
+    """
+    Total field count and one rollup page in a single statement and pool checkout, instead of
+    glossary_count_fields followed by glossary_rollup_*. The page is lateral-joined to the count, so a page past
+    the end still returns the total. Returns (total, records); records are shaped like glossary_rollup_0/1/2,
+    or raw rollup_flat_fields rows for deeper rollups.
+    """
+    function, shape = _ROLLUP_PAGES.get(rollup, ("rollup_flat_fields", None))
+    query = _glossary_page_query(function)
+    try:
+        logger.info(
+            "start glossary_page",
+            extra={
+                "function": "glossary_page",
+                "glossary_key": glossary_key,
+                "rollup": rollup,
+                "page": page,
+                "size": size,
+            },
+        )
+
+        rows = await db.fetch_jsonb(query, glossary_key, page, size)
+        total = rows[0]["total"] if rows else 0
+        records = [r for r in rows if r["page_row"]]
+        if shape is not None:
+            records = [shape(r) for r in records]
+
+        logger.info(
+            "done glossary_page",
+            extra={
+                "function": "glossary_page",
+                "total": total,
+                "rows": len(records),
+            },
+        )
+        return total, records
+    except Exception:
+        logger.error(
+            "error glossary_page",
+            exc_info=True,
+            extra={
+                "function": "glossary_page",
+                "page": page,
+                "size": size,
+            },
+        )
+        raise
+
+
+def iterate_glossary_page(page: int, size: int, glossary_key: list):
+    """
+    Stream the glossary_page rows of the flat rollup_flat_fields page from a server-side cursor, for callers
+    that fold rows as they arrive. Every row carries total; only rows with page_row set are page records.
+    """
+    return db.iterate(_glossary_page_query("rollup_flat_fields"), glossary_key, page, size)
+
+
 async def get_glossary_by_key(key: str):
     query = """
         select * from glossary where lower(glossary_key) = lower($1)
@@ -229,8 +308,68 @@ async def get_glossary_by_key(key: str):
     return await db.fetch_one(query, key)
 
 
+def iterate_glossary(search_texts: list = None):
+    """
+    Stream glossary_key/metadata rows ordered by key from a server-side cursor; with search_texts, only keys
+    containing any of them (case-insensitive).
+    """
+    query = "SELECT g.glossary_key, g.metadata FROM glossary g"
+    values = []
+    if search_texts:
+        patterns = [
+            "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            for text in search_texts
+        ]
+        query += " WHERE g.glossary_key ILIKE ANY($1::text[])"
+        values.append(patterns)
+    query += " ORDER BY g.glossary_key"
+    return db.iterate(query, *values)
+
+
 async def remove_all_glossary():
     query = """
         TRUNCATE TABLE glossary;
     """
     return await db.execute(query)
+
+
+async def create_glossary_staging(connection):
+    query = """
+        CREATE TEMP TABLE glossary_staging (metadata jsonb NOT NULL) ON COMMIT DROP
+    """
+    return await connection.execute(query)
+
+
+async def copy_glossary_staging(connection, metadata_list: list[str]):
+    return await connection.copy_records_to_table(
+        "glossary_staging",
+        records=[(metadata,) for metadata in metadata_list],
+        columns=["metadata"],
+    )
+
+
+async def replace_glossary_from_staging(connection):
+    # DELETE instead of TRUNCATE: readers keep seeing the previous glossary until the transaction commits.
+    await connection.execute("DELETE FROM glossary")
+    query = """
+        INSERT INTO glossary (metadata)
+        SELECT metadata FROM glossary_staging
+    """
+    return await connection.execute(query)
+
+
+async def get_glossary_version():
+    query = "SELECT version FROM glossary_version WHERE id = 1"
+    record = await db.fetch_one(query)
+    return record["version"] if record else 0
+
+
+async def bump_glossary_version(connection):
+    query = """
+        UPDATE glossary_version
+        SET version = version + 1, loaded_at = now()
+        WHERE id = 1
+        RETURNING version
+    """
+    record = await connection.fetchrow(query)
+    return record["version"] if record else None
@@ -0,0 +1,86 @@
+import re
+
+from core.config import get_logger
+from db.session import db
+
+
+logger = get_logger(__name__)
+
+
+SEARCH_LEVELS = ("attribute", "table", "tenant")
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def build_tsquery(text: str) -> str:
+    """
+    Prefix OR-query over the words of text ("cust id" -> "cust:* | id:*"), matching the any-word semantics of
+    the former "(cust|id)" regex search. Returns '' when text has no words.
+    """
+    return " | ".join(f"{word.lower()}:*" for word in _WORD_RE.findall(text or ""))
+
+
+def _level_query(level, select, source, filters):
+    where = " AND ".join(["(x.search_tsv @@ q.tsq OR q.raw <% x.name_description)", *filters])
+    rank = "ts_rank_cd(x.search_tsv, q.tsq) + word_similarity(q.raw, x.name_description)"
+    return f"""
+        SELECT '{level}' AS level, {select}, de.name, {rank} AS rank, x.id
+        FROM q, {source} JOIN domain_entity de ON x.domain_id = de.id
+        WHERE {where}"""
+
+
+async def search_data_dictionary(page, size, text, domain_name, tenant_name):
+    """
+    Ranked search over attributes, tables and tenants in one statement.
+
+    Rows match on the search_tsv full-text columns (prefix match on any word) or on trigram word similarity
+    of name_description, both served by GIN indexes. Like the former search, only the most specific level with
+    any hit is returned (attributes, then tables, then tenants). Returns (level, total, records) where records
+    carry metadata and the domain name, ordered by rank; level is None when nothing matched.
+    """
+    tsquery = build_tsquery(text)
+    if not tsquery:
+        return None, 0, []
+
+    values = [tsquery, text]
+    filters = {"attribute": [], "table": [], "tenant": []}
+    if domain_name:
+        values.append(domain_name)
+        for level in SEARCH_LEVELS:
+            filters[level].append(f"LOWER(de.name) = LOWER(${len(values)})")
+    if tenant_name:
+        values.append(tenant_name)
+        filters["attribute"].append(f"LOWER(x.tenant_name) = LOWER(${len(values)})")
+        filters["table"].append(f"LOWER(x.tenant_name) = LOWER(${len(values)})")
+        filters["tenant"].append(f"LOWER(x.name) = LOWER(${len(values)})")
+
+    query = f"""
+        WITH q AS (
+            SELECT to_tsquery('simple', $1) AS tsq, $2::text AS raw
+        ),
+        hits AS ({_level_query("attribute", "x.metadata", "attribute_entity x", filters["attribute"])}
+            UNION ALL{_level_query("table", "x.table_metadata", "table_entity x", filters["table"])}
+            UNION ALL{_level_query("tenant", "x.metadata", "tenant_entity x", filters["tenant"])}
+        ),
+        chosen AS (
+            SELECT level, COUNT(*) AS total
+            FROM hits
+            GROUP BY level
+            ORDER BY array_position(ARRAY['attribute', 'table', 'tenant'], level)
+            LIMIT 1
+        )
+        SELECT h.level, h.metadata, h.name, c.total
+        FROM hits h JOIN chosen c ON h.level = c.level
+        ORDER BY h.rank DESC, h.id \
+    """
+    offset = (max(page, 1) - 1) * size
+    page_query = query + f" LIMIT ${len(values) + 1} OFFSET ${len(values) + 2}"
+    records = await db.fetch_jsonb(page_query, *values, size, offset)
+    if not records and offset:
+        # page past the end: still report the level and total of the full result
+        head = await db.fetch_jsonb(query + " LIMIT 1", *values)
+        if head:
+            return head[0]["level"], head[0]["total"], []
+    if not records:
+        return None, 0, []
+    return records[0]["level"], records[0]["total"], records
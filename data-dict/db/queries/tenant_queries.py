@@ -1,10 +1,15 @@
-from core.config import get_logger
+from core.config import get_logger, settings
+from db.jsonb import decode_jsonb
 from db.session import db
-from db.queries.data_access import build_conditions
+from utils.cache import TTLCache
 
 
 logger = get_logger(__name__)
 
+# Decoded (tenant, domain) metadata pairs keyed by the lower-cased lookup names; cleared on every tenant or
+# domain write.
+tenant_cache = TTLCache("tenant", settings.lookup_cache_ttl_seconds, settings.lookup_cache_max_entries)
+
 
 async def get_tenants(tenant_name: str, domain_name: str):
     query = """
@@ -28,6 +33,23 @@ async def get_tenants(tenant_name: str, domain_name: str):
     return records
 
 
+async def get_tenants_metadata(tenant_name: str, domain_name: str):
+    """
+    Cached get_tenants: a list of decoded (tenant_metadata, domain_metadata) pairs ordered by tenant name.
+    The returned dicts are shared; do not modify them. Empty results are not cached. For read endpoints only:
+    the cache is per process, so write paths must decide on get_tenants.
+    """
+    async def load():
+        records = await get_tenants(tenant_name, domain_name)
+        return [
+            (decode_jsonb(record['tenant_metadata']), decode_jsonb(record['domain_metadata']))
+            for record in records
+        ]
+
+    key = ((tenant_name or "").lower(), (domain_name or "").lower())
+    return await tenant_cache.get_or_load(key, load, cache_empty=False)
+
+
 async def insert_tenant(metadata: str):
     query = """
         INSERT INTO tenant_entity (metadata)
@@ -35,6 +57,7 @@ async def insert_tenant(metadata: str):
             RETURNING id \
     """
     record = await db.execute(query, metadata)
+    tenant_cache.clear()
     return record
 
 
@@ -45,12 +68,14 @@ async def update_tenant(id: str, metadata: str):
         WHERE id = $1 \
     """
     record = await db.execute(query, id, metadata)
+    tenant_cache.clear()
     return record
 
 
 async def delete_tenant(id: str):
     query = "DELETE FROM tenant_entity WHERE id = $1"
     record = await db.execute(query, id)
+    tenant_cache.clear()
     return record
 
 
@@ -59,7 +84,9 @@ async def delete_tenants_metadata_by_domainId(domain_unique_id):
         DELETE FROM tenant_entity
         WHERE domain_id = $1 \
     """
-    return await db.execute(query, domain_unique_id)
+    result = await db.execute(query, domain_unique_id)
+    tenant_cache.clear()
+    return result
 
 
 async def get_all_tenants_names():
@@ -68,28 +95,11 @@ async def get_all_tenants_names():
     return records
 
 
-async def search_tenant_data_dictionary(text, tenant_name, domainId):
-    # Define base query
-    base_tenant_query = "SELECT te.metadata, de.name FROM tenant_entity te join domain_entity de on te.domain_id = de.id"
-
-    # Build dynamic conditions
-    conditions = []
-    if domainId:
-        conditions.append(("te.domain_id = $%d" % (len(conditions) + 1), domainId))
-    if tenant_name:
-        conditions.append(("LOWER(te.name) = LOWER($%d)" % (len(conditions) + 1), tenant_name))
-    if text:
-        conditions.append(("te.name_description ~* $%d" % (len(conditions) + 1), text))
-
-    # Build query
-    tenant_query, tenant_values = build_conditions(base_tenant_query, conditions)
-    records = await db.fetch_jsonb(tenant_query, *tenant_values)
-    return records
-
-
 async def delete_tenants_metadata_by_tenant(tenant_id):
     query = """
         DELETE FROM tenant_entity
         WHERE id = $1 \
     """
-    return await db.execute(query, tenant_id)
+    result = await db.execute(query, tenant_id)
+    tenant_cache.clear()
+    return result
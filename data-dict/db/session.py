@@ -1,12 +1,15 @@
 import asyncio
 import os
-from typing import Any, Iterable, Optional
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterable, Optional
 
 import asyncpg
 from google.cloud.sql.connector import Connector, IPTypes
 from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from core.config import settings
+from db.jsonb import register_jsonb_codecs
 
 
 class _TransactionAdapter:
@@ -45,6 +48,19 @@ class _ConnectionAdapter:
         result = await self._connection.exec_driver_sql(query, args)
         return result
 
+    async def driver_connection(self) -> asyncpg.Connection:
+        raw_connection = await self._connection.get_raw_connection()
+        return raw_connection.driver_connection
+
+    async def copy_records_to_table(self, table_name: str, *, records, columns=None, schema_name=None):
+        driver_connection = await self.driver_connection()
+        return await driver_connection.copy_records_to_table(
+            table_name,
+            records=records,
+            columns=columns,
+            schema_name=schema_name,
+        )
+
     def transaction(self):
         return _TransactionAdapter(self)
 
@@ -73,6 +89,38 @@ class _PoolAdapter:
         return _AcquireContext(self._engine)
 
 
+class _ScopedConnection:
+    """
+    One pooled connection lent to the sequential queries of a db.request_connection() block; acquired on first
+    use, released when the block ends. A query issued while it is busy takes its own pooled connection instead
+    of waiting, so concurrent queries in the block still run in parallel.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.busy = False
+        self.closed = False
+        self._acquire_context = None
+        self._connection = None
+
+    async def get(self):
+        if self._connection is None:
+            self._acquire_context = self.pool.acquire()
+            self._connection = await self._acquire_context.__aenter__()
+        return self._connection
+
+    async def release(self):
+        self.closed = True
+        # a query still running on the connection (e.g. from a task spawned in the block) releases it when done
+        if self.busy or self._acquire_context is None:
+            return
+        acquire_context, self._acquire_context, self._connection = self._acquire_context, None, None
+        await acquire_context.__aexit__(None, None, None)
+
+
+_scoped_connection: ContextVar[Optional[_ScopedConnection]] = ContextVar("_scoped_connection", default=None)
+
+
 class Database:
 
     def __init__(self):
@@ -87,20 +135,28 @@ class Database:
 
         self.connector = Connector()
 
+        # The engine backs db.session() (imports, submit) in both modes. Its pool opens connections on demand, but
+        # with db_pool_mode="asyncpg" they come on top of the asyncpg pool: the server may see up to
+        # db_pool_max_size + db_engine_pool_size + db_engine_max_overflow connections per worker.
+        engine_options = {
+            "pool_pre_ping": settings.db_pool_pre_ping,
+            "pool_size": settings.db_engine_pool_size,
+            "max_overflow": settings.db_engine_max_overflow,
+        }
         if os.getenv("ENV") == "local":
-            self.engine = create_async_engine(
-                self._build_local_url(),
-                pool_pre_ping=True,
-            )
+            self.engine = create_async_engine(self._build_local_url(), **engine_options)
         else:
             async_creator = self._build_cloud_async_creator(connect_type)
             self.engine = create_async_engine(
                 "postgresql+asyncpg://",
                 async_creator=async_creator,
-                pool_pre_ping=True,
+                **engine_options,
             )
 
-        self.pool = _PoolAdapter(self.engine)
+        if settings.db_pool_mode == "asyncpg":
+            self.pool = await self._create_asyncpg_pool(connect_type)
+        else:
+            self.pool = _PoolAdapter(self.engine)
         self.session_factory = async_sessionmaker(
             self.engine,
             class_=AsyncSession,
@@ -108,6 +164,9 @@ class Database:
         )
 
     async def disconnect(self):
+        if isinstance(self.pool, asyncpg.Pool):
+            await self.pool.close()
+
         if self.engine is not None:
             await self.engine.dispose()
             self.engine = None
@@ -124,35 +183,84 @@ class Database:
         await self.disconnect()
         await self.connect(connect_type)
 
-    async def fetch_jsonb(self, query: str, *args):
+    @asynccontextmanager
+    async def request_connection(self):
+        """
+        Reuse one pooled connection for the fetch/execute calls made sequentially inside the block, instead of one
+        checkout per query. Keep the block around database work only; the connection is held until it exits.
+        """
         if not self.pool:
             raise Exception("Database connection pool is not initialized.")
+        scoped = _ScopedConnection(self.pool)
+        token = _scoped_connection.set(scoped)
+        try:
+            yield
+        finally:
+            _scoped_connection.reset(token)
+            await scoped.release()
+
+    @asynccontextmanager
+    async def _acquire(self):
+        if not self.pool:
+            raise Exception("Database connection pool is not initialized.")
+        scoped = _scoped_connection.get()
+        if scoped is not None and scoped.pool is self.pool and not scoped.busy and not scoped.closed:
+            scoped.busy = True
+            try:
+                yield await scoped.get()
+            finally:
+                scoped.busy = False
+                if scoped.closed:
+                    await scoped.release()
+            return
         async with self.pool.acquire() as connection:
+            yield connection
+
+    async def request_connection_scope(self):
+        """
+        FastAPI dependency form of request_connection(): the queries a request makes one after another share one
+        pooled connection, acquired on its first query and released after the response.
+        """
+        async with self.request_connection():
+            yield
+
+    async def fetch_jsonb(self, query: str, *args):
+        async with self._acquire() as connection:
             return await connection.fetch(query, *args)
 
     async def fetch_one(self, query: str, *args):
-        if not self.pool:
-            raise Exception("Database connection pool is not initialized.")
-        async with self.pool.acquire() as connection:
+        async with self._acquire() as connection:
             return await connection.fetchrow(query, *args)
 
     async def execute(self, query: str, *args):
-        if not self.pool:
-            raise Exception("Database connection pool is not initialized.")
-        async with self.pool.acquire() as connection:
+        async with self._acquire() as connection:
             result = await connection.execute(query, *args)
             return str(result)
 
     async def execute_many(self, query_list: Iterable[str], *args):
-        if not self.pool:
-            raise Exception("Database connection pool is not initialized.")
-        async with self.pool.acquire() as connection:
+        async with self._acquire() as connection:
             result = []
             for query in query_list:
                 result_one = await connection.execute(query, *args)
                 result.append(str(result_one))
             return str(result)
 
+    async def iterate(self, query: str, *args, prefetch: Optional[int] = None) -> AsyncIterator[Any]:
+        """
+        Yield the rows of query from a server-side cursor, fetching prefetch rows per round trip.
+
+        Runs on its own pooled connection rather than the request-scoped one, because streaming response bodies
+        keep consuming rows after the request scope has ended.
+        """
+        if not self.pool:
+            raise Exception("Database connection pool is not initialized.")
+        async with self.pool.acquire() as connection:
+            if isinstance(connection, _ConnectionAdapter):
+                connection = await connection.driver_connection()
+            async with connection.transaction():
+                async for record in connection.cursor(query, *args, prefetch=prefetch or settings.db_cursor_prefetch):
+                    yield record
+
     def session(self) -> AsyncSession:
         if self.session_factory is None:
             raise Exception("Database session factory is not initialized.")
@@ -166,7 +274,31 @@ class Database:
         database_name = settings.db or "postgres"
         return f"postgresql+asyncpg://{user}@localhost:5432/{database_name}"
 
-    def _build_cloud_async_creator(self, connect_type):
+    async def _create_asyncpg_pool(self, connect_type) -> asyncpg.Pool:
+        """
+        Native asyncpg pool: no pre-ping round trip, and each connection keeps a prepared statement cache for the
+        fixed query strings in db/queries. With db_native_jsonb, json/jsonb columns arrive already decoded
+        (see db.jsonb.decode_jsonb).
+        """
+        pool_options = {
+            "min_size": settings.db_pool_min_size,
+            "max_size": settings.db_pool_max_size,
+            "statement_cache_size": settings.db_statement_cache_size,
+        }
+        if settings.db_native_jsonb:
+            pool_options["init"] = register_jsonb_codecs
+        if os.getenv("ENV") == "local":
+            dsn = self._build_local_url().replace("postgresql+asyncpg://", "postgresql://", 1)
+            return await asyncpg.create_pool(dsn, **pool_options)
+
+        getconn = self._build_cloud_async_creator(connect_type, statement_cache_size=settings.db_statement_cache_size)
+
+        async def connect(*_args, **_kwargs):
+            return await getconn()
+
+        return await asyncpg.create_pool(connect=connect, **pool_options)
+
+    def _build_cloud_async_creator(self, connect_type, **connect_kwargs):
         connector = self.connector
         if connector is None:
             raise RuntimeError("Cloud SQL connector is not initialized.")
@@ -181,6 +313,7 @@ class Database:
                     password=settings.postgres_key,
                     db=settings.db,
                     ip_type=IPTypes.PRIVATE,
+                    **connect_kwargs,
                 )
 
             return getconn
@@ -194,6 +327,7 @@ class Database:
                 db=settings.db,
                 ip_type=IPTypes.PRIVATE,
                 enable_iam_auth=True,
+                **connect_kwargs,
             )
 
         return getconn
@@ -53,8 +53,8 @@ class TenantVO(BaseModel):
     area: str = Field("", description="Area - The area of the tenant")
 
     @classmethod
-    def from_record(cls, tenant_metadata, domain_metadata):
-        return cls(
+    def from_record(cls, tenant_metadata, domain_metadata, **overrides):
+        values = dict(
             **tenant_metadata,
             domainName=domain_metadata.get("name", "") if domain_metadata else "",
             tenantName=tenant_metadata.get("Tenant Name", tenant_metadata.get("tenant_name", "")),
@@ -73,6 +73,8 @@ class TenantVO(BaseModel):
             productionDataVolumes=tenant_metadata.get("Production Data Volumes", ""),
             area=tenant_metadata.get("Area", ""),
         )
+        values.update(overrides)
+        return cls(**values)
 
 
 class TableVO(BaseModel):
@@ -103,8 +105,8 @@ class TableVO(BaseModel):
     attributes: List[Dict[str, Any]] = Field(default_factory=list, description="Attributes of the table")
 
     @classmethod
-    def from_record(cls, metadata):
-        return cls(
+    def from_record(cls, metadata, **overrides):
+        values = dict(
             id=metadata.get("id", ""),
             tableName=metadata.get("tableName", ""),
             domainId=metadata.get("domainId", ""),
@@ -131,6 +133,8 @@ class TableVO(BaseModel):
             createdAt=metadata.get("createdAt", ""),
             attributes=metadata.get("attributes", []),
         )
+        values.update(overrides)
+        return cls(**values)
 
 
 class TableResponseVO(BaseModel):
@@ -138,6 +142,7 @@ class TableResponseVO(BaseModel):
     total: int = Field(None, description="Total number of tables")
     page: int = Field(None, description="Page number")
     pageSize: int = Field(None, description="Page size")
+    nextCursor: Optional[str] = Field(None, description="Cursor of the next page; None on the last page")
 
 
 class AttributeVO(BaseModel):
@@ -174,8 +179,8 @@ class AttributeVO(BaseModel):
     updatedBy: str = Field("", description="The user who last updated the attribute")
 
     @classmethod
-    def from_record(cls, metadata):
-        return cls(
+    def from_record(cls, metadata, **overrides):
+        values = dict(
             **metadata,
             fieldName=metadata.get("Field Name", ""),
             domainName=metadata.get("Domain Name", metadata.get("Product", "")),
@@ -204,6 +209,8 @@ class AttributeVO(BaseModel):
             updatedAt=metadata.get("updatedAt", None),
             updatedBy=metadata.get("updatedBy", ""),
         )
+        values.update(overrides)
+        return cls(**values)
 
 
 class AttributeResponseVO(BaseModel):
@@ -211,6 +218,7 @@ class AttributeResponseVO(BaseModel):
     total: int = Field(None, description="Total number of attributes")
     page: int = Field(None, description="Page number")
     pageSize: int = Field(None, description="Page size")
+    nextCursor: Optional[str] = Field(None, description="Cursor of the next page; None on the last page")
 
 
 class DataDictionarySearchVo(BaseModel):
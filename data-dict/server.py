@@ -1,5 +1,5 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from api.domain_metadata_api import router as DomainMetadataRouter
 from api.tenant_metadata_api import router as TenantMetadataRouter
 from api.table_metadata_api import router as TableMetadataRouter
@@ -86,8 +86,21 @@ routers = [
 ]
 
 
+# read-only routers: the sequential queries of a request share one pooled connection (imports and submit keep
+# per-query checkouts, so no connection is held while a workbook downloads)
+scoped_routers = (
+    DomainMetadataRouter,
+    TenantMetadataRouter,
+    TableMetadataRouter,
+    AttributeMetadataRouter,
+    CommonRouter,
+    GlossaryRouter,
+)
+
+
 for routers, prefix in routers:
-    app.include_router(routers, prefix=prefix)
+    dependencies = [Depends(db.request_connection_scope)] if routers in scoped_routers else None
+    app.include_router(routers, prefix=prefix, dependencies=dependencies)
 
 
 app.add_middleware(
@@ -1,14 +1,13 @@
-import json as json_lib
+import asyncio
 import io
 from fastapi.responses import StreamingResponse
 from fastapi import HTTPException
-from google.cloud import storage
 from core.config import get_logger
+from db.jsonb import decode_jsonb
 from db.queries import domain_queries
-from db.queries import tenant_queries
-from db.queries import table_queries
-from db.queries import attribute_queries
+from db.queries import search_queries
 from core.config import settings
+from services.import_source import get_storage_client
 from models.models import DomainVO, TenantVO, TableVO, AttributeVO, TenantDatasetVO, DatasetVO, \
     SearchResultVO
 
@@ -19,42 +18,32 @@ logger = get_logger(__name__)
 class DataDictionaryService:
     async def get_domain(self, name: str) -> DomainVO:
         try:
-            record = await domain_queries.get_domain(name)
-            if not record:
+            metadata = await domain_queries.get_domain_metadata(name)
+            if not metadata:
                 return DomainVO()
-            return DomainVO.from_record(json_lib.loads(record['domain_metadata']))
+            return DomainVO.from_record(metadata)
         except Exception as e:
             logger.error(f"Error fetching Domain data: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
     async def search_data_dictionary(self, page, size, text, domain_name, tenant_name):
         try:
-            text = f"({'|'.join(text.split())})"
-            domainId = ''
-            if domain_name:
-                domain_metadata = await domain_queries.get_domain(domain_name)
-                domain = json_lib.loads(domain_metadata['domain_metadata'])
-                domainId = domain.get('id')
-
-            attributes_total_count, attribute_record = await attribute_queries.search_attribute_data_dictionary(page, size, text, tenant_name, domainId)
-            if attribute_record:
-                attributes_total_count = attributes_total_count[0]['count']
-                attribute_result = self._process_attribute_records(attribute_record)
+            level, total_count, records = await search_queries.search_data_dictionary(
+                page, size, text, domain_name, tenant_name
+            )
+            if level == "attribute":
+                attribute_result = self._process_attribute_records(records)
                 formatted_result = self._format_attribute_result(attribute_result)
-                return SearchResultVO(data=formatted_result, total=attributes_total_count, page=page, pageSize=size)
+                return SearchResultVO(data=formatted_result, total=total_count, page=page, pageSize=size)
 
-            table_total_count, table_record = await table_queries.search_table_data_dictionary(page, size, text, tenant_name, domainId)
-            if table_record:
-                table_total_count = table_total_count[0]['count']
-                table_result = self._process_table_records(table_record)
+            if level == "table":
+                table_result = self._process_table_records(records)
                 formatted_result = self._format_table_result(table_result)
-                return SearchResultVO(data=formatted_result, total=table_total_count, page=page, pageSize=size)
-
-            tenant_record = await tenant_queries.search_tenant_data_dictionary(text, tenant_name, domainId)
+                return SearchResultVO(data=formatted_result, total=total_count, page=page, pageSize=size)
 
-            tenant_result = [TenantVO.from_record(json_lib.loads(record['metadata']), domain_metadata=None)
-                                .copy(update={"domainName": record.get('name')}) for record in tenant_record]
-            return SearchResultVO(data=tenant_result, total=len(tenant_result), page=page, pageSize=size)
+            tenant_result = [TenantVO.from_record(decode_jsonb(record['metadata']), None, domainName=record['name'])
+                             for record in records]
+            return SearchResultVO(data=tenant_result, total=total_count, page=page, pageSize=size)
         except Exception as e:
             logger.error(f"Error fetching search data: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
@@ -62,9 +51,8 @@ class DataDictionaryService:
     def _process_attribute_records(self, records):
         attribute_result = {}
         for record in records:
-            print(record)
-            metadata = json_lib.loads(record['metadata'])
-            domain_name = record.get('name')
+            metadata = decode_jsonb(record['metadata'])
+            domain_name = record['name']
             attribute_vo = AttributeVO.from_record(metadata)
             # tenant_name = f"{attribute_vo.tenantName} - {attribute_vo.tenantId}"
             tenant_name = f"{domain_name} - {attribute_vo.tenantName}"
@@ -97,9 +85,8 @@ class DataDictionaryService:
     def _process_table_records(self, records):
         table_result = {}
         for record in records:
-            metadata = json_lib.loads(record['table_metadata'])
-            table_vo = TableVO.from_record(metadata)
-            domain_name = record.get('name')
+            table_vo = TableVO.from_record(decode_jsonb(record['metadata']))
+            domain_name = record['name']
             tenant_name = f"{domain_name} - {table_vo.tenantName}"
             table_name = table_vo.tableName
             if tenant_name not in table_result:
@@ -134,13 +121,12 @@ class DataDictionaryService:
     async def download_template(self):
         try:
             logger.info("Start downloading the template file")
-            client = storage.Client(project=settings.project_id)
             bucket_name = f"{settings.project_id}-data-dictionary"
             file_key = f"data/template/Data_Mesh_Dictionary_Template.xlsx"
 
-            bucket = client.bucket(bucket_name)
+            bucket = get_storage_client().bucket(bucket_name)
             blob = bucket.blob(file_key)
-            file_bytes = blob.download_as_bytes()
+            file_bytes = await asyncio.to_thread(blob.download_as_bytes)
 
             if not file_bytes:
                 raise HTTPException(status_code=404, detail="Template file not found")
@@ -1,90 +1,61 @@
+import asyncio
 import json
-import os
-import re
 import uuid
 from datetime import datetime
 import google.auth
-import pandas as pd
 from fastapi import HTTPException
-from google.cloud import storage
 from core.config import get_logger, settings
-from db.queries import data_access, domain_queries, tenant_queries, table_queries, attribute_queries, glossary_queries
+from db.jsonb import decode_jsonb
+from db.queries import data_access, data_tool_queries, domain_queries, tenant_queries, table_queries, attribute_queries, glossary_queries
+from db.session import db
+from services.glossary_impl import GlossaryService
+from services.import_source import get_import_source
+from utils.excel_utils import ExcelSheetReader
 
 
 logger = get_logger(__name__)
 
+# strong references to running cache warm-ups; the event loop only keeps weak ones
+_glossary_warm_tasks = set()
+
 
 class DataToolService:
 
     async def insert_data(self, key, file_name, template_type):
         try:
             # check key
-            project_id = settings.project_id
             data_key = settings.data_key
             if key != data_key:
                 return "Key not found"
 
-            download_path = await self.download_file_from_gcp(project_id, file_name)
-
             # Get the sheet names for the given file
             service_account_name = await self.get_service_account_name()
-            if template_type.lower() == 'mesh':
-                producer_data = await self.excel_to_data(download_path, target_sheet_name='Producer')
-                datasets_data = await self.excel_to_data(download_path, target_sheet_name='Data Sets')
-                attributes_data = await self.excel_to_data(download_path, target_sheet_name='Attributes')
-                domain_name, domain_unique_id = await self.insert_or_update_domain_metadata(producer_data, service_account_name)
-                tenant_name, tenant_unique_id, tenant_id = await self.insert_or_update_tenant_metadata(
-                    domain_name, domain_unique_id, producer_data, service_account_name)
-                await self.insert_or_update_table_metadata(
-                    attributes_data, datasets_data, domain_unique_id, service_account_name, tenant_unique_id, tenant_name, tenant_id)
-            elif template_type.lower() == 'kba':
-                templates_data = await self.excel_to_data(download_path, target_sheet_name='DataDict')
-                fields_data = await self.excel_to_data(download_path, target_sheet_name='DataDict')
-                domain_names_ids = await self.insert_or_update_domain_metadata_kba(templates_data, service_account_name)
-                tenants_names_ids = await self.insert_or_update_tenant_metadata_kba(domain_names_ids, templates_data, service_account_name)
-                await self.insert_or_update_table_metadata_kba(fields_data, templates_data, service_account_name, tenants_names_ids)
+            async with get_import_source().open(file_name) as download_path:
+                with ExcelSheetReader(download_path) as reader:
+                    if template_type.lower() == 'mesh':
+                        producer_data = reader.read_sheet('Producer')
+                        datasets_data = reader.read_sheet('Data Sets')
+                        # streamed straight into the loader, which groups attributes by table in one pass
+                        attributes_data = reader.iter_rows('Attributes')
+                        domain_name, domain_unique_id = await self.insert_or_update_domain_metadata(producer_data, service_account_name)
+                        tenant_name, tenant_unique_id, tenant_id = await self.insert_or_update_tenant_metadata(
+                            domain_name, domain_unique_id, producer_data, service_account_name)
+                        await self.insert_or_update_table_metadata(
+                            attributes_data, datasets_data, domain_unique_id, service_account_name, tenant_unique_id, tenant_name, tenant_id)
+                    elif template_type.lower() == 'kba':
+                        # templates and fields both come from the DataDict sheet; read it once and share the rows
+                        templates_data = reader.read_sheet('DataDict')
+                        fields_data = templates_data
+                        domain_names_ids = await self.insert_or_update_domain_metadata_kba(templates_data, service_account_name)
+                        tenants_names_ids = await self.insert_or_update_tenant_metadata_kba(domain_names_ids, templates_data, service_account_name)
+                        await self.insert_or_update_table_metadata_kba(fields_data, templates_data, service_account_name, tenants_names_ids)
             return "Data inserted successfully"
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error inserting or updating data: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
-    async def download_file_from_gcp(self, project_id, file_name):
-        logger.info("Start downloading the data file...")
-
-        client = storage.Client(project=project_id)
-
-        bucket_name = f"{project_id}-data-dictionary"
-        file_key = f"data/{file_name}"
-        download_path = f"/app/{file_name}"
-
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(file_key)
-        blob.download_to_filename(download_path)
-
-        if not os.path.exists(download_path):
-            raise HTTPException(status_code=500, detail="File download failed")
-        logger.info("End downloading the data file, path: %s", download_path)
-        return download_path
-
-    async def download_glossary_file_from_gcp(self, project_id, file_name):
-        logger.info("Start downloading the data file...")
-
-        client = storage.Client(project=project_id)
-
-        bucket_name = f"{project_id}-data-dictionary"
-        file_key = f"data/{file_name}"
-        download_path = f"/app/{file_name}"
-        os.makedirs(os.path.dirname(download_path), exist_ok=True)
-
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(file_key)
-        blob.download_to_filename(download_path)
-
-        if not os.path.exists(download_path):
-            raise HTTPException(status_code=500, detail="File download failed")
-        logger.info("End downloading the data file, path: %s", download_path)
-        return download_path
-
     async def insert_or_update_domain_metadata(self, producer_data, service_account_name):
         domain_name = producer_data[0]['Domain']
         domain_unique_id = str(uuid.uuid4())
@@ -95,9 +66,8 @@ class DataToolService:
             'updatedAt': int(datetime.now().timestamp()),
             'updatedBy': service_account_name,
         }
-        domain_exist_data = await domain_queries.get_domain(domain_name)
-        if domain_exist_data:
-            data_exist = json.loads(domain_exist_data['domain_metadata'])
+        data_exist = await self.get_domain_for_write(domain_name)
+        if data_exist:
             domain_unique_id = data_exist.get('id')
             domain_metadata['id'] = domain_unique_id
             domain_metadata['createdAt'] = int(data_exist.get('createdAt'))
@@ -121,9 +91,8 @@ class DataToolService:
                 'updatedAt': int(datetime.now().timestamp()),
                 'updatedBy': service_account_name,
             }
-            domain_exist_data = await domain_queries.get_domain(domain_name)
-            if domain_exist_data:
-                data_exist = json.loads(domain_exist_data['domain_metadata'])
+            data_exist = await self.get_domain_for_write(domain_name)
+            if data_exist:
                 domain_unique_id = data_exist.get('id')
                 domain_metadata['id'] = domain_unique_id
                 domain_metadata['createdAt'] = int(data_exist.get('createdAt'))
@@ -156,9 +125,8 @@ class DataToolService:
             **producer_data[0]
         }
 
-        tenant_exist_data = await tenant_queries.get_tenants(tenant_name, domain_name)
-        if tenant_exist_data:
-            tenant_json = json.loads(tenant_exist_data[0]['tenant_metadata'])
+        tenant_json = await self.get_tenant_for_write(tenant_name, domain_name)
+        if tenant_json:
             tenant_unique_id = tenant_json.get('id')
             tenant_metadata_dict['id'] = tenant_unique_id
             tenant_metadata_dict['createdAt'] = int(tenant_json.get('createdAt'))
@@ -187,9 +155,8 @@ class DataToolService:
                 'createdAt': current_timestamp,
                 'domainId': domain_unique_id
             }
-            tenant_exist_data = await tenant_queries.get_tenants(tenant_name, domain_name)
-            if tenant_exist_data:
-                tenant_json = json.loads(tenant_exist_data[0]['tenant_metadata'])
+            tenant_json = await self.get_tenant_for_write(tenant_name, domain_name)
+            if tenant_json:
                 tenant_unique_id = tenant_json.get('id')
                 tenant_metadata_dict['id'] = tenant_unique_id
                 tenant_metadata_dict['createdAt'] = int(tenant_json.get('createdAt'))
@@ -202,15 +169,6 @@ class DataToolService:
 
     async def insert_or_update_table_metadata(self, attributes_data, datasets_data, domain_unique_id, service_account_name,
                                               tenant_unique_id, tenant_name, tenant_id):
-        # delete before insert
-        logger.info("Delete tables metadata of domain %s and tenant %s", domain_unique_id, tenant_unique_id)
-        delete_table_result = await table_queries.delete_tables_metadata(domain_unique_id, tenant_unique_id)
-        logger.info(delete_table_result)
-
-        logger.info("Delete attributes metadata of domain %s and tenant %s", domain_unique_id, tenant_unique_id)
-        delete_attributes_result = await attribute_queries.delete_attributes_metadata(domain_unique_id, tenant_unique_id)
-        logger.info(delete_attributes_result)
-
         table_dict = {table['Table Name']: table for table in datasets_data}
         for attribute in attributes_data:
             table_name = attribute['Table Name']
@@ -222,9 +180,12 @@ class DataToolService:
                 table_dict[table_name] = {'Table Name': table_name, 'attributesMetadata': ['']}
         combined_data = list(table_dict.values())
         combined_data = [item for item in combined_data if item.get('Table Name') and item.get('Tenant Name') and item.get('Table Description')]
+
+        table_rows = []
+        attribute_rows = []
+        current_timestamp = int(datetime.now().timestamp())
         for record in combined_data:
             unique_id = str(uuid.uuid4())
-            current_timestamp = int(datetime.now().timestamp())
             record['id'] = unique_id
             record['deleted'] = False
             record['domainId'] = domain_unique_id
@@ -236,20 +197,15 @@ class DataToolService:
             record['tenantName'] = tenant_name
             record['tenantId'] = tenant_id
             record['tableInfoMetadata'] = json.dumps({k: v for k, v in record.items() if k != 'attributesMetadata'})
+            table_rows.append(json.dumps(record))
 
-            # Insert new table
-            await table_queries.insert_table(json.dumps(record))
-
-            # insert attributes metadata
             if 'attributesMetadata' in record and record['attributesMetadata']:
                 table_unique_id = record['id']
                 table_description = str(record['Table Description'])
                 for attirbute_record in record['attributesMetadata']:
                     if attirbute_record != '':
-                        attribute_unique_id = str(uuid.uuid4())
-                        current_timestamp = int(datetime.now().timestamp())
                         attirbute_record = {
-                            'id': attribute_unique_id,
+                            'id': str(uuid.uuid4()),
                             'tableId': table_unique_id,
                             'domainId': domain_unique_id,
                             'tenantUniqueId': tenant_unique_id,
@@ -262,101 +218,115 @@ class DataToolService:
                             'Table Description': table_description,
                             **attirbute_record
                         }
+                        attribute_rows.append(json.dumps(attirbute_record))
 
-                        await attribute_queries.insert_attribute(json.dumps(attirbute_record))
+        # Full tenant reload in one transaction: readers see either the old or the new tenant, never a partial one.
+        async with db.session() as session:
+            async with session.begin():
+                connection = db.adapt_connection(await session.connection())
+                # attributes reference tables, so they go first
+                logger.info("Delete attributes and tables metadata of domain %s and tenant %s", domain_unique_id, tenant_unique_id)
+                logger.info(await data_tool_queries.delete_tenant_attributes(connection, domain_unique_id, tenant_unique_id))
+                logger.info(await data_tool_queries.delete_tenant_tables(connection, domain_unique_id, tenant_unique_id))
+
+                await data_tool_queries.bulk_insert_tables(connection, table_rows)
+                await data_tool_queries.bulk_insert_attributes(connection, attribute_rows)
+        logger.info("Loaded %s tables and %s attributes for tenant %s", len(table_rows), len(attribute_rows), tenant_unique_id)
 
     async def insert_or_update_table_metadata_kba(self, fields_data, templates_data, service_account_name, tenants_names_ids):
-        for tenant_name_id in tenants_names_ids:
-            tenant_unique_id = tenant_name_id.get('tenant_unique_id')
-            tenant_name = tenant_name_id.get('tenant_name')
-            domain_unique_id = tenant_name_id.get('domain_unique_id')
-            domain_name = tenant_name_id.get('domain_name')
-            templates_data_by_tenant = [
-                {**item, 'filed_list': [field for field in fields_data
-                                        if field['Product Domain'] == item['Product Domain'] and field['Template Name'] == item['Template Name']]}
-                for item in templates_data if item['Product'] == tenant_name
-            ]
-
-            for record in templates_data_by_tenant:
-                unique_id = str(uuid.uuid4())
-                current_timestamp = int(datetime.now().timestamp())
-                record['id'] = unique_id
-                record['deleted'] = False
-                record['domainId'] = domain_unique_id
-                record['tenantUniqueId'] = tenant_unique_id
-                record['createdAt'] = current_timestamp
-                record['updatedAt'] = current_timestamp
-                record['updatedBy'] = service_account_name
-                record['tableName'] = record['Template Name']
-                record['tenantName'] = tenant_name
-
-                existing_table = await table_queries.get_table_by_table_name_ids_kba(
-                    record['Template Name'], record['Product Domain'], domain_unique_id, tenant_unique_id)
-                if existing_table:
-                    # Update existing table
-                    table_json = json.loads(existing_table[0]['table_metadata'])
-                    table_unique_id = table_json.get('id')
-                    record['id'] = table_unique_id
-                    record['createdAt'] = int(table_json.get('createdAt'))
-                    await table_queries.update_table(table_unique_id, json.dumps(record))
-                else:
-                    # Insert new table
-                    await table_queries.insert_table(json.dumps(record))
-
-                # insert attributes metadata
-                if 'filed_list' in record and record['filed_list']:
-                    table_unique_id = record['id']
-                    for attirbute_record in record['filed_list']:
-                        attribute_unique_id = str(uuid.uuid4())
-                        current_timestamp = int(datetime.now().timestamp())
-                        attirbute_record = {
-                            'id': attribute_unique_id,
-                            'tableId': table_unique_id,
-                            'domainId': domain_unique_id,
-                            'tenantUniqueId': tenant_unique_id,
-                            'createdAt': current_timestamp,
-                            'updatedAt': current_timestamp,
-                            'updatedBy': service_account_name,
-                            'deleted': False,
-                            'tenantName': tenant_name,
-                            'Table Description': record['Template Description'],
-                            'Table Name': record['Template Name'],
-                            **attirbute_record
-                        }
-                        existing_attribute = await attribute_queries.get_attribute_by_name_table_id_kba(
-                            attirbute_record['Field Name'], attirbute_record['Product Domain'], table_unique_id, tenant_unique_id)
-                        if existing_attribute:
-                            # Update existing attribute
-                            attribute_json = json.loads(existing_attribute[0]['metadata'])
-                            attribute_unique_id = attribute_json.get('id')
-                            attirbute_record['id'] = attribute_unique_id
-                            attirbute_record['createdAt'] = int(attribute_json.get('createdAt'))
-                            await attribute_queries.update_attribute(attribute_unique_id, json.dumps(attirbute_record))
-                        else:
-                            await attribute_queries.insert_attribute(json.dumps(attirbute_record))
+        fields_by_template = {}
+        for field in fields_data:
+            fields_by_template.setdefault((field['Product Domain'], field['Template Name']), []).append(field)
+
+        # DataDict has one row per field, so every template repeats; the last row of a template wins as before.
+        templates_by_key = {}
+        for item in templates_data:
+            templates_by_key[(item['Product'], item['Product Domain'], item['Template Name'])] = item
+
+        async with db.session() as session:
+            async with session.begin():
+                connection = db.adapt_connection(await session.connection())
+                for tenant_name_id in tenants_names_ids:
+                    tenant_unique_id = tenant_name_id.get('tenant_unique_id')
+                    tenant_name = tenant_name_id.get('tenant_name')
+                    domain_unique_id = tenant_name_id.get('domain_unique_id')
+
+                    existing_tables = {}
+                    for row in await data_tool_queries.get_tenant_tables_kba(connection, domain_unique_id, tenant_unique_id):
+                        existing_tables.setdefault((str(row['table_name']), str(row['product_domain'])), row)
+                    existing_attributes = {}
+                    for row in await data_tool_queries.get_tenant_attributes_kba(connection, tenant_unique_id):
+                        existing_attributes.setdefault((str(row['field_name']), str(row['product_domain']), row['table_id']), row)
+
+                    table_rows = []
+                    attribute_rows = {}
+                    current_timestamp = int(datetime.now().timestamp())
+                    for (product, product_domain, template_name), item in templates_by_key.items():
+                        if product != tenant_name:
+                            continue
+                        record = {**item, 'filed_list': fields_by_template.get((product_domain, template_name), [])}
+                        record['id'] = str(uuid.uuid4())
+                        record['deleted'] = False
+                        record['domainId'] = domain_unique_id
+                        record['tenantUniqueId'] = tenant_unique_id
+                        record['createdAt'] = current_timestamp
+                        record['updatedAt'] = current_timestamp
+                        record['updatedBy'] = service_account_name
+                        record['tableName'] = record['Template Name']
+                        record['tenantName'] = tenant_name
+
+                        existing_table = existing_tables.get((str(template_name), str(product_domain)))
+                        if existing_table:
+                            record['id'] = existing_table['id']
+                            record['createdAt'] = int(existing_table['createdat'])
+                        table_rows.append(json.dumps(record))
+
+                        table_unique_id = record['id']
+                        for attirbute_record in record['filed_list']:
+                            attirbute_record = {
+                                'id': str(uuid.uuid4()),
+                                'tableId': table_unique_id,
+                                'domainId': domain_unique_id,
+                                'tenantUniqueId': tenant_unique_id,
+                                'createdAt': current_timestamp,
+                                'updatedAt': current_timestamp,
+                                'updatedBy': service_account_name,
+                                'deleted': False,
+                                'tenantName': tenant_name,
+                                'Table Description': record['Template Description'],
+                                'Table Name': record['Template Name'],
+                                **attirbute_record
+                            }
+                            attribute_key = (str(attirbute_record['Field Name']), str(attirbute_record['Product Domain']), table_unique_id)
+                            existing_attribute = existing_attributes.get(attribute_key)
+                            if existing_attribute:
+                                attirbute_record['id'] = existing_attribute['id']
+                                attirbute_record['createdAt'] = int(existing_attribute['createdat'])
+                            else:
+                                existing_attributes[attribute_key] = {'id': attirbute_record['id'], 'createdat': current_timestamp}
+                            attribute_rows[attirbute_record['id']] = json.dumps(attirbute_record)
+
+                    await data_tool_queries.bulk_upsert_tables(connection, table_rows)
+                    await data_tool_queries.bulk_upsert_attributes(connection, list(attribute_rows.values()))
+                    logger.info("Upserted %s tables and %s attributes for tenant %s", len(table_rows), len(attribute_rows), tenant_unique_id)
 
     async def get_sheet_names(self, file_path: str):
-        xls = pd.ExcelFile(file_path)
-        return xls.sheet_names
+        with ExcelSheetReader(file_path) as reader:
+            return reader.sheet_names
 
     async def excel_to_data(self, file_path: str, target_sheet_name: str = None):
-        # Read the Excel file using pandas
-        xls = pd.ExcelFile(file_path)
-        sheet_names = xls.sheet_names
+        with ExcelSheetReader(file_path) as reader:
+            return reader.read_sheet(target_sheet_name)
 
-        if target_sheet_name in sheet_names:
-            matched_sheet = target_sheet_name
-        else:
-            pattern = re.compile(target_sheet_name, re.IGNORECASE)
-            matching_sheets = [s for s in sheet_names if pattern.search(s)]
-            if not matching_sheets:
-                raise ValueError(f"No sheet found matching pattern: {target_sheet_name}")
-            matched_sheet = matching_sheets[0]
+    async def get_domain_for_write(self, domain_name):
+        # uncached: the lookup cache is per process and may miss writes of other workers
+        record = await domain_queries.get_domain(domain_name)
+        return decode_jsonb(record['domain_metadata']) if record else None
 
-        df = pd.read_excel(xls, sheet_name=matched_sheet, engine='openpyxl')
-        df = df.fillna('')
-        data = df.to_dict(orient='records')
-        return data
+    async def get_tenant_for_write(self, tenant_name, domain_name):
+        # uncached, see get_domain_for_write
+        records = await tenant_queries.get_tenants(tenant_name, domain_name)
+        return decode_jsonb(records[0]['tenant_metadata']) if records else None
 
     async def get_service_account_name(self):
         credentials, project_id = google.auth.default()
@@ -367,8 +337,7 @@ class DataToolService:
         return await data_access.install_extension()
 
     async def delete_attributes_metadata_by_domainId(self, domain_name):
-        domain = await domain_queries.get_domain(domain_name)
-        data_exist = json.loads(domain['domain_metadata'])
+        data_exist = await self.get_domain_for_write(domain_name)
         domain_unique_id = data_exist.get('id')
         # delete attributes metadata
         await attribute_queries.delete_attributes_metadata_by_domainId(domain_unique_id)
@@ -392,31 +361,45 @@ class DataToolService:
     async def insert_glossary(self, key, file_name):
         try:
             # check key
-            project_id = settings.project_id
             data_key = settings.data_key
             if key != data_key:
                 return "Key not found"
 
-            download_path = await self.download_glossary_file_from_gcp(project_id, file_name=f"glossary/{file_name}")
-            glossary_excel_data = await self.excel_to_data(download_path, target_sheet_name='DataDict')
-            if glossary_excel_data:
-                await glossary_queries.remove_all_glossary()
+            async with get_import_source().open(f"glossary/{file_name}") as download_path:
+                glossary_excel_data = await self.excel_to_data(download_path, target_sheet_name='DataDict')
 
-            insert_count = 0
+            # keys compare case-insensitively; the first row of a key wins
+            glossary_rows = {}
             for record in glossary_excel_data:
-                record['id'] = str(uuid.uuid4())
                 record['glossary_key'] = ':'.join([record['Tool'], record['Product'], record['Product Domain'], record['Template Name'], record['Field Name']])
-
-                glossary_exist_one = await glossary_queries.get_glossary_by_key(record['glossary_key'])
-                if glossary_exist_one is None:
-                    await data_access.insert_glossary(json.dumps(record))
-                    insert_count += 1
-                else:
-                    logger.info(f"Glossary already exists for key: {record['glossary_key']}, skipping insertion.")
+                dedup_key = record['glossary_key'].lower()
+                if dedup_key in glossary_rows:
+                    logger.debug(f"Glossary already exists for key: {record['glossary_key']}, skipping insertion.")
+                    continue
+                record['id'] = str(uuid.uuid4())
+                glossary_rows[dedup_key] = json.dumps(record)
+
+            if glossary_rows:
+                async with db.session() as session:
+                    async with session.begin():
+                        connection = db.adapt_connection(await session.connection())
+                        await glossary_queries.create_glossary_staging(connection)
+                        await glossary_queries.copy_glossary_staging(connection, list(glossary_rows.values()))
+                        await glossary_queries.replace_glossary_from_staging(connection)
+                        version = await glossary_queries.bump_glossary_version(connection)
+                # rebuild the cached rollup pages in the background so the import response is not delayed
+                task = asyncio.create_task(GlossaryService().glossary_reloaded(version))
+                _glossary_warm_tasks.add(task)
+                task.add_done_callback(_glossary_warm_tasks.discard)
+
+            insert_count = len(glossary_rows)
+            logger.info("Glossary loaded: %s rows, %s duplicate keys skipped", insert_count, len(glossary_excel_data) - insert_count)
             return {
                 "total_excel_rows": len(glossary_excel_data),
                 "inserted_rows": insert_count
             }
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error inserting glossary data: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,51 +1,119 @@
-from typing import List, Any, Dict
+from typing import AsyncIterable, List, Tuple
 from fastapi import HTTPException
-from core.config import get_logger
+from fastapi.responses import Response
+from core.config import get_logger, settings
+from db.jsonb import decode_jsonb, dumps_bytes
 from db.queries import glossary_queries
 from core.constants import RollupLevel
-from utils.trie_util import Trie, TrieNode
+from utils.cache import TTLCache
+from utils.export_utils import check_export_format, export_response
+from utils.trie_util import Trie
 
 
 logger = get_logger(__name__)
 
 
+# Rollup pages keyed by (version, glossary_key, rollup, page, size). The glossary load version is part of the
+# key, so a reload makes every older page unreachable at once, in every worker, without coordination.
+glossary_rollup_cache = TTLCache(
+    "glossary_rollup", settings.glossary_cache_ttl_seconds, settings.glossary_cache_max_entries
+)
+# How long a worker trusts the glossary_version row before re-reading it; reloads by other workers become
+# visible after at most this long.
+glossary_version_cache = TTLCache("glossary_version", settings.glossary_version_check_seconds, 1)
+
+
 class GlossaryService:
 
     async def glossary_by_key(self, page: int, size: int, glossary_key: list, rollup: int):
         try:
-            total_row = await glossary_queries.glossary_count_fields(glossary_key)
-            total = total_row[0]["count_fields"]
-            if rollup == RollupLevel.FIELD:
-                # If rollup is 0, fetch records by key without any grouping
-                result = await glossary_queries.glossary_rollup_0(page, size, glossary_key, rollup)
-            elif rollup == RollupLevel.TEMPLATE:
-                # If rollup is 1, fetch records with rollup level 1 and group by template
-                result = await glossary_queries.glossary_rollup_1(page, size, glossary_key, rollup)
-            elif rollup == RollupLevel.PRODUCT_DOMAIN:
-                # If rollup is 2, fetch records with rollup level 2 and group by product domain
-                result = await glossary_queries.glossary_rollup_2(page, size, glossary_key, rollup)
-            else:
-                # Default case, fetch records by key
-                records = await glossary_queries.glossary_rollup_n(page, size, glossary_key, rollup)
-                result = self.build_nested(records, rollup)
-
-            return {
-                "total": total,
-                "page": page,
-                "size": size,
-                "glossaries": result
-            }
-
+            version = await glossary_version_cache.get_or_load("version", glossary_queries.get_glossary_version)
+            key = (version, tuple(glossary_key), rollup, page, size)
+            body = await glossary_rollup_cache.get_or_load(
+                key, lambda: self._load_glossary_page(page, size, glossary_key, rollup)
+            )
+            return Response(content=body, media_type="application/json")
         except Exception as e:
             logger.error(f"Error fetching GLossary data: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
-    def build_nested(self, records, rollup: int):
+    async def _load_glossary_page(self, page: int, size: int, glossary_key: list, rollup: int) -> bytes:
+        """
+        Encoded JSON body of one glossary page; pages are cached as bytes, so hits skip serialization too.
+        """
+        if rollup in (RollupLevel.FIELD, RollupLevel.TEMPLATE, RollupLevel.PRODUCT_DOMAIN):
+            total, result = await glossary_queries.glossary_page(page, size, glossary_key, rollup)
+            glossaries = dumps_bytes(result, default=str)
+        else:
+            # deeper rollups come back as flat rows and are nested here by their levels
+            total, glossaries = await self.build_nested(
+                glossary_queries.iterate_glossary_page(page, size, glossary_key), rollup
+            )
+        head = dumps_bytes({"total": total, "page": page, "size": size}, default=str)
+        return head[:-1] + b',"glossaries":' + glossaries + b"}"
+
+    async def glossary_reloaded(self, version: int):
+        """
+        Called after a glossary load committed as version: switch this worker to it and recompute the pages that
+        were cached for the previous version, so browsing right after an import stays on the cache.
         """
-        Build a nested structure from the records based on the rollup level.
+        previous = [key for key in glossary_rollup_cache.keys() if key[0] != version]
+        glossary_version_cache.set("version", version)
+        glossary_rollup_cache.invalidate(*previous)
+        warmed = 0
+        for _, glossary_key, rollup, page, size in reversed(previous):
+            key = (version, glossary_key, rollup, page, size)
+            try:
+                await glossary_rollup_cache.get_or_load(
+                    key, lambda: self._load_glossary_page(page, size, list(glossary_key), rollup)
+                )
+                warmed += 1
+            except Exception as e:
+                logger.warning(f"Error warming glossary rollup {key}: {e}")
+        logger.info("Glossary version %s active, %s cached rollup pages rebuilt", version, warmed)
+
+    async def export_glossary(self, glossary_key: List[str], export_format: str = "xlsx"):
         """
+        Export glossary rows as a file. The columns are the keys of the first row's metadata (the columns of the
+        imported sheet), led by glossary_key.
+        """
+        export_format = check_export_format(export_format)
+        search_texts = [text for key in glossary_key or [] for text in key.split(";") if text]
+        records = glossary_queries.iterate_glossary(search_texts).__aiter__()
+        try:
+            try:
+                first = decode_jsonb((await records.__anext__())["metadata"])
+            except StopAsyncIteration:
+                first = None
+            headers = ["glossary_key"]
+            if first:
+                headers += [name for name in first if name not in ("glossary_key", "id")]
+
+            async def rows():
+                if first is None:
+                    return
+                yield [first.get(name) for name in headers]
+                async for record in records:
+                    metadata = decode_jsonb(record["metadata"])
+                    yield [metadata.get(name) for name in headers]
+
+            return await export_response(rows(), headers, export_format, "glossary", sheet_title="DataDict")
+        except Exception as e:
+            await records.aclose()
+            logger.error(f"Error exporting Glossary data: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+    async def build_nested(self, records: AsyncIterable, rollup: int) -> Tuple[int, bytes]:
+        """
+        Fold streamed glossary_page rows into a trie by their levels, the last rollup levels above the field,
+        and return (total, encoded nested glossaries).
+        """
+        total = 0
         trie = Trie()
-        for rec in records:
+        async for rec in records:
+            total = rec["total"]
+            if not rec["page_row"]:
+                continue
             levels: List[str] = rec.get("levels", [])
             if not isinstance(levels, list):
                 continue
@@ -65,35 +133,18 @@ class GlossaryService:
                 continue
 
             end_node = trie.insert_path(relevant_levels)
-            trie.add_field(end_node,
-                           field_info= {
-                               "template_type": rec.get("template_type"),
-                               "template_description": rec.get("template_description"),
-                               "field_name": fname,
-                               "description": rec.get("description"),
-                               "data_type": rec.get("data_type"),
-                               "rule_type": rec.get("data_type"),
-                               "rules": rec.get("rules"),
-                               "format": rec.get("format"),
-                               "ai_enhanced_field_description": rec.get("ai_enhanced_field_description"),
-                               "sample_data": rec.get("sample_data"),
-                               "additional_field_description": rec.get("additional_field_description")
-                               })
-
-        return self._trie_to_nested_by_leaf_depth(trie.root)
-
-    def _trie_to_nested_by_leaf_depth(self, node: TrieNode):
-        result = []
-        for level_value, child in node.children.items():
-            depth_from_leaf = child.depth_to_leaf
-            level_key = f"level{depth_from_leaf}"
-            child_key = "fields" if depth_from_leaf == 1 else f"{level_key}_children"
-
-            children = []
-            if child.children:
-                children.extend(self._trie_to_nested_by_leaf_depth(child))
-            if child.fields:
-                children.extend(child.fields)
-
-            result.append({level_key: level_value, child_key: children})
-        return result
+            trie.add_field(end_node, dumps_bytes({
+                "template_type": rec.get("template_type"),
+                "template_description": rec.get("template_description"),
+                "field_name": fname,
+                "description": rec.get("description"),
+                "data_type": rec.get("data_type"),
+                "rule_type": rec.get("rule_type"),
+                "rules": rec.get("rules"),
+                "format": rec.get("format"),
+                "ai_enhanced_field_description": rec.get("ai_enhanced_field_description"),
+                "sample_data": rec.get("sample_data"),
+                "additional_field_description": rec.get("additional_field_description")
+            }, default=str))
+
+        return total, trie.to_json()
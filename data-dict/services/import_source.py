@@ -0,0 +1,189 @@
+import abc
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+
+from fastapi import HTTPException
+from google.cloud import storage
+
+from core.config import get_logger, settings
+
+
+logger = get_logger(__name__)
+
+_client: Optional[storage.Client] = None
+_client_lock = threading.Lock()
+
+
+def get_storage_client() -> storage.Client:
+    """
+    Process-wide storage.Client; building one per call costs a credentials lookup and a new HTTP session.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = storage.Client(project=settings.project_id)
+    return _client
+
+
+def _new_temp_path(file_name: str) -> str:
+    suffix = os.path.splitext(file_name)[1]
+    fd, path = tempfile.mkstemp(prefix="import-", suffix=suffix, dir=settings.import_tmp_dir or None)
+    os.close(fd)
+    return path
+
+
+class ImportSource(abc.ABC):
+    """
+    Where import workbooks come from. open() yields a path to a regular on-disk file private to the request
+    (or an immutable cached copy), so concurrent imports of the same name never share a download target and the
+    Excel reader can seek/mmap it.
+    """
+
+    @abc.abstractmethod
+    def open(self, file_name: str):
+        ...
+
+
+class GcsImportSource(ImportSource):
+    """
+    Reads gs://{project_id}-data-dictionary/data/{file_name}.
+
+    The blob is streamed in import_download_chunk_bytes chunks on a worker thread, so the event loop keeps serving
+    other requests during the download. With import_cache_dir set, downloads are kept per object generation and
+    reused until the object changes in the bucket. Cached files are reference counted while requests hold them;
+    an old generation still in use is only deleted when its last holder is done with it.
+    """
+
+    def __init__(self, bucket_name: Optional[str] = None, cache_dir: Optional[str] = None):
+        self.bucket_name = bucket_name or f"{settings.project_id}-data-dictionary"
+        self.cache_dir = cache_dir if cache_dir is not None else settings.import_cache_dir
+        self._holders: Dict[str, int] = {}
+        self._stale: Set[str] = set()
+        self._cache_lock = threading.Lock()
+
+    def _cache_path(self, file_key: str, generation) -> str:
+        digest = hashlib.sha256(file_key.encode("utf-8")).hexdigest()[:32]
+        suffix = os.path.splitext(file_key)[1]
+        return os.path.join(self.cache_dir, f"{digest}-{generation}{suffix}")
+
+    def _download(self, blob, target_path: str) -> None:
+        chunk_size = settings.import_download_chunk_bytes
+        with blob.open("rb", chunk_size=chunk_size) as src, open(target_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, chunk_size)
+
+    def _fetch(self, file_key: str, target_path: str) -> Optional[str]:
+        """
+        Blocking part of open(): returns the cached path when the current generation is cached, otherwise downloads
+        into target_path (and promotes it into the cache) and returns None.
+        """
+        blob = get_storage_client().bucket(self.bucket_name).get_blob(file_key)
+        if blob is None:
+            raise HTTPException(status_code=404, detail="Import file not found")
+
+        if not self.cache_dir:
+            self._download(blob, target_path)
+            return None
+
+        cached = self._cache_path(file_key, blob.generation)
+        with self._cache_lock:
+            if os.path.exists(cached):
+                self._acquire(cached)
+                return cached
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # pin the generation we looked up so a concurrent overwrite cannot end up cached under the old one
+        blob = get_storage_client().bucket(self.bucket_name).blob(file_key, generation=blob.generation)
+        self._download(blob, target_path)
+        with self._cache_lock:
+            os.replace(target_path, cached)
+            self._acquire(cached)
+            self._drop_old_generations(cached)
+        return cached
+
+    def _acquire(self, cached: str) -> None:
+        self._holders[cached] = self._holders.get(cached, 0) + 1
+
+    def _release(self, cached: str) -> None:
+        with self._cache_lock:
+            remaining = self._holders.get(cached, 0) - 1
+            if remaining > 0:
+                self._holders[cached] = remaining
+                return
+            self._holders.pop(cached, None)
+            if cached in self._stale:
+                self._stale.discard(cached)
+                self._remove(cached)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _drop_old_generations(self, cached: str) -> None:
+        """
+        Delete the other cached generations of the same object; ones still held are deleted on their last release.
+        Called with _cache_lock held.
+        """
+        prefix = os.path.basename(cached).split("-", 1)[0] + "-"
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not name.startswith(prefix) or path == cached:
+                continue
+            if self._holders.get(path):
+                self._stale.add(path)
+            else:
+                self._remove(path)
+
+    @asynccontextmanager
+    async def open(self, file_name: str) -> AsyncIterator[str]:
+        file_key = f"data/{file_name}"
+        logger.info("Start downloading the data file %s", file_key)
+        target_path = _new_temp_path(file_name)
+        cached = None
+        try:
+            cached = await asyncio.to_thread(self._fetch, file_key, target_path)
+            path = cached or target_path
+            logger.info("End downloading the data file, path: %s", path)
+            yield path
+        finally:
+            if cached:
+                self._release(cached)
+            if os.path.exists(target_path):
+                os.remove(target_path)
+
+
+class LocalImportSource(ImportSource):
+    """
+    Reads {import_local_root}/data/{file_name} in place; used for local runs and tests.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = os.path.abspath(root or settings.import_local_root)
+
+    @asynccontextmanager
+    async def open(self, file_name: str) -> AsyncIterator[str]:
+        base = os.path.join(self.root, "data")
+        path = os.path.abspath(os.path.join(base, file_name))
+        if os.path.commonpath([base, path]) != base:
+            raise HTTPException(status_code=400, detail="Invalid file name")
+        if not os.path.isfile(path):
+            raise HTTPException(status_code=404, detail="Import file not found")
+        yield path
+
+
+_source: Optional[ImportSource] = None
+
+
+def get_import_source() -> ImportSource:
+    global _source
+    if _source is None:
+        _source = LocalImportSource() if settings.import_source == "local" else GcsImportSource()
+    return _source
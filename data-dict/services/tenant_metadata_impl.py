@@ -1,4 +1,3 @@
-import json as json_lib
 from typing import List
 
 from fastapi import HTTPException
@@ -16,15 +15,12 @@ class TenantMetadataService:
 
     async def get_tenants(self, tenant_name: str, domain_name: str) -> List[TenantVO]:
         try:
-            records = await tenant_queries.get_tenants(tenant_name, domain_name)
+            records = await tenant_queries.get_tenants_metadata(tenant_name, domain_name)
             if not records:
                 return []
             result = [
-                TenantVO.from_record(
-                    json_lib.loads(record['tenant_metadata']),
-                    json_lib.loads(record['domain_metadata'])
-                )
-                for record in records
+                TenantVO.from_record(tenant_metadata, domain_metadata)
+                for tenant_metadata, domain_metadata in records
             ]
             return result
         except Exception as e:
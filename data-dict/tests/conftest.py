@@ -0,0 +1,6 @@
+import os
+import sys
+
+
+# data-dict modules import each other from the data-dict directory (core.config, db.session, ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from utils.cache import TTLCache
+
+
+class _Loader:
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    cache = TTLCache("test-shared", ttl_seconds=60)
+    loader = _Loader({"v": 1})
+    loader.release.clear()
+
+    tasks = [asyncio.create_task(cache.get_or_load("k", loader)) for _ in range(3)]
+    await asyncio.sleep(0)
+    loader.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert loader.calls == 1
+    assert results[0] is results[1] is results[2]
+    assert await cache.get_or_load("k", loader) is results[0]
+    assert cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_load_is_raised_to_all_waiters_and_not_cached():
+    cache = TTLCache("test-failed", ttl_seconds=60)
+    loader = _Loader(RuntimeError("db down"), "value")
+    loader.release.clear()
+
+    tasks = [asyncio.create_task(cache.get_or_load("k", loader)) for _ in range(2)]
+    await asyncio.sleep(0)
+    loader.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert [str(r) for r in results] == ["db down", "db down"]
+    assert await cache.get_or_load("k", loader) == "value"
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_load_racing_an_invalidation_is_returned_but_not_cached():
+    cache = TTLCache("test-generation", ttl_seconds=60)
+    loader = _Loader("stale", "fresh")
+    loader.release.clear()
+
+    task = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+    cache.invalidate("k")
+    loader.release.set()
+
+    assert await task == "stale"
+    assert cache.get("k") is None
+    assert await cache.get_or_load("k", loader) == "fresh"
+    assert cache.get("k") == "fresh"
+
+
+@pytest.mark.asyncio
+async def test_cache_empty_false_does_not_cache_misses():
+    cache = TTLCache("test-cache-empty", ttl_seconds=60)
+    loader = _Loader(None, [], {"id": 1}, {"id": 2})
+
+    assert await cache.get_or_load("k", loader, cache_empty=False) is None
+    assert await cache.get_or_load("k", loader, cache_empty=False) == []
+    assert await cache.get_or_load("k", loader, cache_empty=False) == {"id": 1}
+    assert await cache.get_or_load("k", loader, cache_empty=False) == {"id": 1}
+    assert loader.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_empty_results_are_cached_by_default():
+    cache = TTLCache("test-cache-empty-default", ttl_seconds=60)
+    loader = _Loader([], ["unused"])
+
+    assert await cache.get_or_load("k", loader) == []
+    assert await cache.get_or_load("k", loader) == []
+    assert loader.calls == 1
+
+
+def test_lru_eviction_drops_least_recently_used():
+    cache = TTLCache("test-lru", ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.keys() == ["a", "c"]
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("utils.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache("test-ttl", ttl_seconds=10)
+    cache.set("k", "v")
+
+    now[0] = 110.0
+    assert cache.get("k") == "v"
+    now[0] = 110.5
+    assert cache.get("k") is None
+    assert cache.keys() == []
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_loads():
+    cache = TTLCache("test-disabled", ttl_seconds=0)
+    loader = _Loader(1, 2)
+
+    assert await cache.get_or_load("k", loader) == 1
+    assert await cache.get_or_load("k", loader) == 2
+    assert cache.keys() == []
@@ -0,0 +1,60 @@
+import base64
+
+import pytest
+
+from db.queries.data_access import InvalidCursorError, _keyset_clause, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    values = ["Customer name", None, 42, "ü/+"]
+
+    cursor = encode_cursor(values)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 4) == values
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"{not json").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    encode_cursor([]) + "x",
+])
+def test_decode_cursor_rejects_malformed_input(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, 2)
+
+
+@pytest.mark.parametrize("payload", [b'{"a": 1}', b'"text"', b"7"])
+def test_decode_cursor_rejects_non_list_values(payload):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(base64.urlsafe_b64encode(payload).decode().rstrip("="), 1)
+
+
+def test_decode_cursor_rejects_wrong_key_count():
+    cursor = encode_cursor(["a", "b"])
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, 3)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, 1)
+
+
+def test_invalid_cursor_error_is_a_value_error():
+    assert issubclass(InvalidCursorError, ValueError)
+
+
+def test_keyset_clause_same_direction_uses_row_comparison():
+    assert _keyset_clause([("a", "asc"), ("b", "asc")], 3) == "(a, b) > ($3, $4)"
+    assert _keyset_clause([("a", "desc"), ("b", "desc")], 1) == "(a, b) < ($1, $2)"
+
+
+def test_keyset_clause_mixed_directions_expands_to_or_of_prefixes():
+    clause = _keyset_clause([("a", "desc"), ("b", "asc"), ("c", "asc")], 2)
+
+    assert clause == (
+        "((a < $2)"
+        " OR (a = $2 AND b > $3)"
+        " OR (a = $2 AND b = $3 AND c > $4))"
+    )
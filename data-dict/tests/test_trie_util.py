@@ -0,0 +1,100 @@
+import json
+from collections import defaultdict
+
+from utils.trie_util import Trie
+
+
+class _RecursiveNode:
+    """
+    The dict-of-children node and recursive serializer GlossaryService used before the array-backed Trie, kept
+    here as the reference for the output shape.
+    """
+
+    def __init__(self):
+        self.children = defaultdict(_RecursiveNode)
+        self.fields = []
+        self.depth_to_leaf = 0
+
+    def insert_path(self, tokens):
+        node = self
+        for d, tok in enumerate(tokens):
+            node = node.children[tok]
+            if node.depth_to_leaf < d:
+                node.depth_to_leaf = d
+        return node
+
+
+def _trie_to_nested_by_leaf_depth(node):
+    result = []
+    for level_value, child in node.children.items():
+        depth_from_leaf = child.depth_to_leaf
+        level_key = f"level{depth_from_leaf}"
+        child_key = "fields" if depth_from_leaf == 1 else f"{level_key}_children"
+
+        children = []
+        if child.children:
+            children.extend(_trie_to_nested_by_leaf_depth(child))
+        if child.fields:
+            children.extend(child.fields)
+
+        result.append({level_key: level_value, child_key: children})
+    return result
+
+
+def _build_both(paths_and_fields):
+    trie, reference = Trie(), _RecursiveNode()
+    for tokens, field in paths_and_fields:
+        trie.add_field(trie.insert_path(tokens), json.dumps(field).encode("utf-8"))
+        reference.insert_path(tokens).fields.append(field)
+    return trie, reference
+
+
+def test_to_json_matches_recursive_serializer_on_mixed_depths():
+    trie, reference = _build_both([
+        (["Retail", "Payments", "Cards"], {"field_name": "pan"}),
+        (["Retail", "Payments"], {"field_name": "amount"}),
+        (["Retail", "Payments", "Cards"], {"field_name": "expiry"}),
+        (["Retail", "Loans"], {"field_name": "rate"}),
+        (["Corporate"], {"field_name": "lei"}),
+        (["Retail", "Payments", "Transfers", "SEPA"], {"field_name": "iban", "note": "ü \"quoted\""}),
+        (["Corporate", "Trade"], {"field_name": "incoterm"}),
+    ])
+
+    nested = json.loads(trie.to_json())
+
+    assert nested == _trie_to_nested_by_leaf_depth(reference)
+    # children come before the node's own fields, and depth 1 lists its children under "fields"
+    retail_payments = nested[0]["level0_children"][0]
+    assert retail_payments["level1"] == "Payments"
+    assert [list(item)[0] for item in retail_payments["fields"]] == ["level2", "level2", "field_name"]
+    assert list(nested[1]) == ["level0", "level0_children"]
+    assert nested[1]["level0_children"][-1] == {"field_name": "lei"}
+
+
+def test_to_json_keeps_insertion_order_of_siblings():
+    trie, reference = _build_both([
+        (["b"], {"n": 1}),
+        (["a"], {"n": 2}),
+        (["b", "z"], {"n": 3}),
+        (["b", "y"], {"n": 4}),
+    ])
+
+    assert json.loads(trie.to_json()) == _trie_to_nested_by_leaf_depth(reference)
+
+
+def test_to_json_empty_trie():
+    assert Trie().to_json() == b"[]"
+
+
+def test_to_json_handles_paths_deeper_than_the_recursion_limit():
+    depth = 5000
+    trie = Trie()
+    trie.add_field(trie.insert_path([f"t{i}" for i in range(depth)]), b'{"f":1}')
+
+    body = trie.to_json()
+
+    # json.loads itself recurses per nesting level, so check the bytes instead
+    assert body.startswith(b'[{"level0":"t0","level0_children":[{"level1":"t1","fields":[{"level2":"t2",')
+    last = depth - 1
+    assert body.endswith(b'{"level%d":"t%d","level%d_children":[{"f":1}' % (last, last, last) + b"]}" * depth + b"]")
+    assert body.count(b'{"level') == depth
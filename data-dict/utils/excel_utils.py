@@ -1,5 +1,13 @@
-import openpyxl
+import asyncio
+import os
+import re
+import tempfile
 from io import BytesIO
+from typing import AsyncIterable, Iterator, List, Optional, Sequence
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
 
 
 def write_excel(rows_iter, headers):
@@ -12,3 +20,155 @@ def write_excel(rows_iter, headers):
     wb.save(bio)
     bio.seek(0)
     return bio
+
+
+def _append_rows(ws, rows: List[Sequence]) -> None:
+    for row in rows:
+        ws.append(row)
+
+
+async def write_excel_file(
+    rows: AsyncIterable[Sequence],
+    headers: Sequence[str],
+    sheet_title: str = "Data",
+    batch_size: int = 1000,
+) -> str:
+    """
+    Write rows into a write-only workbook (bold header row) and save it to a temporary .xlsx file.
+
+    Write-only worksheets spool their rows to disk, so memory stays flat however many rows there are; rows are
+    appended and the workbook is zipped on a worker thread to keep the event loop free. Returns the file path;
+    the caller owns the file (see stream_file).
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title)
+    header_cells = []
+    for name in headers:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.font = Font(bold=True)
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            await asyncio.to_thread(_append_rows, ws, batch)
+            batch = []
+    if batch:
+        await asyncio.to_thread(_append_rows, ws, batch)
+
+    fd, path = tempfile.mkstemp(prefix="export-", suffix=".xlsx")
+    os.close(fd)
+    try:
+        await asyncio.to_thread(wb.save, path)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def stream_file(path: str, chunk_size: int) -> Iterator[bytes]:
+    """
+    Open path, unlink it right away and return an iterator over its content in chunk_size pieces. The data is
+    freed once the iterator is exhausted or dropped, even if the client disconnects mid-download.
+    """
+    handle = open(path, "rb")
+    os.remove(path)
+
+    def _chunks():
+        with handle:
+            while True:
+                chunk = handle.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    return _chunks()
+
+
+def _is_empty(value) -> bool:
+    return value is None or (isinstance(value, str) and value == '')
+
+
+def _normalize_headers(raw_headers) -> List:
+    """
+    Column names as pandas.read_excel builds them: blank headers become 'Unnamed: <i>' and repeated names get
+    a '.1', '.2', ... suffix.
+    """
+    headers = []
+    seen = {}
+    for i, name in enumerate(raw_headers):
+        if _is_empty(name):
+            name = f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            mangled = f"{name}.{seen[name]}"
+            while mangled in seen:
+                seen[name] += 1
+                mangled = f"{name}.{seen[name]}"
+            name = mangled
+        seen.setdefault(name, 0)
+        headers.append(name)
+    return headers
+
+
+class ExcelSheetReader:
+    """
+    Streams rows of an .xlsx workbook opened once in openpyxl read-only mode.
+
+    Rows come out as dicts keyed by the header row, with empty cells as '' and fully empty rows skipped, the same
+    shape excel_to_data used to produce through pandas (read_excel + fillna('') + to_dict('records')), without
+    loading a whole sheet into memory.
+    """
+
+    def __init__(self, file_path: str):
+        self._workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return self._workbook.sheetnames
+
+    def match_sheet(self, target_sheet_name: str) -> str:
+        sheet_names = self.sheet_names
+        if target_sheet_name in sheet_names:
+            return target_sheet_name
+        pattern = re.compile(target_sheet_name, re.IGNORECASE)
+        matching_sheets = [s for s in sheet_names if pattern.search(s)]
+        if not matching_sheets:
+            raise ValueError(f"No sheet found matching pattern: {target_sheet_name}")
+        return matching_sheets[0]
+
+    def iter_rows(self, target_sheet_name: str) -> Iterator[dict]:
+        """
+        Rows keyed by the header row. The column set is fixed before the first data row: the header row padded to
+        the sheet's max_column, so every row has the same keys; cells beyond that width are ignored.
+        """
+        worksheet = self._workbook[self.match_sheet(target_sheet_name)]
+        width = worksheet.max_column or 0
+        headers: Optional[List] = None
+        for values in worksheet.iter_rows(values_only=True):
+            if all(_is_empty(v) for v in values):
+                continue
+            if headers is None:
+                raw_headers = list(values)
+                raw_headers += [None] * (width - len(raw_headers))
+                headers = _normalize_headers(raw_headers)
+                continue
+            row = {}
+            for i, name in enumerate(headers):
+                value = values[i] if i < len(values) else None
+                row[name] = '' if value is None else value
+            yield row
+
+    def read_sheet(self, target_sheet_name: str) -> List[dict]:
+        return list(self.iter_rows(target_sheet_name))
+
+    def close(self):
+        self._workbook.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,120 @@
+import asyncio
+import csv
+import io
+import os
+import tempfile
+from typing import Any, AsyncIterable, AsyncIterator, List, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from core.config import settings
+from utils.excel_utils import stream_file, write_excel_file
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet export is optional; xlsx/csv work without it
+    pyarrow = None
+
+
+EXPORT_FORMATS = ("xlsx", "csv", "parquet")
+
+_MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def check_export_format(export_format: str) -> str:
+    """
+    Normalized export format; HTTP 400 for unknown formats and 501 for parquet without pyarrow installed.
+    """
+    export_format = (export_format or "xlsx").lower()
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{export_format}', use one of {EXPORT_FORMATS}")
+    if export_format == "parquet" and pyarrow is None:
+        raise HTTPException(status_code=501, detail="Parquet export is not available on this server")
+    return export_format
+
+
+async def stream_csv(rows: AsyncIterable[Sequence], headers: Sequence[str]) -> AsyncIterator[bytes]:
+    """
+    Encode rows as CSV while they are read, yielding about export_chunk_bytes at a time; nothing is buffered
+    beyond one chunk.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    async for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= settings.export_chunk_bytes:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _string_or_none(value: Any):
+    return None if value is None else str(value)
+
+
+async def write_parquet_file(rows: AsyncIterable[Sequence], headers: Sequence[str], batch_size: int = 10000) -> str:
+    """
+    Write rows to a temporary Parquet file, one row group per batch_size rows, every column as a nullable
+    string. Batches are converted and written on a worker thread. Returns the file path; the caller owns it.
+    """
+    schema = pyarrow.schema([(name, pyarrow.string()) for name in headers])
+    fd, path = tempfile.mkstemp(prefix="export-", suffix=".parquet")
+    os.close(fd)
+
+    def _write_batch(writer, batch: List[Sequence]):
+        columns = [[_string_or_none(row[i]) for row in batch] for i in range(len(headers))]
+        writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+
+    try:
+        writer = pyarrow.parquet.ParquetWriter(path, schema, compression="snappy")
+        try:
+            batch = []
+            async for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    await asyncio.to_thread(_write_batch, writer, batch)
+                    batch = []
+            if batch:
+                await asyncio.to_thread(_write_batch, writer, batch)
+        finally:
+            writer.close()
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+async def export_response(
+    rows: AsyncIterable[Sequence],
+    headers: Sequence[str],
+    export_format: str,
+    file_stem: str,
+    sheet_title: str = "Data",
+) -> StreamingResponse:
+    """
+    Download response for rows in export_format (see check_export_format).
+
+    csv is encoded and sent while the rows are read from the database. xlsx and parquet are container formats
+    written to a temporary file first (constant memory) and then streamed from disk.
+    """
+    if export_format == "csv":
+        body = stream_csv(rows, headers)
+    elif export_format == "parquet":
+        body = stream_file(await write_parquet_file(rows, headers), settings.export_chunk_bytes)
+    else:
+        path = await write_excel_file(rows, headers, sheet_title=sheet_title)
+        body = stream_file(path, settings.export_chunk_bytes)
+    return StreamingResponse(
+        body,
+        media_type=_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename={file_stem}.{export_format}"},
+    )
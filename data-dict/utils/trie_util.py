@@ -1,38 +1,133 @@
-from typing import Any, Dict, List, Optional
-from collections import defaultdict
+import json
+from array import array
+from typing import Dict, List, Sequence, Tuple
 
 
-_FIELDS_KEY = "__fields__"
+ROOT = 0
+_NONE = -1
 
 
-class TrieNode:
-    __slots__ = ("children", "fields", "depth_to_leaf")
-
-    def __init__(self, field_info: Optional[Dict[str, Any]] = None) -> None:
-        self.children = defaultdict(TrieNode)
-        self.fields: List[Dict[str, Any]] = []
-        self.depth_to_leaf: int = 0
-        if field_info:
-            self.fields.append(field_info)
+class Trie:
+    """
+    Array-backed trie of level paths with JSON-encoded fields attached to the path ends.
 
+    Node n is described by parallel arrays (interned label, depth, first/last child, next sibling, first/last
+    field) instead of one object and dict per node; children and fields keep insertion order. Fields are
+    stored once as encoded bytes and linked to their node by index.
+    """
 
-class Trie:
+    __slots__ = (
+        "_labels", "_label_ids", "_children",
+        "label", "depth", "first_child", "last_child", "next_sibling",
+        "first_field", "last_field", "fields", "next_field",
+    )
 
     def __init__(self) -> None:
-        self.root = TrieNode()
-
-    def insert_path(self, tokens: List[str]) -> TrieNode:
-        if not isinstance(tokens, list):
-            raise TypeError("tokens must be a list")
-        l = len(tokens)
-        node = self.root
-        d = 0
-        for tok in tokens:
-            node = node.children[tok]
-            if node.depth_to_leaf < d:
-                node.depth_to_leaf = d
-            d += 1
+        self._labels: List[str] = []
+        self._label_ids: Dict[str, int] = {}
+        self._children: Dict[Tuple[int, int], int] = {}
+        self.label = array("i", [_NONE])
+        self.depth = array("i", [_NONE])
+        self.first_child = array("i", [_NONE])
+        self.last_child = array("i", [_NONE])
+        self.next_sibling = array("i", [_NONE])
+        self.first_field = array("i", [_NONE])
+        self.last_field = array("i", [_NONE])
+        self.fields: List[bytes] = []
+        self.next_field = array("i")
+
+    def __len__(self) -> int:
+        return len(self.label) - 1
+
+    def _intern(self, token: str) -> int:
+        label_id = self._label_ids.get(token)
+        if label_id is None:
+            label_id = self._label_ids[token] = len(self._labels)
+            self._labels.append(token)
+        return label_id
+
+    def _add_node(self, parent: int, label_id: int) -> int:
+        node = len(self.label)
+        self.label.append(label_id)
+        self.depth.append(self.depth[parent] + 1)
+        self.first_child.append(_NONE)
+        self.last_child.append(_NONE)
+        self.next_sibling.append(_NONE)
+        self.first_field.append(_NONE)
+        self.last_field.append(_NONE)
+        if self.last_child[parent] == _NONE:
+            self.first_child[parent] = node
+        else:
+            self.next_sibling[self.last_child[parent]] = node
+        self.last_child[parent] = node
+        self._children[(parent, label_id)] = node
+        return node
+
+    def insert_path(self, tokens: Sequence[str]) -> int:
+        """
+        Node at the end of tokens, creating the missing nodes on the way.
+        """
+        node = ROOT
+        for token in tokens:
+            label_id = self._intern(token)
+            child = self._children.get((node, label_id))
+            node = self._add_node(node, label_id) if child is None else child
         return node
 
-    def add_field(self, node: TrieNode, field_info: Dict[str, Any]) -> None:
-        node.fields.append(field_info)
+    def add_field(self, node: int, field: bytes) -> None:
+        """
+        Attach field, an encoded JSON document, to node.
+        """
+        index = len(self.fields)
+        self.fields.append(field)
+        self.next_field.append(_NONE)
+        if self.last_field[node] == _NONE:
+            self.first_field[node] = index
+        else:
+            self.next_field[self.last_field[node]] = index
+        self.last_field[node] = index
+
+    def to_json(self) -> bytes:
+        """
+        The trie as a JSON array, written iteratively (no recursion limit on deep paths):
+        [{"level<d>": label, "level<d>_children": [...children, ...fields]}, ...] where d is the node depth
+        from the top level (0) and nodes at depth 1 list theirs under "fields".
+        """
+        encoded_labels = [json.dumps(label, ensure_ascii=False).encode("utf-8") for label in self._labels]
+        openings: Dict[int, Tuple[bytes, bytes]] = {}
+        parts = [b"["]
+        # stack of (node whose children are being written, next child to write)
+        stack = [[ROOT, self.first_child[ROOT]]]
+        while stack:
+            frame = stack[-1]
+            parent, node = frame
+            if node == _NONE:
+                stack.pop()
+                if parent != ROOT:
+                    self._write_fields(parent, parts)
+                    parts.append(b"]}")
+                continue
+            frame[1] = self.next_sibling[node]
+            if node != self.first_child[parent]:
+                parts.append(b",")
+            depth = self.depth[node]
+            opening = openings.get(depth)
+            if opening is None:
+                child_key = "fields" if depth == 1 else f"level{depth}_children"
+                opening = openings[depth] = (b'{"level%d":' % depth, b',"%s":[' % child_key.encode("ascii"))
+            parts.append(opening[0])
+            parts.append(encoded_labels[self.label[node]])
+            parts.append(opening[1])
+            stack.append([node, self.first_child[node]])
+        parts.append(b"]")
+        return b"".join(parts)
+
+    def _write_fields(self, node: int, parts: List[bytes]) -> None:
+        index = self.first_field[node]
+        separate = self.first_child[node] != _NONE
+        while index != _NONE:
+            if separate:
+                parts.append(b",")
+            parts.append(self.fields[index])
+            separate = True
+            index = self.next_field[index]
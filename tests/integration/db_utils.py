@@ -51,4 +51,9 @@ def db_delete_statuses(db_url: str, file_names: list[str]) -> int:
                 "DELETE FROM coordinator_control WHERE file_name = ANY(%s)",
                 (names,),
             )
-            return int(cur.rowcount or 0)
+            deleted = int(cur.rowcount or 0)
+            cur.execute(
+                "DELETE FROM coordinator_file_state WHERE file_name = ANY(%s)",
+                (names,),
+            )
+            return deleted
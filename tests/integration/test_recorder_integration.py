@@ -0,0 +1,163 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from db.file_state import FileStateRecord
+from db.models import ControlRecord, generate_record_id
+from db.recorder import Recorder, StatusRow
+from misc.constants import Status
+
+
+@pytest_asyncio.fixture
+async def session(cfg):
+    """
+    AsyncSession on one connection whose transaction is rolled back after the test, so nothing is left behind.
+    """
+    url = make_url(cfg.db_url).set(drivername="postgresql+asyncpg")
+    engine = create_async_engine(url)
+    try:
+        async with engine.connect() as conn:
+            trans = await conn.begin()
+            try:
+                yield AsyncSession(bind=conn, expire_on_commit=False)
+            finally:
+                await trans.rollback()
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+def prefix():
+    return f"it-recorder-{uuid.uuid4().hex}/"
+
+
+def _row(file_name, status, md5="m" * 32):
+    return StatusRow(file_name=file_name, base_name=file_name.rsplit("/", 1)[-1], md5=md5, status=status)
+
+
+def _state_value(file_name, status, created_at, md5="m" * 32):
+    return {
+        "id": generate_record_id(),
+        "file_name": file_name,
+        "base_name": file_name.rsplit("/", 1)[-1],
+        "content_md5": md5,
+        "status": status,
+        "created_at": created_at,
+    }
+
+
+async def _state(session, file_name, md5="m" * 32) -> FileStateRecord:
+    res = await session.execute(
+        select(FileStateRecord)
+        .where(FileStateRecord.file_name == file_name)
+        .where(FileStateRecord.content_md5 == md5)
+        .execution_options(populate_existing=True)
+    )
+    return res.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_file_state_follows_newest_row(session, prefix):
+    rec = Recorder(session)
+    name = f"{prefix}a.csv"
+
+    await rec.insert_status(file_name=name, base_name="a.csv", md5="m" * 32, status=Status.PROCESSING)
+    ids = await rec.insert_statuses_bulk([_row(name, Status.ITM_INTERNAL_FAILED), _row(name, Status.SUCCESS)])
+
+    state = await _state(session, name)
+    assert state.status == Status.SUCCESS
+    assert state.last_record_id == ids[-1]
+    assert state.archived is False
+
+
+@pytest.mark.asyncio
+async def test_file_state_ignores_older_rows_but_keeps_late_archive(session, prefix):
+    rec = Recorder(session)
+    name = f"{prefix}b.csv"
+    t0 = datetime.utcnow()
+    newest = _state_value(name, Status.SUCCESS, t0 + timedelta(seconds=2))
+
+    await rec._upsert_file_states([newest])
+    # written out of order: an older status must not move the state back, an older ARCHIVE_SUCCEEDED still counts
+    await rec._upsert_file_states([_state_value(name, Status.ITM_INTERNAL_FAILED, t0)])
+    await rec._upsert_file_states([_state_value(name, Status.ARCHIVE_SUCCEEDED, t0 + timedelta(seconds=1))])
+    await rec._upsert_file_states([_state_value(name, Status.PROCESSING, t0 - timedelta(seconds=1))])
+
+    state = await _state(session, name)
+    assert state.status == Status.SUCCESS
+    assert state.last_record_id == newest["id"]
+    assert state.archived is True
+
+
+@pytest.mark.asyncio
+async def test_archived_is_computed_across_one_batch(session, prefix):
+    rec = Recorder(session)
+    name = f"{prefix}c.csv"
+
+    await rec.insert_statuses_bulk([_row(name, Status.ARCHIVE_SUCCEEDED), _row(name, Status.SUCCESS)])
+
+    state = await _state(session, name)
+    assert state.status == Status.SUCCESS
+    assert state.archived is True
+
+
+@pytest.mark.asyncio
+async def test_list_unarchived_and_itm_internal_failed_files(session, prefix):
+    rec = Recorder(session)
+    done, archived, retry, recovered = (f"{prefix}{n}.csv" for n in ("done", "archived", "retry", "recovered"))
+
+    await rec.insert_statuses_bulk([
+        _row(done, Status.PROCESSING),
+        _row(done, Status.SUCCESS),
+        _row(archived, Status.SUCCESS),
+        _row(archived, Status.ARCHIVE_SUCCEEDED),
+        _row(retry, Status.PROCESSING),
+        _row(retry, Status.ITM_INTERNAL_FAILED),
+        _row(recovered, Status.ITM_INTERNAL_FAILED),
+        _row(recovered, Status.OPS_CLOSED),
+    ])
+
+    unarchived = [r for r in await rec.list_unarchived_files() if r.file_name.startswith(prefix)]
+    internal = [r for r in await rec.list_itm_internal_failed_files() if r.file_name.startswith(prefix)]
+
+    assert sorted((r.file_name, r.status) for r in unarchived) == sorted([
+        (done, Status.SUCCESS),
+        (recovered, Status.OPS_CLOSED),
+    ])
+    assert [(r.file_name, r.status) for r in internal] == [(retry, Status.ITM_INTERNAL_FAILED)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("copy_threshold, expect_copy", [(1000, False), (3, True)], ids=["insert", "copy"])
+async def test_insert_statuses_bulk(session, prefix, monkeypatch, copy_threshold, expect_copy):
+    monkeypatch.setattr("db.recorder.settings.RECORDER_COPY_THRESHOLD", copy_threshold, raising=False)
+    rec = Recorder(session)
+    copies = []
+    copy_control_rows = rec._copy_control_rows
+
+    async def _spy(values):
+        copies.append(len(values))
+        await copy_control_rows(values)
+
+    monkeypatch.setattr(rec, "_copy_control_rows", _spy)
+    a, b = f"{prefix}a.csv", f"{prefix}b.csv"
+    rows = [_row(a, Status.PROCESSING), _row(b, Status.SUCCESS), _row(a, Status.ITM_INTERNAL_FAILED)]
+
+    ids = await rec.insert_statuses_bulk(rows)
+
+    assert copies == ([3] if expect_copy else [])
+    res = await session.execute(select(ControlRecord).where(ControlRecord.id.in_(ids)))
+    by_id = {r.id: r for r in res.scalars().all()}
+    # ids come back in input order
+    assert [(by_id[i].file_name, by_id[i].status) for i in ids] == [(r.file_name, r.status) for r in rows]
+    created = [by_id[i].created_at for i in ids]
+    assert created == sorted(created) and len(set(created)) == len(created)
+    # the file-state upsert runs on both paths
+    state_a, state_b = await _state(session, a), await _state(session, b)
+    assert (state_a.status, state_a.last_record_id) == (Status.ITM_INTERNAL_FAILED, ids[2])
+    assert (state_b.status, state_b.last_record_id) == (Status.SUCCESS, ids[1])
@@ -0,0 +1,39 @@
+import pytest
+
+from services.archive_executor import ArchiveExecutor
+
+
+@pytest.mark.asyncio
+async def test_archive_many_yields_every_result_and_converts_exceptions(monkeypatch):
+    monkeypatch.setattr("services.smb_pool.smbclient.register_session", lambda *_a, **_k: None)
+
+    def _archive(path):
+        if path.endswith("boom.txt"):
+            raise RuntimeError("move failed")
+        return True, "ok"
+
+    ex = ArchiveExecutor(_archive, max_workers=4)
+    try:
+        paths = [f"\\\\server\\share\\source\\{i}.txt" for i in range(10)] + ["\\\\server\\share\\source\\boom.txt"]
+        results = {p: (ok, msg) async for p, ok, msg in ex.archive_many(paths)}
+    finally:
+        ex.shutdown()
+
+    assert set(results) == set(paths)
+    assert results["\\\\server\\share\\source\\boom.txt"] == (False, "move failed")
+    assert all(ok for p, (ok, _) in results.items() if not p.endswith("boom.txt"))
+
+
+@pytest.mark.asyncio
+async def test_archive_many_registers_session_once_per_server(monkeypatch):
+    calls = []
+    monkeypatch.setattr("services.smb_pool.smbclient.register_session", lambda server, **_k: calls.append(server))
+
+    ex = ArchiveExecutor(lambda _p: (True, "ok"), max_workers=4)
+    try:
+        paths = [f"\\\\s1\\share\\{i}.txt" for i in range(5)] + [f"\\\\s2\\share\\{i}.txt" for i in range(5)]
+        _ = [r async for r in ex.archive_many(paths)]
+    finally:
+        ex.shutdown()
+
+    assert sorted(calls) == ["s1", "s2"]
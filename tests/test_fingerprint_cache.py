@@ -0,0 +1,60 @@
+import types
+
+import pytest
+
+from services.fingerprint_cache import Fingerprint, FingerprintCache
+
+
+class _FakeRecorder:
+    def __init__(self, stored):
+        self.stored = stored
+        self.upserts = []
+
+    async def get_fingerprints(self, paths):
+        return {p: self.stored[p] for p in paths if p in self.stored}
+
+    async def upsert_fingerprints(self, values):
+        self.upserts.extend(values)
+
+
+def _rec(size, mtime, chgtime, md5):
+    return types.SimpleNamespace(size=size, mtime=mtime, chgtime=chgtime, content_md5=md5)
+
+
+def test_from_stat_returns_none_when_size_or_times_missing():
+    st = types.SimpleNamespace(st_size=10, st_mtime=None, st_chgtime=100.0)
+    assert Fingerprint.from_stat("a.txt", st) is None
+
+
+def test_from_stat_builds_fingerprint():
+    st = types.SimpleNamespace(st_size=10, st_mtime=100, st_chgtime=101.5)
+    assert Fingerprint.from_stat("a.txt", st) == Fingerprint("a.txt", 10, 100.0, 101.5)
+
+
+@pytest.mark.asyncio
+async def test_known_md5s_only_returns_exact_matches():
+    recorder = _FakeRecorder({
+        "same.txt": _rec(10, 100.0, 100.0, "md5-same"),
+        "grown.txt": _rec(10, 100.0, 100.0, "md5-grown"),
+        "touched.txt": _rec(10, 100.0, 100.0, "md5-touched"),
+    })
+    cache = FingerprintCache(recorder)
+
+    known = await cache.known_md5s([
+        Fingerprint("same.txt", 10, 100.0, 100.0),
+        Fingerprint("grown.txt", 11, 100.0, 100.0),
+        Fingerprint("touched.txt", 10, 100.0, 200.0),
+        Fingerprint("new.txt", 10, 100.0, 100.0),
+    ])
+
+    assert known == {"same.txt": "md5-same"}
+
+
+@pytest.mark.asyncio
+async def test_remember_upserts_fingerprint_with_md5():
+    recorder = _FakeRecorder({})
+    await FingerprintCache(recorder).remember(Fingerprint("a.txt", 10, 100.0, 101.0), base_name="a", md5="m")
+
+    assert recorder.upserts == [{
+        "path": "a.txt", "size": 10, "mtime": 100.0, "chgtime": 101.0, "content_md5": "m", "base_name": "a",
+    }]
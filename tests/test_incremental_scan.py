@@ -0,0 +1,91 @@
+import types
+
+import pytest
+
+from services.incremental_scan import IncrementalScanner
+
+ROOT = "\\\\server\\share\\source"
+
+
+class _FakeRecorder:
+    def __init__(self):
+        self.snapshots = {}
+
+    async def get_scan_snapshots(self, root):
+        return dict(self.snapshots)
+
+    async def save_scan_snapshots(self, root, values, *, keep_dirs):
+        for v in values:
+            self.snapshots[v["dir_path"]] = types.SimpleNamespace(**v)
+        keep = set(keep_dirs)
+        self.snapshots = {k: v for k, v in self.snapshots.items() if k in keep}
+
+
+@pytest.fixture
+def share(monkeypatch):
+    state = {
+        "root_files": ["loose.xlsx"],
+        "dirs": {"A": 100.0, "B": 100.0},
+        "files": {"A": ["a1.xlsx"], "B": ["b1.xlsx", "sub\\b2.xlsx"]},
+        "walked": [],
+    }
+
+    def _list_dir(path):
+        return list(state["root_files"]), list(state["dirs"].items())
+
+    def _walk_files(path):
+        name = path.rsplit("\\", 1)[-1]
+        state["walked"].append(name)
+        return list(state["files"][name])
+
+    async def _to_thread(func, /, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    monkeypatch.setattr("services.incremental_scan._list_dir", _list_dir)
+    monkeypatch.setattr("services.incremental_scan._walk_files", _walk_files)
+    monkeypatch.setattr("services.incremental_scan.asyncio.to_thread", _to_thread)
+    monkeypatch.setattr("services.incremental_scan.log_event", lambda *_a, **_k: None)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_first_scan_is_full_and_lists_everything(share):
+    res = await IncrementalScanner(_FakeRecorder(), ROOT, full_rescan_interval_s=3600).scan()
+
+    assert res.full is True
+    assert sorted(share["walked"]) == ["A", "B"]
+    assert sorted(res.files) == sorted([
+        f"{ROOT}\\loose.xlsx", f"{ROOT}\\A\\a1.xlsx", f"{ROOT}\\B\\b1.xlsx", f"{ROOT}\\B\\sub\\b2.xlsx",
+    ])
+
+
+@pytest.mark.asyncio
+async def test_second_scan_only_descends_into_changed_dirs(share):
+    recorder = _FakeRecorder()
+    scanner = IncrementalScanner(recorder, ROOT, full_rescan_interval_s=3600)
+    await scanner.scan()
+
+    share["walked"].clear()
+    share["dirs"]["B"] = 200.0
+    share["files"]["B"] = ["b1.xlsx", "b3.xlsx"]
+    res = await scanner.scan()
+
+    assert res.full is False
+    assert share["walked"] == ["B"]
+    assert sorted(res.files) == sorted([
+        f"{ROOT}\\loose.xlsx", f"{ROOT}\\A\\a1.xlsx", f"{ROOT}\\B\\b1.xlsx", f"{ROOT}\\B\\b3.xlsx",
+    ])
+
+
+@pytest.mark.asyncio
+async def test_removed_dir_is_dropped_and_interval_zero_forces_full(share):
+    recorder = _FakeRecorder()
+    await IncrementalScanner(recorder, ROOT, full_rescan_interval_s=3600).scan()
+
+    del share["dirs"]["A"]
+    share["walked"].clear()
+    res = await IncrementalScanner(recorder, ROOT, full_rescan_interval_s=0).scan()
+
+    assert res.full is True
+    assert share["walked"] == ["B"]
+    assert f"{ROOT}\\A" not in recorder.snapshots
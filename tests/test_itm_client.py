@@ -0,0 +1,135 @@
+import json
+
+import httpx
+import pytest
+
+from clients.itm import ITMClient
+
+
+def _client():
+    # _pack_instructions/_parse_response/submit_batch only need settings, not the HTTP or OAuth clients
+    return ITMClient.__new__(ITMClient)
+
+
+def _inst(ref, size=0):
+    return {"sourceUniqueRef": ref, "payload": "x" * size}
+
+
+def _resp(status_code, body):
+    return httpx.Response(status_code, json=body)
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    monkeypatch.setattr("clients.itm.log_event", lambda *_a, **_k: None)
+    monkeypatch.setattr("clients.itm.settings.ITM_BATCH_MAX_INSTRUCTIONS", 3, raising=False)
+    monkeypatch.setattr("clients.itm.settings.ITM_BATCH_MAX_BYTES", 1000, raising=False)
+
+
+def test_pack_instructions_splits_on_instruction_count():
+    batches = _client()._pack_instructions([_inst(str(i)) for i in range(7)])
+
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_pack_instructions_splits_on_byte_limit(monkeypatch):
+    instructions = [_inst(str(i), size=200) for i in range(4)]
+    size = len(json.dumps(instructions[0]))
+    monkeypatch.setattr("clients.itm.settings.ITM_BATCH_MAX_INSTRUCTIONS", 10, raising=False)
+    monkeypatch.setattr("clients.itm.settings.ITM_BATCH_MAX_BYTES", size * 2, raising=False)
+
+    assert _client()._pack_instructions(instructions) == [[0, 1], [2, 3]]
+
+
+def test_pack_instructions_sends_oversize_instruction_alone():
+    instructions = [_inst("a"), _inst("big", size=5000), _inst("b"), _inst("c")]
+
+    assert _client()._pack_instructions(instructions) == [[0], [1], [2, 3]]
+
+
+def test_pack_instructions_empty():
+    assert _client()._pack_instructions([]) == []
+
+
+def test_parse_response_maps_results_per_ref():
+    resp = _resp(200, {
+        "status": "partial",
+        "message": "some failed",
+        "instructionsCount": 3,
+        "results": [
+            {"sourceUniqueRef": "a", "status": "SUCCESS"},
+            {"sourceUniqueRef": "b", "status": "FAILED", "message": "bad payload"},
+            {"sourceUniqueRef": "c", "status": "INTERNAL_ERROR", "message": "try later"},
+            {"status": "SUCCESS"},
+        ],
+    })
+
+    ok, msg, retryable, per_ref = _client()._parse_response(resp)
+
+    assert (ok, msg, retryable) == (False, "some failed", False)
+    assert per_ref == {
+        "a": (True, "some failed", False),
+        "b": (False, "bad payload", False),
+        "c": (False, "try later", True),
+    }
+
+
+def test_parse_response_5xx_marks_items_retryable():
+    resp = _resp(503, {"status": "error", "message": "down", "results": [{"sourceUniqueRef": "a", "status": "x"}]})
+
+    ok, _msg, retryable, per_ref = _client()._parse_response(resp)
+
+    assert (ok, retryable) == (False, True)
+    assert per_ref == {"a": (False, "down", True)}
+
+
+def test_parse_response_without_json_body():
+    ok, msg, retryable, per_ref = _client()._parse_response(httpx.Response(502, text="bad gateway"))
+
+    assert (ok, msg, retryable, per_ref) == (False, "bad gateway", True, {})
+
+
+@pytest.mark.asyncio
+async def test_submit_batch_falls_back_to_response_status_for_missing_refs(monkeypatch):
+    client = _client()
+    sent = []
+
+    async def _headers():
+        return {}
+
+    async def _send(payload, headers):
+        refs = [inst["sourceUniqueRef"] for inst in payload["instructions"]]
+        sent.append(refs)
+        # ITM only reports the first instruction of each request
+        return _resp(200, {"status": "success", "results": [{"sourceUniqueRef": refs[0], "status": "FAILED"}]})
+
+    monkeypatch.setattr(client, "_headers", _headers)
+    monkeypatch.setattr(client, "_send", _send)
+    items = [({"n": i}, "rem", f"p/{i}") for i in range(4)]
+
+    results = await client.submit_batch(items)
+
+    assert [len(refs) for refs in sent] == [3, 1]
+    assert [ok for ok, _msg, _retryable in results] == [False, True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_submit_batch_uses_fresh_refs_per_call(monkeypatch):
+    client = _client()
+    sent = []
+
+    async def _headers():
+        return {}
+
+    async def _send(payload, headers):
+        sent.extend(inst["sourceUniqueRef"] for inst in payload["instructions"])
+        return _resp(200, {"status": "success"})
+
+    monkeypatch.setattr(client, "_headers", _headers)
+    monkeypatch.setattr(client, "_send", _send)
+    items = [({"n": 1}, "rem", "p/1"), ({"n": 1}, "rem", "p/1")]
+
+    await client.submit_batch(items)
+    await client.submit_batch(items)
+
+    assert len(set(sent)) == 4
@@ -0,0 +1,177 @@
+import asyncio
+import types
+from contextlib import asynccontextmanager
+
+import pytest
+
+from services.postprocess import PostprocessService, _interleave_by_remitter
+from misc.constants import Status
+
+
+def _rec(file_name):
+    return types.SimpleNamespace(
+        file_name=file_name,
+        base_name=file_name.rsplit("/", 1)[-1],
+        content_md5=f"md5-{file_name}",
+        correlation_id=None,
+    )
+
+
+class _FakeSession:
+    @asynccontextmanager
+    async def begin(self):
+        yield
+
+
+class _FakeRecorder:
+    candidates = []
+    batches = []
+
+    def __init__(self, _session):
+        pass
+
+    async def list_itm_internal_failed_files(self, limit=None):
+        return list(self.candidates)
+
+    async def insert_statuses_bulk(self, rows):
+        rows = list(rows)
+        _FakeRecorder.batches.append(rows)
+        return [f"rid-{i}" for i in range(len(rows))]
+
+
+class _FakeExtraction:
+    failing = set()
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        _FakeExtraction.instance = self
+
+    async def extract_with_file_name(self, filename, remitter):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.active -= 1
+        if filename in self.failing:
+            return types.SimpleNamespace(ok=False, kind=None, rows=None, message="bad file")
+        return types.SimpleNamespace(ok=True, kind=None, rows=[{"file": filename}], message="")
+
+    async def close(self):
+        pass
+
+
+class _FakeITM:
+    results = None
+    error = None
+
+    def __init__(self):
+        self.calls = []
+        _FakeITM.instance = self
+
+    async def submit_batch(self, items, *, concurrency=1):
+        self.calls.append(list(items))
+        if self.error is not None:
+            raise self.error
+        if self.results is not None:
+            return [self.results[item[2]] for item in items]
+        return [(True, "ok", False)] * len(items)
+
+    async def aclose(self):
+        pass
+
+
+class _FakeIQube:
+    notified = []
+
+    async def notify_file_error(self, path, reason=None, record_id=None):
+        _FakeIQube.notified.append((path, reason, record_id))
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def service(monkeypatch):
+    @asynccontextmanager
+    async def _session_manager():
+        yield _FakeSession()
+
+    _FakeRecorder.candidates = []
+    _FakeRecorder.batches = []
+    _FakeExtraction.failing = set()
+    _FakeITM.results = None
+    _FakeITM.error = None
+    _FakeIQube.notified = []
+
+    monkeypatch.setattr("services.postprocess.session_manager", _session_manager)
+    monkeypatch.setattr("services.postprocess.Recorder", _FakeRecorder)
+    monkeypatch.setattr("services.postprocess.ExtractionService", _FakeExtraction)
+    monkeypatch.setattr("services.postprocess.ITMClient", _FakeITM)
+    monkeypatch.setattr("services.postprocess.IQubeClient", _FakeIQube)
+    monkeypatch.setattr("services.postprocess.log_event", lambda *_a, **_k: None)
+    monkeypatch.setattr("services.postprocess.utils.extract_remitter", lambda path: path.split("/", 1)[0])
+    monkeypatch.setattr("services.postprocess.settings.ARCHIVE_BATCH_SIZE", 100, raising=False)
+    monkeypatch.setattr("services.postprocess.settings.ITM_RETRY_CONCURRENCY", 2, raising=False)
+    monkeypatch.setattr("services.postprocess.settings.ITM_RETRY_CHUNK_SIZE", 3, raising=False)
+    return PostprocessService(types.SimpleNamespace(archive_source=lambda _p: (True, "ok")))
+
+
+def test_interleave_by_remitter_round_robins_and_keeps_order_within_remitter(monkeypatch):
+    monkeypatch.setattr("services.postprocess.utils.extract_remitter", lambda path: path.split("/", 1)[0])
+    records = [_rec(p) for p in ["a/1", "a/2", "a/3", "b/1", "c/1", "c/2"]]
+
+    ordered = [r.file_name for r in _interleave_by_remitter(records)]
+
+    assert ordered == ["a/1", "b/1", "c/1", "a/2", "c/2", "a/3"]
+
+
+@pytest.mark.asyncio
+async def test_retry_runs_in_chunks_with_bounded_extraction_concurrency(service):
+    _FakeRecorder.candidates = [_rec(f"r{i % 2}/{i}") for i in range(7)]
+
+    assert await service._retry_itm_internal_failures() is True
+
+    # 7 candidates in chunks of 3: one ITM batch and one status transaction per chunk
+    assert [len(items) for items in _FakeITM.instance.calls] == [3, 3, 1]
+    assert [len(rows) for rows in _FakeRecorder.batches] == [3, 3, 1]
+    assert _FakeExtraction.instance.peak == 2
+    assert all(row.status == Status.SUCCESS for rows in _FakeRecorder.batches for row in rows)
+    assert _FakeIQube.notified == []
+
+
+@pytest.mark.asyncio
+async def test_item_results_map_to_internal_and_terminal_failures(service):
+    _FakeRecorder.candidates = [_rec("r/ok"), _rec("r/internal"), _rec("r/terminal")]
+    _FakeITM.results = {
+        "r/ok": (True, "ok", False),
+        "r/internal": (False, "busy", True),
+        "r/terminal": (False, "rejected", False),
+    }
+
+    await service._retry_itm_internal_failures()
+
+    statuses = {row.file_name: row.status for row in _FakeRecorder.batches[0]}
+    assert statuses == {
+        "r/ok": Status.SUCCESS,
+        "r/internal": Status.ITM_INTERNAL_FAILED,
+        "r/terminal": Status.ITM_FAILED,
+    }
+    assert [path for path, _, _ in _FakeIQube.notified] == ["r/terminal"]
+
+
+@pytest.mark.asyncio
+async def test_outcomes_are_recorded_when_submit_batch_raises(service):
+    _FakeRecorder.candidates = [_rec("r/good"), _rec("r/bad")]
+    _FakeExtraction.failing = {"bad"}
+    _FakeITM.error = RuntimeError("itm down")
+
+    with pytest.raises(RuntimeError, match="itm down"):
+        await service._retry_itm_internal_failures()
+
+    # the extraction failure of the chunk is persisted even though the ITM submit failed
+    assert len(_FakeRecorder.batches) == 1
+    assert [(row.file_name, row.status) for row in _FakeRecorder.batches[0]] == [
+        ("r/bad", Status.EXTRACTION_FILE_FAILED),
+    ]
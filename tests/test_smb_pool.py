@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.smb_pool import SmbSessionPool, _unc_server, _unc_share
+
+
+@pytest.fixture
+def smb_calls(monkeypatch):
+    calls = {"register": [], "delete": []}
+    monkeypatch.setattr("services.smb_pool.smbclient.register_session", lambda server, **_k: calls["register"].append(server))
+    monkeypatch.setattr("services.smb_pool.smbclient.delete_session", lambda server, **_k: calls["delete"].append(server))
+    monkeypatch.setattr("services.smb_pool.log_event", lambda *_a, **_k: None)
+    monkeypatch.setattr(
+        "services.smb_pool._is_retryable_smb_exception",
+        lambda e: isinstance(e, ConnectionResetError),
+    )
+    return calls
+
+
+def test_unc_server_and_share_parsing():
+    assert _unc_server("\\\\server\\share\\source\\a.txt") == "server"
+    assert _unc_server("//server/share/a.txt") == "server"
+    assert _unc_server("relative\\a.txt") is None
+    assert _unc_share("\\\\Server\\Share\\a.txt") == ("server", "share")
+    assert _unc_share("\\\\server") is None
+
+
+@pytest.mark.asyncio
+async def test_run_limits_concurrency_per_share(smb_calls):
+    lock = threading.Lock()
+    active = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+
+    def _op(path):
+        share = path.split("\\")[3]
+        with lock:
+            active[share] += 1
+            peak[share] = max(peak[share], active[share])
+        time.sleep(0.02)
+        with lock:
+            active[share] -= 1
+        return path
+
+    pool = SmbSessionPool(max_workers=8, per_share_limit=2)
+    try:
+        paths = [f"\\\\srv\\a\\{i}" for i in range(6)] + [f"\\\\srv\\b\\{i}" for i in range(6)]
+        results = await asyncio.gather(*(pool.run(_op, p) for p in paths))
+    finally:
+        pool.shutdown()
+
+    assert results == paths
+    assert peak == {"a": 2, "b": 2}
+    assert smb_calls["register"] == ["srv"]
+
+
+@pytest.mark.asyncio
+async def test_retryable_error_evicts_session_and_reraises(smb_calls):
+    def _broken(_path):
+        raise ConnectionResetError("connection reset")
+
+    def _missing(_path):
+        raise FileNotFoundError("missing")
+
+    pool = SmbSessionPool(max_workers=2, per_share_limit=2)
+    try:
+        with pytest.raises(FileNotFoundError):
+            await pool.run(_missing, "\\\\srv\\share\\a.txt")
+        assert smb_calls["delete"] == []
+
+        with pytest.raises(ConnectionResetError):
+            await pool.run(_broken, "\\\\srv\\share\\a.txt")
+        assert smb_calls["delete"] == ["srv"]
+
+        await pool.run(lambda p: p, "\\\\srv\\share\\a.txt")
+    finally:
+        pool.shutdown()
+
+    # Evicted server is registered again on the next call.
+    assert smb_calls["register"] == ["srv", "srv"]
+
+
+@pytest.mark.asyncio
+async def test_in_flight_failures_on_one_session_evict_once(smb_calls):
+    started = threading.Barrier(3)
+
+    def _broken(_path):
+        # All three calls run on the same session before any of them fails.
+        started.wait(timeout=5)
+        raise ConnectionResetError("connection reset")
+
+    def _reset(_path):
+        raise ConnectionResetError("connection reset")
+
+    pool = SmbSessionPool(max_workers=3, per_share_limit=3)
+    try:
+        results = await asyncio.gather(
+            *(pool.run(_broken, f"\\\\srv\\share\\{i}.txt") for i in range(3)),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, ConnectionResetError) for r in results)
+        assert smb_calls["delete"] == ["srv"]
+
+        # A failure on the reconnected session evicts it again.
+        with pytest.raises(ConnectionResetError):
+            await pool.run(_reset, "\\\\srv\\share\\a.txt")
+        assert smb_calls["delete"] == ["srv", "srv"]
+    finally:
+        pool.shutdown()
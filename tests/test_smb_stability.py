@@ -0,0 +1,110 @@
+import asyncio
+import types
+
+import pytest
+
+from services.fingerprint_cache import Fingerprint
+from services.smb_stability import filter_stable
+
+
+def _st(size, mtime, chgtime):
+    return types.SimpleNamespace(st_size=size, st_mtime=mtime, st_chgtime=chgtime)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    calls = []
+
+    async def _to_thread(func, /, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    async def _sleep(s):
+        calls.append(s)
+
+    monkeypatch.setattr("services.smb_stability.asyncio.to_thread", _to_thread)
+    monkeypatch.setattr("services.smb_stability.asyncio.sleep", _sleep)
+    monkeypatch.setattr("services.smb_stability.log_event", lambda *_a, **_k: None)
+    monkeypatch.setattr("services.smb_stability.settings.SMB_STAT_CONCURRENCY", 4, raising=False)
+    monkeypatch.setattr("services.smb_stability.settings.SMB_STABILITY_MIN_AGE_S", None, raising=False)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_min_age_mode_keeps_only_old_enough_files(sleeps, monkeypatch):
+    stats = {
+        "old": _st(1, 100.0, 100.0),
+        "new": _st(1, 100.0, 104.0),
+        "no_times": _st(1, None, None),
+    }
+
+    def _stat(path):
+        if path == "gone":
+            raise RuntimeError("stat failed")
+        return stats[path]
+
+    monkeypatch.setattr("services.smb_stability.smbclient.stat", _stat)
+    monkeypatch.setattr("services.smb_stability.time.time", lambda: 105.0)
+
+    stable = await filter_stable(["old", "new", "no_times", "gone"], min_age_s=3.0)
+
+    assert stable == {"old": Fingerprint(path="old", size=1, mtime=100.0, chgtime=100.0)}
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_multi_sample_mode_sleeps_once_per_round_for_whole_batch(sleeps, monkeypatch):
+    rounds = {
+        "steady": [_st(10, 100.0, 100.0)] * 3,
+        "growing": [_st(10, 100.0, 100.0), _st(11, 101.0, 101.0), _st(12, 102.0, 102.0)],
+        "flaky": [_st(10, 100.0, 100.0)],
+    }
+    stat_calls = []
+
+    def _stat(path):
+        stat_calls.append(path)
+        seq = rounds[path]
+        if not seq:
+            raise RuntimeError("stat failed")
+        return seq.pop(0)
+
+    monkeypatch.setattr("services.smb_stability.smbclient.stat", _stat)
+
+    stable = await filter_stable(["steady", "growing", "flaky", "steady"], check_interval_s=0.5, check_count=3)
+
+    assert list(stable) == ["steady"]
+    assert sleeps == [0.5, 0.5]
+    # unstable paths drop out of the following rounds
+    assert stat_calls == ["steady", "growing", "flaky", "steady", "growing", "flaky", "steady"]
+
+
+@pytest.mark.asyncio
+async def test_multi_sample_mode_stops_sampling_when_nothing_left(sleeps, monkeypatch):
+    seq = [_st(10, 100.0, 100.0), _st(11, 100.0, 100.0)]
+    monkeypatch.setattr("services.smb_stability.smbclient.stat", lambda _p: seq.pop(0))
+
+    assert await filter_stable(["a"], check_interval_s=0.5, check_count=5) == {}
+    assert sleeps == [0.5]
+
+
+@pytest.mark.asyncio
+async def test_stats_of_a_round_run_concurrently_within_limit(monkeypatch):
+    active = {"now": 0, "peak": 0}
+
+    async def _to_thread(func, /, *args, **kwargs):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        try:
+            await asyncio.sleep(0.01)
+            return func(*args, **kwargs)
+        finally:
+            active["now"] -= 1
+
+    monkeypatch.setattr("services.smb_stability.asyncio.to_thread", _to_thread)
+    monkeypatch.setattr("services.smb_stability.log_event", lambda *_a, **_k: None)
+    monkeypatch.setattr("services.smb_stability.smbclient.stat", lambda _p: _st(1, 100.0, 100.0))
+    monkeypatch.setattr("services.smb_stability.time.time", lambda: 200.0)
+
+    stable = await filter_stable([str(i) for i in range(10)], min_age_s=3.0, concurrency=3)
+
+    assert list(stable) == [str(i) for i in range(10)]
+    assert active["peak"] == 3
@@ -0,0 +1,35 @@
+import hashlib
+import io
+
+import pytest
+
+from services.smb_stream import HashedSpool, spool_from_stream
+
+
+def test_spool_md5_matches_and_buffer_is_rereadable():
+    data = b"remitter-file-" * 10_000
+    spool = spool_from_stream(io.BytesIO(data), chunk_size=4096, max_memory_bytes=1024)
+
+    assert spool.md5 == hashlib.md5(data).hexdigest()
+    assert spool.size == len(data)
+    assert spool.open().read() == data
+    assert b"".join(spool.iter_chunks(1000)) == data
+    spool.close()
+
+
+def test_spool_small_file_stays_in_memory_large_file_rolls_over():
+    with spool_from_stream(io.BytesIO(b"x" * 100), chunk_size=10, max_memory_bytes=1024) as small:
+        assert small.in_memory is True
+    with spool_from_stream(io.BytesIO(b"x" * 5000), chunk_size=10, max_memory_bytes=1024) as large:
+        assert large.in_memory is False
+
+
+def test_spool_rejects_writes_after_seal_and_md5_before_seal():
+    spool = HashedSpool(max_memory_bytes=1024)
+    spool.write(b"abc")
+    with pytest.raises(RuntimeError):
+        _ = spool.md5
+    spool.seal()
+    with pytest.raises(RuntimeError):
+        spool.write(b"def")
+    spool.close()
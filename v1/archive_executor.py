@@ -0,0 +1,52 @@
+import asyncio
+from typing import AsyncIterator, Callable, Iterable, Optional, Tuple
+
+from misc.config import settings
+from services.smb_pool import SmbSessionPool
+
+
+class ArchiveExecutor:
+    """
+    Dedicated SMB session pool for archive moves.
+
+    The pool is separate from the default asyncio executor (and from the scan/stat pool) so a large archive batch
+    cannot starve scan/stat/download calls. Sessions are warmed once per server and evicted on retryable
+    connection errors by SmbSessionPool.
+    """
+
+    def __init__(
+        self,
+        archive_fn: Callable[[str], Tuple[bool, str]],
+        max_workers: Optional[int] = None,
+        pool: Optional[SmbSessionPool] = None,
+    ):
+        self._archive_fn = archive_fn
+        self._owns_pool = pool is None
+        self._pool = pool or SmbSessionPool(
+            max_workers=max_workers or settings.ARCHIVE_WORKERS,
+            thread_name_prefix="smb-archive",
+        )
+
+    async def _archive_one(self, path: str) -> Tuple[str, bool, str]:
+        try:
+            ok, msg = await self._pool.run(self._archive_fn, path)
+        except Exception as e:
+            ok, msg = False, str(e)
+        return path, ok, msg
+
+    async def archive_many(self, paths: Iterable[str]) -> AsyncIterator[Tuple[str, bool, str]]:
+        """
+        Archive all paths on the pool and yield (path, ok, message) as each move completes.
+        """
+        tasks = [asyncio.ensure_future(self._archive_one(p)) for p in paths]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield await fut
+        finally:
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+
+    def shutdown(self) -> None:
+        if self._owns_pool:
+            self._pool.shutdown()
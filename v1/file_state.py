@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+
+class FileStateRecord(SQLModel, table=True):
+    """
+    Latest status per (file_name, content_md5).
+
+    coordinator_control stays the append-only audit log; this table is upserted by Recorder in the same
+    transaction as every control row so housekeeping/retry scans do not have to sort the full history.
+    """
+
+    __tablename__ = "coordinator_file_state"
+    __table_args__ = (
+        sa.Index("idx_file_state_status_created", "status", "created_at"),
+    )
+
+    file_name: str = Field(primary_key=True, max_length=512)
+    content_md5: str = Field(primary_key=True, max_length=32)
+    base_name: str = Field(max_length=128)
+    status: str = Field(max_length=50)
+    last_record_id: str = Field(max_length=32)
+    archived: bool = Field(default=False, sa_column=sa.Column(sa.Boolean(), nullable=False, server_default=sa.false()))
+    created_at: datetime = Field(sa_column=sa.Column(sa.DateTime(timezone=True), nullable=False))
+
+
+class FileFingerprintRecord(SQLModel, table=True):
+    """
+    Last known SMB metadata fingerprint (size, mtime, chgtime) of a source path and the MD5 computed for it.
+
+    A path whose current stat matches the stored fingerprint is assumed unchanged, so its MD5 can be reused
+    without downloading the file again.
+    """
+
+    __tablename__ = "coordinator_file_fingerprint"
+
+    path: str = Field(primary_key=True, max_length=1024)
+    size: int = Field(sa_column=sa.Column(sa.BigInteger(), nullable=False))
+    mtime: float = Field(sa_column=sa.Column(sa.Float(), nullable=False))
+    chgtime: float = Field(sa_column=sa.Column(sa.Float(), nullable=False))
+    content_md5: str = Field(max_length=32)
+    base_name: str = Field(max_length=128)
+    updated_at: datetime = Field(sa_column=sa.Column(sa.DateTime(timezone=True), nullable=False))
+
+
+class ScanSnapshotRecord(SQLModel, table=True):
+    """
+    Listing of one scanned SMB directory as of the previous run: directory mtime and the files below it.
+
+    IncrementalScanner reuses the entries of directories whose mtime did not change instead of listing them again.
+    """
+
+    __tablename__ = "coordinator_scan_snapshot"
+    __table_args__ = (
+        sa.Index("idx_scan_snapshot_root", "root"),
+    )
+
+    dir_path: str = Field(primary_key=True, max_length=1024)
+    root: str = Field(max_length=1024)
+    mtime: float = Field(sa_column=sa.Column(sa.Float(), nullable=False))
+    entries: list = Field(sa_column=sa.Column(JSONB(), nullable=False))
+    full_scan_ts: Optional[float] = Field(default=None, sa_column=sa.Column(sa.Float(), nullable=True))
+    updated_at: datetime = Field(sa_column=sa.Column(sa.DateTime(timezone=True), nullable=False))
@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from db.recorder import Recorder
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    path: str
+    size: int
+    mtime: float
+    chgtime: float
+
+    @classmethod
+    def from_stat(cls, path: str, st: Any) -> Optional["Fingerprint"]:
+        """
+        Build a fingerprint from an smbclient.stat result; None when size or times are missing (same as is_stable).
+        """
+        size = getattr(st, "st_size", None)
+        mtime = getattr(st, "st_mtime", None)
+        chgtime = getattr(st, "st_chgtime", None)
+        if size is None or mtime is None or chgtime is None:
+            return None
+        return cls(path=path, size=int(size), mtime=float(mtime), chgtime=float(chgtime))
+
+
+class FingerprintCache:
+    """
+    Pre-claim MD5 fast path.
+
+    A file whose (size, mtime, chgtime) matches the fingerprint stored after its last download is unchanged, so
+    the stored MD5 can be used for try_claim_processing without reading the file. Only a successful claim needs
+    the bytes; an already claimed (base_name, md5) is skipped before any SMB read.
+    """
+
+    def __init__(self, recorder: Recorder):
+        self.recorder = recorder
+
+    async def known_md5s(self, fingerprints: Iterable[Fingerprint]) -> dict[str, str]:
+        """
+        Return {path: md5} for the given fingerprints that match the stored ones exactly.
+        """
+        current = {fp.path: fp for fp in fingerprints}
+        if not current:
+            return {}
+        stored = await self.recorder.get_fingerprints(current.keys())
+        known: dict[str, str] = {}
+        for path, rec in stored.items():
+            fp = current[path]
+            if rec.size == fp.size and rec.mtime == fp.mtime and rec.chgtime == fp.chgtime:
+                known[path] = rec.content_md5
+        return known
+
+    async def remember(self, fingerprint: Fingerprint, *, base_name: str, md5: str) -> None:
+        """
+        Store the MD5 computed for a file. Pass the fingerprint taken before the download, so a write that lands
+        during the download changes the stat and forces a re-hash on the next run.
+        """
+        await self.recorder.upsert_fingerprints([{
+            "path": fingerprint.path,
+            "size": fingerprint.size,
+            "mtime": fingerprint.mtime,
+            "chgtime": fingerprint.chgtime,
+            "content_md5": md5,
+            "base_name": base_name,
+        }])
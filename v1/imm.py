@@ -1,6 +1,7 @@
+import asyncio
 import json
 import uuid
-from typing import Tuple, List, Any
+from typing import Tuple, List, Any, Dict
 import httpx
 from misc.config import settings
 from misc.constants import Events
@@ -39,37 +40,125 @@ class ITMClient:
     async def _post(self, url: str, json: dict, headers: dict) -> httpx.Response:
         return await self._client.post(url, json=json, headers=headers)
 
-    async def submit(self, foI_data: dict, remitter: str, path) -> Tuple[bool, str, bool]:
-        try:
-            token = await self._auth_mgr.get_token()
-        except Exception as e:
-            log_event(event="ITM_TOKEN_FAILED", level="error", message=f"exception:{e}")
-            return False, f"failed to get oauth token: {e}", False
-
-        headers = {
+    async def _headers(self) -> dict:
+        token = await self._auth_mgr.get_token()
+        return {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
             "Consumer-Type": settings.ENV,
             "source-system": "DET"
         }
 
+    async def _send(self, payload: dict, headers: dict) -> httpx.Response:
+        resp = await self._post(self.base_url, json=payload, headers=headers)
+        if resp.status_code in (401, 403):
+            new_token = await self._auth_mgr.refresh_after_failure()
+            headers["Authorization"] = f"Bearer {new_token}"
+            resp = await self._post(self.base_url, json=payload, headers=headers)
+        return resp
+
+    async def submit(self, foI_data: dict, remitter: str, path) -> Tuple[bool, str, bool]:
+        try:
+            headers = await self._headers()
+        except Exception as e:
+            log_event(event="ITM_TOKEN_FAILED", level="error", message=f"exception:{e}")
+            return False, f"failed to get oauth token: {e}", False
+
         payload = await self._build_itm_payload(foI_data, remitter)
 
         try:
-            resp = await self._post(self.base_url, json=payload, headers=headers)
+            resp = await self._send(payload, headers)
         except Exception as e:
             log_event(event="ITM_FAILED", level="error", message=f"exception:{e}")
             return False, str(e), True
 
-        if resp.status_code in (401, 403):
-            new_token = await self._auth_mgr.refresh_after_failure()
-            headers["Authorization"] = f"Bearer {new_token}"
-            resp = await self._post(self.base_url, json=payload, headers=headers)
+        ok, msg, retryable_internal, _ = self._parse_response(resp)
+        return ok, msg, retryable_internal
+
+    async def submit_batch(
+        self,
+        items: List[Tuple[dict, str, str]],
+        *,
+        concurrency: int = 1,
+    ) -> List[Tuple[bool, str, bool]]:
+        """
+        Submit many FOI rows, packing their instructions into as few ITM requests as
+        ITM_BATCH_MAX_INSTRUCTIONS / ITM_BATCH_MAX_BYTES allow.
+
+        items: (foi_data, remitter, path) per source file. Like submit, every call builds its instructions with a
+        fresh sourceUniqueRef, so a later retry of the same file is a new instruction for ITM.
+        Returns one (ok, message, retryable_internal) tuple per item, in input order.
+        """
+        if not items:
+            return []
+
+        try:
+            headers = await self._headers()
+        except Exception as e:
+            log_event(event="ITM_TOKEN_FAILED", level="error", message=f"exception:{e}")
+            return [(False, f"failed to get oauth token: {e}", False)] * len(items)
+
+        instructions = [
+            self._build_instruction(foi_data, remitter)
+            for foi_data, remitter, _path in items
+        ]
+        batches = self._pack_instructions(instructions)
+        results: List[Any] = [None] * len(items)
+        sem = asyncio.Semaphore(max(1, concurrency))
 
+        async def _submit_one_batch(indexes: List[int]) -> None:
+            payload = {"instructions": [instructions[i] for i in indexes]}
+            async with sem:
+                try:
+                    resp = await self._send(payload, dict(headers))
+                except Exception as e:
+                    log_event(event="ITM_FAILED", level="error", message=f"exception:{e}",
+                              extra={"instructionCount": len(indexes)})
+                    for i in indexes:
+                        results[i] = (False, str(e), True)
+                    return
+
+            ok, msg, retryable_internal, per_ref = self._parse_response(resp)
+            for i in indexes:
+                ref = instructions[i]["sourceUniqueRef"]
+                if ref in per_ref:
+                    results[i] = per_ref[ref]
+                else:
+                    results[i] = (ok, msg, retryable_internal)
+
+        await asyncio.gather(*(_submit_one_batch(b) for b in batches))
+        return results
+
+    def _pack_instructions(self, instructions: List[dict]) -> List[List[int]]:
+        max_count = max(1, settings.ITM_BATCH_MAX_INSTRUCTIONS)
+        max_bytes = settings.ITM_BATCH_MAX_BYTES
+
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_bytes = 0
+        for i, inst in enumerate(instructions):
+            size = len(json.dumps(inst))
+            # An instruction larger than the byte limit still goes out, alone in its own request.
+            if current and (len(current) >= max_count or current_bytes + size > max_bytes):
+                batches.append(current)
+                current, current_bytes = [], 0
+            current.append(i)
+            current_bytes += size
+        if current:
+            batches.append(current)
+        return batches
+
+    def _parse_response(self, resp: httpx.Response) -> Tuple[bool, str, bool, Dict[str, Tuple[bool, str, bool]]]:
+        """
+        Returns (ok, message, retryable_internal, per_instruction) for one ITM response.
+        per_instruction maps sourceUniqueRef -> (ok, message, retryable_internal) when ITM reports results per
+        instruction; a failed item is retryable on a 5xx response or when the item itself reports an internal error.
+        """
         status_code = resp.status_code
         text = resp.text or ""
         ok_http = httpx.codes.is_success(status_code)  # 200 <= status_code < 300
         retryable_internal = 500 <= status_code < 600
+        per_ref: Dict[str, Tuple[bool, str, bool]] = {}
 
         try:
             j = resp.json()
@@ -77,31 +166,48 @@ class ITMClient:
             msg = j.get("message", text)
             cnt = j.get("instructionsCount", -1)
             ok = ok_http and (status_val == "success")
+            for item in j.get("results") or []:
+                ref = item.get("sourceUniqueRef") if isinstance(item, dict) else None
+                if ref:
+                    item_ok = ok_http and str(item.get("status", "")).lower() == "success"
+                    item_retryable = not item_ok and (retryable_internal or self._is_internal_item_error(item))
+                    per_ref[ref] = (item_ok, item.get("message", msg), item_retryable)
         except Exception:
             msg = text
             cnt = -1
             ok = ok_http
 
-        if ok:
+        failed_items = sum(1 for item_ok, _, _ in per_ref.values() if not item_ok)
+        if ok and not failed_items:
             log_event(event=Events.ITM_SUCCEEDED, message=f"code={status_code}", extra={"instructionCount": cnt})
         else:
             log_event(event=Events.ITM_FAILED, level="error", message=f"code={status_code}, resp={text[:200]}",
-                        extra={"instructionCount": cnt})
+                        extra={"instructionCount": cnt, "failedInstructions": failed_items})
 
-        return ok, msg, (not ok and retryable_internal)
+        return ok, msg, (not ok and retryable_internal), per_ref
+
+    @staticmethod
+    def _is_internal_item_error(item: dict) -> bool:
+        status_val = str(item.get("status", "")).lower()
+        try:
+            code = int(item.get("statusCode") or item.get("code") or 0)
+        except (TypeError, ValueError):
+            code = 0
+        return status_val in ("internal_error", "internalerror") or 500 <= code < 600
+
+    def _build_instruction(self, foi_data: dict, remitter: str) -> dict:
+        return {
+            "sourceUniqueRef": str(uuid.uuid4()),
+            "clientIdentifier": remitter,
+            "clientAccountRegion": settings.ITM_CLIENT_ACCOUNT_REGION,
+            "messageCategory": settings.ITM_MESSAGE_CATEGORY,
+            "productIdentifier": settings.ITM_PRODUCT_IDENTIFIER,
+            "payload": json.dumps(foi_data)
+        }
 
     async def _build_itm_payload(self, foi_data: dict, remitter: str):
         return {
-            "instructions": [
-                {
-                    "sourceUniqueRef": str(uuid.uuid4()),
-                    "clientIdentifier": remitter,
-                    "clientAccountRegion": settings.ITM_CLIENT_ACCOUNT_REGION,
-                    "messageCategory": settings.ITM_MESSAGE_CATEGORY,
-                    "productIdentifier": settings.ITM_PRODUCT_IDENTIFIER,
-                    "payload": json.dumps(foi_data)
-                }
-            ]
+            "instructions": [self._build_instruction(foi_data, remitter)]
         }
 
     async def close(self):
@@ -0,0 +1,122 @@
+import asyncio
+import ntpath
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+import smbclient
+
+from db.recorder import Recorder
+from misc.config import settings
+from logs.logging_utils import log_event
+
+
+@dataclass
+class ScanResult:
+    files: list[str]
+    full: bool
+    rescanned_dirs: list[str] = field(default_factory=list)
+
+
+def _norm(path: str) -> str:
+    return (path or "").replace("/", "\\").rstrip("\\").lower()
+
+
+def _list_dir(path: str) -> tuple[list[str], list[tuple[str, float]]]:
+    """
+    One directory listing: file names, and (name, mtime) of sub-directories taken from the listing itself.
+    """
+    files: list[str] = []
+    dirs: list[tuple[str, float]] = []
+    for entry in smbclient.scandir(path):
+        if entry.is_dir():
+            dirs.append((entry.name, float(entry.stat().st_mtime)))
+        else:
+            files.append(entry.name)
+    return files, dirs
+
+
+def _walk_files(path: str) -> list[str]:
+    """
+    All files below a directory, as paths relative to it.
+    """
+    out: list[str] = []
+    for dirpath, _dirnames, filenames in smbclient.walk(path):
+        rel = dirpath[len(path):].strip("\\/")
+        out.extend(ntpath.join(rel, f) if rel else f for f in filenames)
+    return out
+
+
+class IncrementalScanner:
+    """
+    Source tree scan that only re-lists remitter folders whose directory mtime changed since the previous run.
+
+    The root is always listed (its listing carries the remitter folders' mtimes). Folders with an unchanged mtime
+    reuse the file list persisted in coordinator_scan_snapshot. A folder's mtime only moves when entries are added,
+    removed or renamed directly in it, so in-place overwrites and changes in nested sub-folders are picked up by the
+    full rescan that runs every SMB_FULL_RESCAN_INTERVAL_S (0 = always full).
+    """
+
+    def __init__(
+        self,
+        recorder: Recorder,
+        root: str,
+        *,
+        full_rescan_interval_s: Optional[float] = None,
+        exclude_dirs: Iterable[str] = (),
+    ):
+        self.recorder = recorder
+        self.root = root
+        self.full_rescan_interval_s = (
+            settings.SMB_FULL_RESCAN_INTERVAL_S if full_rescan_interval_s is None else full_rescan_interval_s
+        )
+        self._exclude = {_norm(d) for d in exclude_dirs}
+
+    def _is_full_due(self, root_snap, now: float) -> bool:
+        if not self.full_rescan_interval_s or root_snap is None or root_snap.full_scan_ts is None:
+            return True
+        return now - root_snap.full_scan_ts >= self.full_rescan_interval_s
+
+    async def scan(self) -> ScanResult:
+        now = time.time()
+        snapshots = await self.recorder.get_scan_snapshots(self.root)
+        root_snap = snapshots.get(self.root)
+        full = self._is_full_due(root_snap, now)
+
+        root_files, subdirs = await asyncio.to_thread(_list_dir, self.root)
+        subdirs = [(ntpath.join(self.root, name), mtime) for name, mtime in subdirs]
+        subdirs = [(d, mtime) for d, mtime in subdirs if _norm(d) not in self._exclude]
+
+        changed = [
+            (d, mtime) for d, mtime in subdirs
+            if full or d not in snapshots or snapshots[d].mtime != mtime
+        ]
+        listings = await asyncio.gather(*(asyncio.to_thread(_walk_files, d) for d, _ in changed))
+        fresh = {d: entries for (d, _), entries in zip(changed, listings)}
+
+        files = [ntpath.join(self.root, f) for f in root_files]
+        for d, _mtime in subdirs:
+            entries = fresh[d] if d in fresh else snapshots[d].entries
+            files.extend(ntpath.join(d, f) for f in entries)
+
+        values = [{
+            "dir_path": self.root,
+            "mtime": 0.0,  # the root is listed on every run; its row only carries full_scan_ts
+            "entries": root_files,
+            "full_scan_ts": now if full else root_snap.full_scan_ts,
+        }]
+        values.extend(
+            {"dir_path": d, "mtime": mtime, "entries": fresh[d], "full_scan_ts": now if full else None}
+            for d, mtime in changed
+        )
+        await self.recorder.save_scan_snapshots(
+            self.root,
+            values,
+            keep_dirs=[self.root, *(d for d, _ in subdirs)],
+        )
+
+        log_event(
+            "SMB_SCAN_DONE",
+            message=f"full={full} dirs={len(subdirs)} rescanned={len(changed)} files={len(files)}",
+        )
+        return ScanResult(files=files, full=full, rescanned_dirs=[d for d, _ in changed])
@@ -1,40 +1,87 @@
 import asyncio
 import json
 import ntpath
-from typing import Iterable, List
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Iterable, List
 
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from misc.config import settings
 from misc.constants import Events, Status, FailureKind
 from db.db import session_manager
-from db.recorder import Recorder
+from db.recorder import Recorder, StatusRow
 from logs.logging_utils import log_event
 from services.smb_service import SmbService
 from services.extraction_service import ExtractionService
+from services.archive_executor import ArchiveExecutor
 from clients.itm import ITMClient
 from clients.iqube import IQubeClient
 import misc.utils as utils
 
 
+@dataclass(frozen=True)
+class _RetryOutcome:
+    record: Any
+    status: str
+    message: str
+    notify_iqube: bool = False
+
+
+def _interleave_by_remitter(records: Iterable[Any]) -> List[Any]:
+    """
+    Round-robin records across remitters, keeping the incoming (oldest first) order within each remitter,
+    so a single remitter's backlog cannot fill every retry chunk.
+    """
+    queues: dict[str, deque] = {}
+    for r in records:
+        queues.setdefault(utils.extract_remitter(r.file_name), deque()).append(r)
+
+    ordered = []
+    while queues:
+        for remitter in list(queues):
+            q = queues[remitter]
+            ordered.append(q.popleft())
+            if not q:
+                del queues[remitter]
+    return ordered
+
+
 class PostprocessService:
     def __init__(self, smb: SmbService):
         self.smb = smb
+        self.archiver: ArchiveExecutor | None = None
+
+    def close(self) -> None:
+        if self.archiver is not None:
+            self.archiver.shutdown()
+            self.archiver = None
 
-    @retry(
-        stop=stop_after_attempt(settings.MAX_RETRY_COUNT),
-        wait=wait_exponential(multiplier=settings.RETRY_BASE_SECONDS, min=1, max=8),
-        retry=retry_if_exception_type(Exception),
-        reraise=True,
-    )
     async def archive(self, files_to_archive: Iterable[str] | None = None) -> bool:
         """
         Archive source files in two categories:
         1) Scan-derived candidates (typically "old" files we decided not to process) - no DB record expected.
         2) DB housekeeping candidates (processed/closed/rejected but not yet archived) - archive and then write DB status.
+
+        The archive thread pool lives for one run: it is created here and shut down when the run (including its
+        retries) ends.
         """
+        files_to_archive = list(files_to_archive or [])
+        self.archiver = ArchiveExecutor(self.smb.archive_source)
+        try:
+            return await self._archive_with_retry(files_to_archive)
+        finally:
+            self.close()
+
+    @retry(
+        stop=stop_after_attempt(settings.MAX_RETRY_COUNT),
+        wait=wait_exponential(multiplier=settings.RETRY_BASE_SECONDS, min=1, max=8),
+        retry=retry_if_exception_type(Exception),
+        reraise=True,
+    )
+    async def _archive_with_retry(self, files_to_archive: List[str]) -> bool:
         ok_itm = await self._retry_itm_internal_failures()
-        ok_scan = await self._archive_scan_candidates(files_to_archive or [])
+        ok_scan = await self._archive_scan_candidates(files_to_archive)
         ok_housekeeping = await self._archive_db_housekeeping_candidates()
         return ok_itm and ok_scan and ok_housekeeping
 
@@ -43,6 +90,10 @@ class PostprocessService:
         Retry files whose latest status is ITM_INTERNAL_FAILED.
 
         Plan A: re-run FOI extraction using filename-based API, then resubmit to ITM.
+
+        Candidates are interleaved across remitters and retried in chunks of ITM_RETRY_CHUNK_SIZE with at most
+        ITM_RETRY_CONCURRENCY extractions in flight. Extracted rows of a chunk go to ITM through the batch API,
+        and statuses of a chunk are written in a single transaction once the whole chunk has completed.
         """
         async with session_manager() as session:
             rec = Recorder(session)
@@ -54,67 +105,31 @@ class PostprocessService:
         extraction_svc = ExtractionService()
         itm = ITMClient()
         iqube = IQubeClient()
+        sem = asyncio.Semaphore(max(1, settings.ITM_RETRY_CONCURRENCY))
+        chunk_size = max(1, settings.ITM_RETRY_CHUNK_SIZE)
+        ordered = _interleave_by_remitter(candidates)
         try:
-            for r in candidates:
-                path = r.file_name
-                base = r.base_name
-                md5 = r.content_md5
-                remitter = utils.extract_remitter(path)
-                filename = ntpath.basename(path)
-
-                result = await extraction_svc.extract_with_file_name(filename=filename, remitter=remitter)
-                if not result.ok:
-                    # Best-effort: record extraction failure. This should be rare because candidates previously
-                    # had extraction succeed; avoid spamming IQube here and rely on normal run alerts.
-                    async with session_manager() as session:
-                        recorder = Recorder(session)
-                        async with session.begin():
-                            await recorder.insert_status(
-                                file_name=path,
-                                base_name=base,
-                                md5=md5,
-                                status=Status.EXTRACTION_SERVICE_FAILED
-                                if result.kind == FailureKind.SERVICE
-                                else Status.EXTRACTION_FILE_FAILED,
-                                message=json.dumps(result.rows or result.message or "")[:500],
-                                correlation_id=r.correlation_id,
-                            )
-                    continue
-
-                ok, msg, retryable_internal = await itm.submit(result.rows[0], remitter, path)
-                if ok:
-                    async with session_manager() as session:
-                        recorder = Recorder(session)
-                        async with session.begin():
-                            await recorder.insert_status(
-                                file_name=path,
-                                base_name=base,
-                                md5=md5,
-                                status=Status.SUCCESS,
-                                message="SUCCESS",
-                                correlation_id=r.correlation_id,
-                            )
-                    continue
-
-                status = Status.ITM_INTERNAL_FAILED if retryable_internal else Status.ITM_FAILED
-                rid = None
-                async with session_manager() as session:
-                    recorder = Recorder(session)
-                    async with session.begin():
-                        rid = await recorder.insert_status(
-                            file_name=path,
-                            base_name=base,
-                            md5=md5,
-                            status=status,
-                            message=(msg or "itm_failed")[:500],
-                            correlation_id=r.correlation_id,
-                        )
-
-                if not retryable_internal:
-                    try:
-                        await iqube.notify_file_error(path, reason=Status.ITM_FAILED, record_id=rid)
-                    except Exception as e:
-                        log_event("IQUBE_NOTIFY_ERROR", level="error", file=path, message=str(e))
+            for start in range(0, len(ordered), chunk_size):
+                chunk = ordered[start:start + chunk_size]
+                results = await asyncio.gather(
+                    *(self._extract_for_retry(r, extraction_svc, sem) for r in chunk),
+                    return_exceptions=True,
+                )
+                outcomes = [x for x in results if isinstance(x, _RetryOutcome)]
+                errors = [x for x in results if isinstance(x, BaseException)]
+                extracted = [x for x in results if isinstance(x, tuple)]
+                try:
+                    outcomes.extend(await self._submit_retry_batch(extracted, itm))
+                finally:
+                    # Persist whatever completed before surfacing a failure, so finished extractions and ITM
+                    # submissions are not redone on the next attempt.
+                    await self._record_retry_outcomes(outcomes, iqube)
+                log_event(
+                    "ITM_RETRY_CHUNK_DONE",
+                    message=f"chunk={start // chunk_size} done={len(outcomes)} errors={len(errors)}",
+                )
+                if errors:
+                    raise errors[0]
 
             return True
         finally:
@@ -122,6 +137,82 @@ class PostprocessService:
             await itm.aclose()
             await iqube.close()
 
+    async def _extract_for_retry(self, r, extraction_svc: ExtractionService, sem: asyncio.Semaphore):
+        """
+        Re-run FOI extraction for one candidate.
+        Returns a failure outcome, or (record, foi_row, remitter) ready for ITM submission.
+        """
+        path = r.file_name
+        remitter = utils.extract_remitter(path)
+        filename = ntpath.basename(path)
+
+        async with sem:
+            result = await extraction_svc.extract_with_file_name(filename=filename, remitter=remitter)
+
+        if not result.ok:
+            # Best-effort: record extraction failure. This should be rare because candidates previously
+            # had extraction succeed; avoid spamming IQube here and rely on normal run alerts.
+            return _RetryOutcome(
+                record=r,
+                status=Status.EXTRACTION_SERVICE_FAILED
+                if result.kind == FailureKind.SERVICE
+                else Status.EXTRACTION_FILE_FAILED,
+                message=json.dumps(result.rows or result.message or "")[:500],
+            )
+        return r, result.rows[0], remitter
+
+    async def _submit_retry_batch(self, extracted: List[tuple], itm: ITMClient) -> List[_RetryOutcome]:
+        if not extracted:
+            return []
+
+        submissions = await itm.submit_batch(
+            [(row, remitter, r.file_name) for r, row, remitter in extracted],
+            concurrency=settings.ITM_RETRY_CONCURRENCY,
+        )
+
+        outcomes = []
+        for (r, _, _), (ok, msg, retryable_internal) in zip(extracted, submissions):
+            if ok:
+                outcomes.append(_RetryOutcome(record=r, status=Status.SUCCESS, message="SUCCESS"))
+                continue
+            status = Status.ITM_INTERNAL_FAILED if retryable_internal else Status.ITM_FAILED
+            outcomes.append(
+                _RetryOutcome(
+                    record=r,
+                    status=status,
+                    message=(msg or "itm_failed")[:500],
+                    notify_iqube=not retryable_internal,
+                )
+            )
+        return outcomes
+
+    async def _record_retry_outcomes(self, outcomes: List[_RetryOutcome], iqube: IQubeClient) -> None:
+        if not outcomes:
+            return
+
+        async with session_manager() as session:
+            recorder = Recorder(session)
+            async with session.begin():
+                rids = await recorder.insert_statuses_bulk(
+                    StatusRow(
+                        file_name=o.record.file_name,
+                        base_name=o.record.base_name,
+                        md5=o.record.content_md5,
+                        status=o.status,
+                        message=o.message,
+                        correlation_id=o.record.correlation_id,
+                    )
+                    for o in outcomes
+                )
+
+        to_notify = [(o.record.file_name, rid) for o, rid in zip(outcomes, rids) if o.notify_iqube]
+
+        for path, rid in to_notify:
+            try:
+                await iqube.notify_file_error(path, reason=Status.ITM_FAILED, record_id=rid)
+            except Exception as e:
+                log_event("IQUBE_NOTIFY_ERROR", level="error", file=path, message=str(e))
+
     async def _archive_scan_candidates(self, files_to_archive: Iterable[str] | None = None) -> bool:
         names = list(dict.fromkeys([x for x in (files_to_archive or []) if x]))
         if not names:
@@ -129,8 +220,7 @@ class PostprocessService:
             return True
 
         failed = 0
-        for file_name in names:
-            ok, msg = await asyncio.to_thread(self.smb.archive_source, file_name)
+        async for file_name, ok, msg in self.archiver.archive_many(names):
             if not ok:
                 failed += 1
                 log_event(Events.ARCHIVE_SOURCE_FAILED, file=file_name, message=f"archive scan-candidate failed: {msg}")
@@ -152,21 +242,24 @@ class PostprocessService:
 
         failed = 0
         succeeded = []
-
+        # The same file_name can appear with several content_md5 values; archive it once and record all of them.
+        by_name: dict[str, list] = {}
         for rec in db_candidates:
-            ok, msg = await asyncio.to_thread(self.smb.archive_source, rec.file_name)
+            by_name.setdefault(rec.file_name, []).append(rec)
+
+        async for file_name, ok, msg in self.archiver.archive_many(by_name):
             if not ok:
                 failed += 1
-                log_event(Events.ARCHIVE_SOURCE_FAILED, file=rec.file_name, message=f"archive failed: {msg}")
+                log_event(Events.ARCHIVE_SOURCE_FAILED, file=file_name, message=f"archive failed: {msg}")
                 continue
-            succeeded.append(rec)
+            succeeded.extend(by_name[file_name])
 
         if succeeded:
             async with session_manager() as session:
                 recorder = Recorder(session)
                 async with session.begin():
-                    for rec in succeeded:
-                        await recorder.insert_status(
+                    await recorder.insert_statuses_bulk(
+                        StatusRow(
                             file_name=rec.file_name,
                             base_name=rec.base_name,
                             md5=rec.content_md5,
@@ -174,6 +267,8 @@ class PostprocessService:
                             message=f"archive succeeded",
                             correlation_id=rec.correlation_id
                         )
+                        for rec in succeeded
+                    )
 
         total = len(succeeded)
         if failed:
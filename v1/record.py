@@ -1,20 +1,35 @@
 from __future__ import annotations
 
-from typing import Optional
-from datetime import datetime
+from dataclasses import dataclass
+from typing import Iterable, Optional
+from datetime import datetime, timedelta
 
-from sqlalchemy import func, desc, select, exists, and_, text
+from sqlalchemy import case, func, delete, desc, select, or_, text
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy import exc as sa_exc
-from sqlalchemy.orm import aliased
 
 from db.models import ControlRecord, generate_record_id
+from db.file_state import FileFingerprintRecord, FileStateRecord, ScanSnapshotRecord
 from misc.config import settings
 from misc.constants import Status
 from logs.logging_utils import log_event
 from models.domain.file import FileDetailResponse
 
 
+_INSERT_CHUNK_ROWS = 1000  # 10 bind params per row keeps a chunk well under the asyncpg 32767 limit
+
+
+@dataclass(frozen=True)
+class StatusRow:
+    file_name: str
+    base_name: str
+    md5: str
+    status: str
+    message: Optional[str] = None
+    attempt_no: int = 0
+    correlation_id: Optional[str] = None
+
+
 class Recorder:
     def __init__(self, session, instance_id: Optional[str] = None):
         self.session = session
@@ -28,10 +43,12 @@ class Recorder:
         md5: str,
         correlation_id: Optional[str] = None,
     ) -> bool:
+        record_id = generate_record_id()
+        created_at = datetime.utcnow()
         stmt = (
             insert(ControlRecord)
             .values(
-                id=generate_record_id(),
+                id=record_id,
                 file_name=file_name,
                 base_name=base_name,
                 content_md5=md5,
@@ -39,7 +56,7 @@ class Recorder:
                 message="claimed",
                 instance_id=self.instance_id,
                 correlation_id=correlation_id,
-                created_at=datetime.utcnow(),
+                created_at=created_at,
             )
             .on_conflict_do_nothing(
                 index_elements=["base_name", "content_md5"],
@@ -49,10 +66,21 @@ class Recorder:
         )
         try:
             res = await self.session.execute(stmt)
-            return res.scalar() is not None
+            claimed = res.scalar() is not None
         except sa_exc.IntegrityError:
             return False
 
+        if claimed:
+            await self._upsert_file_states([{
+                "id": record_id,
+                "file_name": file_name,
+                "base_name": base_name,
+                "content_md5": md5,
+                "status": Status.PROCESSING,
+                "created_at": created_at,
+            }])
+        return claimed
+
     async def insert_status(
         self,
         *,
@@ -76,43 +104,196 @@ class Recorder:
             created_at=datetime.utcnow(),
         )
         self.session.add(rec)
+        await self._upsert_file_states([{
+            "id": rec.id,
+            "file_name": file_name,
+            "base_name": base_name,
+            "content_md5": md5,
+            "status": status,
+            "created_at": rec.created_at,
+        }])
         return rec.id
 
-    async def list_unarchived_files(self, *, limit: int | None = None) -> list[ControlRecord]:
-        latest = (
-            select(ControlRecord)
-            .distinct(ControlRecord.file_name, ControlRecord.content_md5)
-            .order_by(ControlRecord.file_name,
-                      ControlRecord.content_md5,
-                      ControlRecord.created_at.desc()
-            ).subquery("latest")
+    async def insert_statuses_bulk(self, rows: Iterable[StatusRow]) -> list[str]:
+        """
+        Insert many status rows in the caller's transaction and return their ids in input order.
+
+        Uses multi-row INSERTs, or COPY once the batch reaches RECORDER_COPY_THRESHOLD rows.
+        """
+        rows = list(rows)
+        if not rows:
+            return []
+
+        now = datetime.utcnow()
+        values = [
+            {
+                "id": generate_record_id(),
+                "file_name": r.file_name,
+                "base_name": r.base_name,
+                "content_md5": r.md5,
+                "status": r.status,
+                "message": r.message,
+                "attempt_no": r.attempt_no,
+                "instance_id": self.instance_id,
+                "correlation_id": r.correlation_id,
+                # Keep input order visible in created_at for rows of the same file.
+                "created_at": now + timedelta(microseconds=i),
+            }
+            for i, r in enumerate(rows)
+        ]
+
+        if len(values) >= settings.RECORDER_COPY_THRESHOLD:
+            await self._copy_control_rows(values)
+        else:
+            for i in range(0, len(values), _INSERT_CHUNK_ROWS):
+                await self.session.execute(insert(ControlRecord).values(values[i:i + _INSERT_CHUNK_ROWS]))
+
+        await self._upsert_file_states(values)
+        return [v["id"] for v in values]
+
+    async def _copy_control_rows(self, values: list[dict]) -> None:
+        columns = list(values[0].keys())
+        # Flush pending ORM rows first so COPY does not overtake them on the same connection.
+        await self.session.flush()
+        conn = await self.session.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            ControlRecord.__tablename__,
+            records=[tuple(v[c] for c in columns) for v in values],
+            columns=columns,
         )
-        cr = aliased(ControlRecord, latest)
-
-        arch_exists = exists(
-            select(1).where(
-                and_(
-                    ControlRecord.file_name == cr.file_name,
-                    ControlRecord.content_md5 == cr.content_md5,
-                    ControlRecord.status == Status.ARCHIVE_SUCCEEDED
-                )
+
+    async def _upsert_file_states(self, values: list[dict]) -> None:
+        """
+        Keep coordinator_file_state pointing at the latest control row of each (file_name, content_md5).
+        Runs in the caller's transaction, so state rows commit or roll back together with the control rows.
+        """
+        latest: dict[tuple[str, str], dict] = {}
+        archived: set[tuple[str, str]] = set()
+        for v in values:
+            key = (v["file_name"], v["content_md5"])
+            latest[key] = v
+            if v["status"] == Status.ARCHIVE_SUCCEEDED:
+                archived.add(key)
+
+        states = [
+            {
+                "file_name": v["file_name"],
+                "content_md5": v["content_md5"],
+                "base_name": v["base_name"],
+                "status": v["status"],
+                "last_record_id": v["id"],
+                "archived": key in archived,
+                "created_at": v["created_at"],
+            }
+            for key, v in latest.items()
+        ]
+
+        for i in range(0, len(states), _INSERT_CHUNK_ROWS):
+            stmt = insert(FileStateRecord).values(states[i:i + _INSERT_CHUNK_ROWS])
+            # Only a newer row moves the latest status; 'archived' sticks even when ARCHIVE_SUCCEEDED arrives late.
+            newer = FileStateRecord.created_at <= stmt.excluded.created_at
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[FileStateRecord.file_name, FileStateRecord.content_md5],
+                set_={
+                    "base_name": case((newer, stmt.excluded.base_name), else_=FileStateRecord.base_name),
+                    "status": case((newer, stmt.excluded.status), else_=FileStateRecord.status),
+                    "last_record_id": case((newer, stmt.excluded.last_record_id), else_=FileStateRecord.last_record_id),
+                    "archived": or_(FileStateRecord.archived, stmt.excluded.archived),
+                    "created_at": case((newer, stmt.excluded.created_at), else_=FileStateRecord.created_at),
+                },
             )
+            await self.session.execute(stmt)
+
+    async def get_fingerprints(self, paths: Iterable[str]) -> dict[str, FileFingerprintRecord]:
+        """
+        Return the stored fingerprint of each given path that has one, keyed by path.
+        """
+        paths = list(dict.fromkeys(paths))
+        found: dict[str, FileFingerprintRecord] = {}
+        for i in range(0, len(paths), _INSERT_CHUNK_ROWS):
+            stmt = select(FileFingerprintRecord).where(FileFingerprintRecord.path.in_(paths[i:i + _INSERT_CHUNK_ROWS]))
+            res = await self.session.execute(stmt)
+            for rec in res.scalars().all():
+                found[rec.path] = rec
+        return found
+
+    async def upsert_fingerprints(self, values: Iterable[dict]) -> None:
+        """
+        Store (path, size, mtime, chgtime, content_md5, base_name) fingerprints, replacing older ones per path.
+        """
+        latest = {v["path"]: v for v in values}
+        if not latest:
+            return
+        now = datetime.utcnow()
+        rows = [{**v, "updated_at": now} for v in latest.values()]
+        for i in range(0, len(rows), _INSERT_CHUNK_ROWS):
+            stmt = insert(FileFingerprintRecord).values(rows[i:i + _INSERT_CHUNK_ROWS])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[FileFingerprintRecord.path],
+                set_={
+                    "size": stmt.excluded.size,
+                    "mtime": stmt.excluded.mtime,
+                    "chgtime": stmt.excluded.chgtime,
+                    "content_md5": stmt.excluded.content_md5,
+                    "base_name": stmt.excluded.base_name,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+            await self.session.execute(stmt)
+
+    async def get_scan_snapshots(self, root: str) -> dict[str, ScanSnapshotRecord]:
+        """
+        Return the stored directory snapshots of a scan root, keyed by dir_path.
+        """
+        res = await self.session.execute(select(ScanSnapshotRecord).where(ScanSnapshotRecord.root == root))
+        return {rec.dir_path: rec for rec in res.scalars().all()}
+
+    async def save_scan_snapshots(self, root: str, values: Iterable[dict], *, keep_dirs: Iterable[str]) -> None:
+        """
+        Upsert directory snapshots of a scan root and drop the ones for directories that no longer exist.
+        """
+        now = datetime.utcnow()
+        rows = [{**v, "root": root, "updated_at": now} for v in values]
+        for i in range(0, len(rows), _INSERT_CHUNK_ROWS):
+            stmt = insert(ScanSnapshotRecord).values(rows[i:i + _INSERT_CHUNK_ROWS])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ScanSnapshotRecord.dir_path],
+                set_={
+                    "root": stmt.excluded.root,
+                    "mtime": stmt.excluded.mtime,
+                    "entries": stmt.excluded.entries,
+                    "full_scan_ts": stmt.excluded.full_scan_ts,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+            await self.session.execute(stmt)
+
+        await self.session.execute(
+            delete(ScanSnapshotRecord)
+            .where(ScanSnapshotRecord.root == root)
+            .where(ScanSnapshotRecord.dir_path.not_in(list(keep_dirs)))
         )
 
+    async def list_unarchived_files(self, *, limit: int | None = None) -> list[ControlRecord]:
+        """
+        Return the latest record for each (file_name, content_md5) that is closed (success/ops) but never archived.
+        """
         stmt = (
-            select(cr)
+            select(ControlRecord)
+            .join(FileStateRecord, FileStateRecord.last_record_id == ControlRecord.id)
             .where(
-                cr.status.in_([
+                FileStateRecord.status.in_([
                     Status.SUCCESS,
                     Status.OPS_CLOSED,
                     Status.OPS_REJECTED
                 ])
             )
-            .where(~arch_exists)
+            .where(FileStateRecord.archived.is_(False))
         )
 
         if limit is not None:
-            stmt = stmt.order_by(cr.created_at.asc()).limit(limit)
+            stmt = stmt.order_by(FileStateRecord.created_at.asc()).limit(limit)
 
         res = await self.session.execute(stmt)
         return list(res.scalars().all())
@@ -122,21 +303,13 @@ class Recorder:
         Return the latest record for each (file_name, content_md5) whose latest status is ITM_INTERNAL_FAILED.
         These are candidates for postprocess retry.
         """
-        latest = (
+        stmt = (
             select(ControlRecord)
-            .distinct(ControlRecord.file_name, ControlRecord.content_md5)
-            .order_by(
-                ControlRecord.file_name,
-                ControlRecord.content_md5,
-                ControlRecord.created_at.desc(),
-            )
-            .subquery("latest_itm_internal_failed")
+            .join(FileStateRecord, FileStateRecord.last_record_id == ControlRecord.id)
+            .where(FileStateRecord.status == Status.ITM_INTERNAL_FAILED)
         )
-        cr = aliased(ControlRecord, latest)
-
-        stmt = select(cr).where(cr.status == Status.ITM_INTERNAL_FAILED)
         if limit is not None:
-            stmt = stmt.order_by(cr.created_at.asc()).limit(limit)
+            stmt = stmt.order_by(FileStateRecord.created_at.asc()).limit(limit)
 
         res = await self.session.execute(stmt)
         return list(res.scalars().all())
@@ -0,0 +1,130 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+import smbclient
+
+from misc.config import settings
+from logs.logging_utils import log_event
+from services.smb_service import _is_retryable_smb_exception
+
+
+def _unc_parts(path: str) -> list[str]:
+    p = (path or "").replace("/", "\\")
+    if not p.startswith("\\\\"):
+        return []
+    return [x for x in p.split("\\") if x]
+
+
+def _unc_server(path: str) -> Optional[str]:
+    """Return the server part of a UNC path (\\\\server\\share\\...), or None for non-UNC paths."""
+    parts = _unc_parts(path)
+    return parts[0] if parts else None
+
+
+def _unc_share(path: str) -> Optional[Tuple[str, str]]:
+    """Return (server, share) of a UNC path, lower-cased, or None when the path has no share part."""
+    parts = _unc_parts(path)
+    return (parts[0].lower(), parts[1].lower()) if len(parts) >= 2 else None
+
+
+class SmbSessionPool:
+    """
+    Runs blocking smbclient calls on a dedicated thread pool with warm, shared sessions.
+
+    - The session of each server is registered once (credentials from the module-global smbclient.ClientConfig)
+      and reused by every worker through smbclient's connection cache.
+    - At most per_share_limit operations run against one server/share at a time.
+    - When a call fails with an error _is_retryable_smb_exception classifies as retryable (connection closed,
+      timeouts, transient NT statuses), the server's cached session is deleted so the next call reconnects
+      instead of reusing a broken connection. The error is still raised to the caller.
+    - Each session has a generation. Only a failure on the current generation evicts; calls that were in flight
+      on an already evicted session fail without evicting the reconnected one again.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: Optional[int] = None,
+        per_share_limit: Optional[int] = None,
+        thread_name_prefix: str = "smb-io",
+    ):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers or settings.SMB_POOL_WORKERS),
+            thread_name_prefix=thread_name_prefix,
+        )
+        self._per_share_limit = max(1, per_share_limit or settings.SMB_POOL_PER_SHARE_LIMIT)
+        self._share_sems: dict[Tuple[str, str], asyncio.Semaphore] = {}
+        self._warm_servers: set[str] = set()
+        self._generations: dict[str, int] = {}
+        self._warm_lock = threading.Lock()
+
+    def _ensure_session(self, path: str) -> None:
+        server = _unc_server(path)
+        if not server or server in self._warm_servers:
+            return
+        with self._warm_lock:
+            if server in self._warm_servers:
+                return
+            try:
+                smbclient.register_session(server)
+                self._warm_servers.add(server)
+            except Exception as e:
+                # Not fatal: the call itself will open a connection and surface the real error.
+                log_event("SMB_SESSION_WARMUP_FAILED", level="warning", message=f"server={server}: {e}")
+
+    def _evict(self, path: str, generation: int) -> None:
+        server = _unc_server(path)
+        if not server:
+            return
+        with self._warm_lock:
+            if self._generations.get(server, 0) != generation:
+                # Another call already evicted the session this call used.
+                return
+            self._generations[server] = generation + 1
+            self._warm_servers.discard(server)
+            try:
+                smbclient.delete_session(server)
+            except Exception as e:
+                log_event("SMB_SESSION_EVICT_FAILED", level="warning", message=f"server={server}: {e}")
+                return
+        log_event("SMB_SESSION_EVICTED", level="warning", message=f"server={server}")
+
+    def _call(self, fn: Callable[..., Any], path: str, args: tuple, kwargs: dict) -> Any:
+        self._ensure_session(path)
+        generation = self._generations.get(_unc_server(path), 0)
+        try:
+            return fn(path, *args, **kwargs)
+        except Exception as e:
+            if _is_retryable_smb_exception(e):
+                self._evict(path, generation)
+            raise
+
+    def _share_sem(self, path: str) -> Optional[asyncio.Semaphore]:
+        key = _unc_share(path)
+        if key is None:
+            return None
+        sem = self._share_sems.get(key)
+        if sem is None:
+            sem = self._share_sems[key] = asyncio.Semaphore(self._per_share_limit)
+        return sem
+
+    async def run(self, fn: Callable[..., Any], path: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run fn(path, *args, **kwargs) on the pool, within the per-share limit of path.
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self._call, fn, path, args, kwargs)
+        sem = self._share_sem(path)
+        if sem is None:
+            return await loop.run_in_executor(self._executor, call)
+        async with sem:
+            return await loop.run_in_executor(self._executor, call)
+
+    async def stat(self, path: str) -> Any:
+        return await self.run(smbclient.stat, path)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,66 @@
+import asyncio
+import time
+from typing import Iterable, Optional
+
+import smbclient
+
+from misc.config import settings
+from logs.logging_utils import log_event
+from services.fingerprint_cache import Fingerprint
+
+
+async def _stat_round(paths: list[str], sem: asyncio.Semaphore) -> dict[str, Fingerprint]:
+    """
+    Stat all paths concurrently. Paths whose stat fails or lacks size/times are left out of the result.
+    """
+    async def _one(path: str) -> Optional[Fingerprint]:
+        async with sem:
+            try:
+                st = await asyncio.to_thread(smbclient.stat, path)
+            except Exception as e:
+                log_event("SMB_STAT_FAILED", level="warning", file=path, message=str(e))
+                return None
+        return Fingerprint.from_stat(path, st)
+
+    results = await asyncio.gather(*(_one(p) for p in paths))
+    return {p: fp for p, fp in zip(paths, results) if fp is not None}
+
+
+async def filter_stable(
+    paths: Iterable[str],
+    *,
+    min_age_s: Optional[float] = None,
+    check_interval_s: Optional[float] = None,
+    check_count: Optional[int] = None,
+    concurrency: Optional[int] = None,
+) -> dict[str, Fingerprint]:
+    """
+    Batch version of SmbService.is_stable. Returns {path: last fingerprint} for the stable paths, in input order.
+
+    Same rules as is_stable: a failed stat or missing size/times means unstable. With a min age (argument or
+    SMB_STABILITY_MIN_AGE_S) one round is enough: stable when the latest of mtime/chgtime is at least min_age_s old.
+    Otherwise check_count rounds are taken, each one stats all remaining paths concurrently (at most concurrency /
+    SMB_STAT_CONCURRENCY at a time), with a single check_interval_s sleep between rounds for the whole batch; a path
+    is stable when its (size, mtime, chgtime) did not change across rounds.
+    """
+    pending = list(dict.fromkeys(paths))
+    if not pending:
+        return {}
+
+    age = min_age_s if min_age_s is not None else settings.SMB_STABILITY_MIN_AGE_S
+    sem = asyncio.Semaphore(max(1, concurrency or settings.SMB_STAT_CONCURRENCY))
+
+    candidates = await _stat_round(pending, sem)
+    if age is not None:
+        now = time.time()
+        return {p: fp for p, fp in candidates.items() if now - max(fp.mtime, fp.chgtime) >= age}
+
+    interval = check_interval_s if check_interval_s is not None else settings.SMB_STABILITY_CHECK_INTERVAL_S
+    count = max(1, check_count if check_count is not None else settings.SMB_STABILITY_CHECK_COUNT)
+    for _ in range(count - 1):
+        if not candidates:
+            break
+        await asyncio.sleep(interval)
+        latest = await _stat_round(list(candidates), sem)
+        candidates = {p: fp for p, fp in candidates.items() if latest.get(p) == fp}
+    return candidates
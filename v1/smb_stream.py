@@ -0,0 +1,95 @@
+import hashlib
+import tempfile
+from typing import BinaryIO, Iterator, Optional
+
+import smbclient
+
+from misc.config import settings
+
+
+class HashedSpool:
+    """
+    Re-readable copy of a source file plus its MD5, produced in one read pass.
+
+    Chunks are hashed as they are written into a SpooledTemporaryFile: small files stay in memory, larger ones
+    roll over to a temp file once SMB_SPOOL_MAX_MEMORY_BYTES is exceeded. The buffer returned by open() can be
+    handed straight to httpx as an upload file object, so the FOI request streams from the spool.
+    """
+
+    def __init__(self, max_memory_bytes: Optional[int] = None):
+        self._buf = tempfile.SpooledTemporaryFile(max_size=max_memory_bytes or settings.SMB_SPOOL_MAX_MEMORY_BYTES)
+        self._md5 = hashlib.md5()
+        self._digest: Optional[str] = None
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        if self._digest is not None:
+            raise RuntimeError("spool is sealed")
+        self._md5.update(chunk)
+        self._buf.write(chunk)
+        self.size += len(chunk)
+
+    def seal(self) -> "HashedSpool":
+        if self._digest is None:
+            self._digest = self._md5.hexdigest()
+            self._buf.flush()
+        self._buf.seek(0)
+        return self
+
+    @property
+    def md5(self) -> str:
+        if self._digest is None:
+            raise RuntimeError("spool is not sealed yet")
+        return self._digest
+
+    @property
+    def in_memory(self) -> bool:
+        return not getattr(self._buf, "_rolled", False)
+
+    def open(self) -> BinaryIO:
+        """Rewind and return the underlying buffer; call again for every re-read."""
+        self.seal()
+        return self._buf
+
+    def iter_chunks(self, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        size = chunk_size or settings.SMB_READ_CHUNK_BYTES
+        f = self.open()
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self) -> None:
+        self._buf.close()
+
+    def __enter__(self) -> "HashedSpool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def spool_from_stream(src: BinaryIO, *, chunk_size: Optional[int] = None,
+                      max_memory_bytes: Optional[int] = None) -> HashedSpool:
+    size = chunk_size or settings.SMB_READ_CHUNK_BYTES
+    spool = HashedSpool(max_memory_bytes=max_memory_bytes)
+    try:
+        while True:
+            chunk = src.read(size)
+            if not chunk:
+                break
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    return spool.seal()
+
+
+def download_and_hash(path: str, *, chunk_size: Optional[int] = None,
+                      max_memory_bytes: Optional[int] = None) -> HashedSpool:
+    """
+    Read an SMB file once, returning its MD5 and a re-readable spooled copy. Blocking; run via asyncio.to_thread.
+    """
+    with smbclient.open_file(path, mode="rb") as f:
+        return spool_from_stream(f, chunk_size=chunk_size, max_memory_bytes=max_memory_bytes)